@@ -5,12 +5,10 @@ from utils.openai_client import OpenAIClient
 
 load_dotenv()  # Load environment variables from .env
 
-client = OpenAIClient().client
-
 
 def simple_agent(prompt: str) -> str:
     """Send prompt to GPT-4 and return the response."""
-    response = client.chat.completions.create(
+    response = OpenAIClient().chat_completion_sync(
         model="gpt-4",
         messages=[
             {"role": "system", "content": "You are a helpful AI agent."},
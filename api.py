@@ -0,0 +1,508 @@
+"""
+Headless HTTP API for the summarizer.
+
+Jobs are submitted with a multipart (``file`` field) or raw streamed upload
+and return a job ID immediately; a fixed number of workers run
+``summaryAgent`` from a bounded queue, and submissions are refused with 429
+while it is full. Progress is streamed as Server-Sent Events.
+
+Endpoints:
+    POST /jobs                     upload a recording, returns {"job_id": ...}
+    GET  /jobs/{job_id}            status, and the summary once completed
+    GET  /jobs/{job_id}/events     stage progress as Server-Sent Events
+    GET  /jobs/{job_id}/summary    MeetingSummary JSON (?format=markdown)
+    GET  /search?q=...&limit=10    search the archive of finished meetings
+    GET  /meetings/{key}/segments  timed transcript segments (?start=&end=)
+    GET  /metrics                  Prometheus metrics
+    GET  /healthz                  liveness: 200 as soon as the server answers
+    GET  /readyz                   readiness: 503 until models are warmed up
+
+Usage:
+    python api.py
+    curl -F file=@meeting.mp3 http://127.0.0.1:8000/jobs
+    curl --data-binary @meeting.mp3 -H "Content-Type: audio/mpeg" \\
+        http://127.0.0.1:8000/jobs
+    curl -N http://127.0.0.1:8000/jobs/<job_id>/events
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from config.settings import settings, validate_environment
+from main import (
+    follow_job,
+    get_archive,
+    get_job_store,
+    release_job_audio,
+    resolve_job,
+    summaryAgent,
+)
+from utils.executors import shutdown_executors
+from utils.file_utils import cleanup_temp_file, validate_audio_file
+from utils.job_store import COMPLETED, FAILED
+from utils.logging_config import setup_logging
+from utils.metrics import queue_depth, registry
+from utils.warmup import warmup
+
+logger = logging.getLogger(__name__)
+
+_CONTENT_TYPE_EXTENSIONS = {
+    "audio/mpeg": ".mp3",
+    "audio/mp3": ".mp3",
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "audio/wave": ".wav",
+    "audio/mp4": ".m4a",
+    "audio/x-m4a": ".m4a",
+}
+# Multipart bodies may exceed MAX_FILE_SIZE by this much for boundaries,
+# part headers and small form fields.
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+_KEEPALIVE_SECONDS = 15
+# Event logs of finished jobs kept in memory for late SSE subscribers.
+_MAX_FINISHED_JOBS = 256
+
+
+class JobEvents:
+    """Ordered progress events of one job, replayed to every subscriber."""
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, Any]] = []
+        self.finished = False
+        self._changed = asyncio.Condition()
+
+    async def publish(self, event: str, data: dict[str, Any]) -> None:
+        async with self._changed:
+            self.events.append({"event": event, "data": data})
+            self.finished = self.finished or event in ("done", "error")
+            self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[dict[str, Any] | None]:
+        """Every event so far, then new ones; None when idle for a keep-alive."""
+        seen = 0
+        while True:
+            async with self._changed:
+                if seen == len(self.events) and not self.finished:
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(self._changed.wait(), _KEEPALIVE_SECONDS)
+                new = self.events[seen:]
+                finished = self.finished
+            seen += len(new)
+            if not new and not finished:
+                yield None
+            for event in new:
+                yield event
+            if finished and seen == len(self.events):
+                return
+
+
+class JobQueue:
+    """Bounded queue of submitted jobs drained by a fixed pool of workers."""
+
+    def __init__(self, workers: int, max_queued: int):
+        self.workers = workers
+        self.queue: asyncio.Queue[str] = asyncio.Queue(max_queued)
+        self.events: OrderedDict[str, JobEvents] = OrderedDict()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._work()) for _ in range(max(1, self.workers))
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    @property
+    def full(self) -> bool:
+        return self.queue.full()
+
+    def is_pending(self, job_id: str) -> bool:
+        events = self.events.get(job_id)
+        return events is not None and not events.finished
+
+    async def submit(self, job_id: str) -> None:
+        """Queue a job; raises asyncio.QueueFull when there is no room."""
+        self.queue.put_nowait(job_id)
+        queue_depth.inc(queue="api")
+        events = JobEvents()
+        self.events[job_id] = events
+        self._forget_finished()
+        await events.publish("queued", {"position": self.queue.qsize()})
+
+    def _forget_finished(self) -> None:
+        finished = [job for job, events in self.events.items() if events.finished]
+        for job_id in finished[: max(0, len(finished) - _MAX_FINISHED_JOBS)]:
+            del self.events[job_id]
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self.queue.get()
+            queue_depth.dec(queue="api")
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"API job {job_id} failed: {e}")
+                await self.events[job_id].publish("error", {"message": str(e)})
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        events = self.events[job_id]
+        async for status, markdown in summaryAgent(job_id=job_id):
+            await events.publish("status", {"message": status, "markdown": markdown})
+        job = await asyncio.to_thread(get_job_store().get_job, job_id)
+        if job["status"] == COMPLETED:
+            await events.publish("done", _job_response(job))
+        else:
+            await events.publish("error", {"message": job.get("error") or "Job failed"})
+
+
+jobs = JobQueue(settings.API_WORKERS, settings.API_QUEUE_SIZE)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if not validate_environment():
+        raise SystemExit("Missing required environment variables")
+    os.makedirs(settings.API_UPLOAD_DIR, exist_ok=True)
+    # Runs in the background, so the server starts listening straight away.
+    warmup.start()
+    jobs.start()
+    yield
+    await jobs.stop()
+    shutdown_executors()
+
+
+app = FastAPI(title="Agentic Summarizer API", lifespan=lifespan)
+
+
+def _job_response(job: dict[str, Any]) -> dict[str, Any]:
+    response = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "error": job["error"],
+        "completed_stages": sorted(job["stages"]),
+    }
+    if job["status"] == COMPLETED:
+        response["summary"] = job["stages"].get("summary")
+        response["markdown"] = job["stages"].get("markdown")
+    return response
+
+
+def _too_busy() -> HTTPException:
+    return HTTPException(
+        429,
+        "Too many jobs queued; retry later",
+        headers={"Retry-After": str(_KEEPALIVE_SECONDS)},
+    )
+
+
+def _upload_extension(request: Request, filename: str | None) -> str:
+    if filename:
+        return os.path.splitext(filename)[1].lower()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    return _CONTENT_TYPE_EXTENSIONS.get(content_type, "")
+
+
+class _MultipartFile:
+    """
+    Writes the ``file`` field of a multipart body to ``path`` as it is parsed,
+    so the upload never sits in memory or a spool file, and stops past
+    MAX_FILE_SIZE. Other fields are skipped.
+    """
+
+    def __init__(self, boundary: bytes, path: str):
+        self.path = path
+        self.found = False
+        self.filename: str | None = None
+        self.size = 0
+        self._file = None
+        self._headers: dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self.close,
+            },
+        )
+
+    def write(self, chunk: bytes) -> None:
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError as e:
+            raise HTTPException(400, f"Malformed multipart body: {e}") from None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        if options.get(b"name") != b"file" or self.found:
+            return
+        self.found = True
+        filename = options.get(b"filename")
+        self.filename = filename.decode("utf-8", "replace") if filename else None
+        # Closed at the end of the part, or by close() if parsing stops early.
+        self._file = open(self.path, "wb")  # noqa: SIM115
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._file is None:
+            return
+        self.size += end - start
+        if self.size > settings.MAX_FILE_SIZE:
+            raise HTTPException(413, "File too large")
+        self._file.write(data[start:end])
+
+
+async def _receive_multipart(request: Request, path: str) -> str | None:
+    """Stream the multipart ``file`` field to ``path``; returns its filename."""
+    _, options = parse_options_header(request.headers["content-type"])
+    boundary = options.get(b"boundary")
+    if not boundary:
+        raise HTTPException(400, "Multipart uploads need a boundary")
+    upload = _MultipartFile(boundary, path)
+    received = 0
+    try:
+        # Counted as it arrives: chunked bodies have no Content-Length.
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > settings.MAX_FILE_SIZE + _MULTIPART_OVERHEAD_BYTES:
+                raise HTTPException(413, "File too large")
+            await asyncio.to_thread(upload.write, chunk)
+    finally:
+        upload.close()
+    if not upload.found:
+        raise HTTPException(422, "Multipart uploads need a 'file' field")
+    if not upload.size:
+        raise HTTPException(422, "Empty upload")
+    return upload.filename
+
+
+async def _receive_body(request: Request, path: str) -> None:
+    """Stream the raw request body to ``path``."""
+    size = 0
+    with open(path, "wb") as f:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.MAX_FILE_SIZE:
+                raise HTTPException(413, "File too large")
+            await asyncio.to_thread(f.write, chunk)
+    if not size:
+        raise HTTPException(422, "Empty upload")
+
+
+async def _save_upload(request: Request) -> str:
+    """Write the multipart ``file`` field or the raw body to the upload dir."""
+    declared = int(request.headers.get("content-length") or 0)
+    if declared > settings.MAX_FILE_SIZE + _MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(413, "File too large")
+
+    multipart = request.headers.get("content-type", "").startswith(
+        "multipart/form-data"
+    )
+    if not multipart:
+        extension = _upload_extension(request, request.query_params.get("filename"))
+        if extension not in settings.SUPPORTED_FORMATS:
+            raise HTTPException(415, "Unsupported audio format")
+    # Named once the multipart filename (and so the extension) is known.
+    partial = os.path.join(settings.API_UPLOAD_DIR, f"{uuid.uuid4().hex}.partial")
+    try:
+        if multipart:
+            filename = await _receive_multipart(request, partial)
+            extension = _upload_extension(request, filename)
+            if extension not in settings.SUPPORTED_FORMATS:
+                raise HTTPException(415, "Unsupported audio format")
+        else:
+            await _receive_body(request, partial)
+        path = os.path.splitext(partial)[0] + extension
+        os.replace(partial, path)
+    except BaseException:
+        cleanup_temp_file(partial)
+        raise
+    return path
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request) -> dict[str, Any]:
+    # Refuse before reading the body when there is clearly no room.
+    if jobs.full:
+        raise _too_busy()
+    path = await _save_upload(request)
+    try:
+        if not await asyncio.to_thread(validate_audio_file, path):
+            raise HTTPException(
+                422, "Unsupported file type, file too large or recording too long"
+            )
+        # The job keeps its own copy of the recording from here on.
+        job_id = await asyncio.to_thread(resolve_job, path)
+    finally:
+        cleanup_temp_file(path)
+    if jobs.is_pending(job_id):
+        # The same recording is already queued or running here.
+        return {"job_id": job_id, "status": "queued"}
+    try:
+        await jobs.submit(job_id)
+    except asyncio.QueueFull:
+        # Nothing will run it; a later upload of the recording copies it again.
+        await asyncio.to_thread(release_job_audio, job_id)
+        raise _too_busy() from None
+    return {"job_id": job_id, "status": "queued"}
+
+
+async def _get_job(job_id: str) -> dict[str, Any]:
+    job = await asyncio.to_thread(get_job_store().get_job, job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown job ID: {job_id}")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> dict[str, Any]:
+    response = _job_response(await _get_job(job_id))
+    events = jobs.events.get(job_id)
+    if events is not None and events.events:
+        response["last_event"] = events.events[-1]
+    return response
+
+
+@app.get("/jobs/{job_id}/summary")
+async def get_summary(job_id: str, format: str = "json") -> Any:
+    job = await _get_job(job_id)
+    if job["status"] != COMPLETED:
+        raise HTTPException(409, f"Job is {job['status']}")
+    if format == "markdown":
+        return PlainTextResponse(
+            job["stages"]["markdown"], media_type="text/markdown; charset=utf-8"
+        )
+    return JSONResponse(job["stages"]["summary"])
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _job_events(job_id: str) -> AsyncIterator[str]:
+    events = jobs.events.get(job_id)
+    if events is not None:
+        async for event in events.subscribe():
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield _sse(event["event"], event["data"])
+        return
+
+    # Not run by this process: follow its checkpoints in the job store.
+    async for status, markdown in follow_job(job_id):
+        yield _sse("status", {"message": status, "markdown": markdown})
+    job = await asyncio.to_thread(get_job_store().get_job, job_id)
+    if job["status"] == COMPLETED:
+        yield _sse("done", _job_response(job))
+    elif job["status"] == FAILED:
+        yield _sse("error", {"message": job["error"] or "Job failed"})
+    else:
+        yield _sse("error", {"message": f"Job is {job['status']}"})
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str) -> StreamingResponse:
+    await _get_job(job_id)
+    return StreamingResponse(
+        _job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/search")
+async def search(q: str, limit: int = 10) -> dict[str, Any]:
+    archive = get_archive()
+    if archive is None:
+        raise HTTPException(404, "The meeting archive is disabled")
+    results = await asyncio.to_thread(archive.search, q, max(1, min(limit, 100)))
+    return {"query": q, "results": results}
+
+
+@app.get("/meetings/{key}/segments")
+async def meeting_segments(
+    key: str, start: float = 0, end: float = float("inf")
+) -> dict[str, Any]:
+    archive = get_archive()
+    segments = (
+        await asyncio.to_thread(archive.transcript_segments, key) if archive else None
+    )
+    if segments is None:
+        raise HTTPException(404, f"No transcript segments for meeting {key}")
+    selected = await asyncio.to_thread(segments.segments, start, end)
+    return {
+        "key": key,
+        "segments": selected,
+        "excerpt": "".join(s["text"] for s in selected).strip(),
+    }
+
+
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/healthz")
+async def healthz() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz() -> JSONResponse:
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+def main() -> None:
+    setup_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        log_file=os.getenv("LOG_FILE"),
+    )
+    uvicorn.run(app, host=settings.API_HOST, port=settings.API_PORT)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Search the archive of finished meetings, or backfill it from the job store.
+
+Plain terms are ranked with BM25 over transcripts and summaries; clauses
+such as ``decisions:pricing`` or ``participants:"alice smith"`` must match
+in that field.
+
+Usage:
+    python archive.py search "payment api"
+    python archive.py search 'action_items:invoice participants:alice' --limit 5
+    python archive.py search "launch" --json
+    python archive.py excerpt <key> --start 600 --end 660
+    python archive.py backfill             # archive jobs completed earlier
+"""
+
+import argparse
+import json
+import logging
+import os
+from typing import Any
+
+from config.settings import settings
+from main import archive_job, get_job_store
+from utils.archive import MeetingArchive
+from utils.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def _clock(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def format_result(result: dict[str, Any]) -> str:
+    summary = result["summary"]
+    lines = [
+        f"{result['score']:>8.3f}  {result['date'] or '(no date)'}  "
+        f"{result['key']}  {result['audio_path'] or ''}".rstrip()
+    ]
+    if summary.get("summary"):
+        lines.append(f"          {summary['summary'].splitlines()[0][:160]}")
+    for name, items in result["matches"].items():
+        for item in items:
+            lines.append(f"          {name}: {item}")
+    if result["snippet"]:
+        at = ""
+        if result["snippet_start"] is not None:
+            at = f"[{_clock(result['snippet_start'])}] "
+        lines.append(f"          {at}“{result['snippet']}”")
+    return "\n".join(lines)
+
+
+def backfill(archive: MeetingArchive, force: bool = False) -> int:
+    """Archive completed jobs that are not in the archive yet; returns how many."""
+    added = 0
+    for job_id in get_job_store().completed_job_ids():
+        job = get_job_store().get_job(job_id)
+        if not {"transcript", "summary"} <= set(job["stages"]):
+            continue
+        if not force and (job["audio_hash"] or job_id) in archive:
+            continue
+        archive_job(job, into=archive)
+        added += 1
+    return added
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search past meetings.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="Search the archive")
+    search.add_argument("query", help='e.g. payment api decisions:"new pricing"')
+    search.add_argument("--limit", type=int, default=10)
+    search.add_argument("--json", action="store_true", help="Print results as JSON")
+    excerpt = commands.add_parser(
+        "excerpt", help="Print what was said in part of a meeting"
+    )
+    excerpt.add_argument("key", help="Meeting key from the search results")
+    excerpt.add_argument("--start", type=float, default=0, help="Seconds")
+    excerpt.add_argument("--end", type=float, default=float("inf"), help="Seconds")
+    fill = commands.add_parser(
+        "backfill", help="Archive completed jobs from the job store"
+    )
+    fill.add_argument(
+        "--force", action="store_true", help="Re-archive jobs already archived"
+    )
+    args = parser.parse_args()
+
+    setup_logging(
+        level=os.getenv("LOG_LEVEL", "WARNING"),
+        log_file=os.getenv("LOG_FILE"),
+    )
+    archive = MeetingArchive(settings.ARCHIVE_PATH, settings.ARCHIVE_SEGMENTS_DIR)
+
+    if args.command == "backfill":
+        added = backfill(archive, args.force)
+        print(f"Archived {added} meetings ({len(archive)} in the archive)")
+        return
+
+    if args.command == "excerpt":
+        segments = archive.transcript_segments(args.key)
+        if segments is None:
+            raise SystemExit(f"No transcript segments stored for {args.key}")
+        for index in segments.between(args.start, args.end):
+            segment = segments.segment(index)
+            confidence = segment["confidence"]
+            print(
+                f"[{_clock(segment['start'])}-{_clock(segment['end'])}]"
+                f"{'' if confidence is None else f' ({confidence:.0%})'}"
+                f" {segment['text'].strip()}"
+            )
+        return
+
+    results = archive.search(args.query, args.limit)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    elif not results:
+        print("No matching meetings.")
+    else:
+        print("\n\n".join(format_result(result) for result in results))
+
+
+if __name__ == "__main__":
+    main()
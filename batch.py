@@ -0,0 +1,225 @@
+"""
+Batch mode: summarize a directory or glob of recordings from the command line.
+
+Transcription runs on the Whisper process pool while files that are already
+transcribed are refined and summarized concurrently on the event loop, so both
+stages stay busy. Each result is appended to ``summaries.jsonl`` as it
+finishes, with one Markdown file per recording and a throughput report.
+
+Usage:
+    python batch.py sample-meetings/ --output batch-output/
+    python batch.py "recordings/**/*.mp3" -o out --summary-concurrency 8
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+from collections import Counter
+from typing import Any
+
+from config.settings import settings, validate_environment
+from main import get_archive, prepare_transcript
+from tools import speechToTextTool
+from tools.speechToTextTool import get_transcript_cache, preload_models
+from tools.summaryTool import summaryToolAsync
+from utils.executors import shutdown_executors
+from utils.file_utils import validate_audio_file
+from utils.getMarkdown import generate_markdown_summary
+from utils.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def find_recordings(patterns: list[str]) -> list[str]:
+    """Expand directories (recursively) and glob patterns into audio files."""
+    found: list[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*"), recursive=True)
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        found.extend(
+            path
+            for path in matches
+            if os.path.isfile(path)
+            and os.path.splitext(path)[1].lower() in settings.SUPPORTED_FORMATS
+        )
+    # Overlapping inputs may match a file more than once.
+    return sorted({os.path.abspath(path) for path in found})
+
+
+def _output_names(paths: list[str]) -> dict[str, str]:
+    """Markdown file stems, disambiguating recordings with the same name."""
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    counts = Counter(stems)
+    seen: Counter = Counter()
+    names = {}
+    for path, stem in zip(paths, stems, strict=True):
+        seen[stem] += 1
+        names[path] = stem if counts[stem] == 1 else f"{stem}-{seen[stem]}"
+    return names
+
+
+async def _process_file(
+    path: str,
+    transcription_slots: asyncio.Semaphore,
+    summary_slots: asyncio.Semaphore,
+) -> dict[str, Any]:
+    record: dict[str, Any] = {
+        "file": path,
+        "success": False,
+        "audio_seconds": 0.0,
+        "timings": {},
+    }
+    if not await asyncio.to_thread(validate_audio_file, path):
+        record["error"] = "Unsupported file type, file too large or recording too long"
+        return record
+
+    async with transcription_slots:
+        started = time.perf_counter()
+        transcript = await asyncio.to_thread(speechToTextTool, path)
+        record["timings"]["transcribe_seconds"] = time.perf_counter() - started
+    if not transcript.get("success", False):
+        record["error"] = transcript.get("error", "Transcription failed")
+        return record
+    record["audio_seconds"] = transcript.get("duration", 0.0)
+    record["language"] = transcript.get("language")
+    if "vad" in transcript:
+        record["skipped_audio_seconds"] = transcript["vad"]["skipped_seconds"]
+
+    # The transcription slot is free again, so the next file is already being
+    # transcribed while this one is summarized.
+    async with summary_slots:
+        started = time.perf_counter()
+        prepared, stage_stats = await prepare_transcript(transcript["text"])
+        record["timings"]["prepare_seconds"] = time.perf_counter() - started
+        record["stages"] = stage_stats
+
+        started = time.perf_counter()
+        record["summary"] = await summaryToolAsync(prepared)
+        record["timings"]["summary_seconds"] = time.perf_counter() - started
+    archive = get_archive()
+    if archive is not None:
+        try:
+            key = await asyncio.to_thread(get_transcript_cache().hash_file, path)
+            await asyncio.to_thread(
+                archive.add,
+                key,
+                transcript["text"],
+                record["summary"],
+                audio_path=path,
+                segments=transcript.get("segments"),
+            )
+        except Exception as e:
+            logger.error(f"Failed to archive {path}: {e}")
+    record["success"] = True
+    return record
+
+
+async def run_batch(
+    paths: list[str], output_dir: str, summary_concurrency: int
+) -> dict[str, Any]:
+    """Summarize ``paths`` into ``output_dir`` and return the throughput report."""
+    os.makedirs(output_dir, exist_ok=True)
+    names = _output_names(paths)
+    transcription_slots = asyncio.Semaphore(max(1, settings.WHISPER_WORKERS))
+    summary_slots = asyncio.Semaphore(max(1, summary_concurrency))
+
+    async def guarded(path: str) -> dict[str, Any]:
+        try:
+            return await _process_file(path, transcription_slots, summary_slots)
+        except Exception as e:
+            logger.error(f"Failed to summarize {path}: {e}")
+            return {
+                "file": path,
+                "success": False,
+                "audio_seconds": 0.0,
+                "error": str(e),
+            }
+
+    started = time.perf_counter()
+    records = []
+    with open(
+        os.path.join(output_dir, "summaries.jsonl"), "a", encoding="utf-8"
+    ) as jsonl:
+        for done in asyncio.as_completed([guarded(path) for path in paths]):
+            record = await done
+            records.append(record)
+            jsonl.write(json.dumps(record) + "\n")
+            jsonl.flush()
+            if record["success"]:
+                markdown_path = os.path.join(output_dir, f"{names[record['file']]}.md")
+                with open(markdown_path, "w", encoding="utf-8") as f:
+                    f.write(generate_markdown_summary(record["summary"]))
+            logger.info(
+                f"[{len(records)}/{len(paths)}] "
+                f"{'✅' if record['success'] else '❌'} {record['file']}"
+            )
+    wall_seconds = time.perf_counter() - started
+
+    succeeded = [r for r in records if r["success"]]
+    audio_seconds = sum(r["audio_seconds"] for r in succeeded)
+    wall_hours = wall_seconds / 3600 or 1e-9
+    report = {
+        "files": len(records),
+        "succeeded": len(succeeded),
+        "failed": len(records) - len(succeeded),
+        "wall_seconds": round(wall_seconds, 2),
+        "audio_hours": round(audio_seconds / 3600, 3),
+        "files_per_hour": round(len(succeeded) / wall_hours, 2),
+        "audio_hours_per_hour": round(audio_seconds / 3600 / wall_hours, 2),
+        "stage_seconds": {
+            stage: round(sum(r["timings"].get(stage, 0.0) for r in succeeded), 2)
+            for stage in ("transcribe_seconds", "prepare_seconds", "summary_seconds")
+        },
+    }
+    with open(os.path.join(output_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Summarize a directory or glob of meeting recordings."
+    )
+    parser.add_argument(
+        "inputs", nargs="+", help="Directories (searched recursively) or globs"
+    )
+    parser.add_argument(
+        "-o", "--output", default="batch-output", help="Output directory"
+    )
+    parser.add_argument(
+        "--summary-concurrency",
+        type=int,
+        default=settings.BATCH_SUMMARY_CONCURRENCY,
+        help="Files refined and summarized at once",
+    )
+    args = parser.parse_args()
+
+    setup_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        log_file=os.getenv("LOG_FILE"),
+    )
+    if not validate_environment():
+        raise SystemExit("Missing required environment variables")
+
+    paths = find_recordings(args.inputs)
+    if not paths:
+        raise SystemExit(f"No supported audio files found in {args.inputs}")
+    logger.info(f"Summarizing {len(paths)} recordings into {args.output}")
+
+    # Start the Whisper workers while the batch is being set up
+    preload_models()
+    try:
+        report = asyncio.run(run_batch(paths, args.output, args.summary_concurrency))
+    finally:
+        shutdown_executors()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
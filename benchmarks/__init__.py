@@ -0,0 +1 @@
+"""Offline, reproducible benchmarks for the summarization pipeline."""
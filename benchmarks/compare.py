@@ -0,0 +1,108 @@
+"""
+Compare two benchmark reports, e.g. from two commits.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from typing import Any
+
+# Metrics where a larger value is worse.
+_LOWER_IS_BETTER = (
+    "seconds",
+    "rtf",
+    "peak_rss_mb",
+    "first_result_seconds",
+    "live_seconds",
+    "ready_seconds",
+)
+
+
+def _rows(report: dict[str, Any]) -> dict[tuple[float, str, str], float]:
+    rows = {}
+    for run in report["runs"]:
+        for stage, result in run["stages"].items():
+            for metric in _LOWER_IS_BETTER:
+                if isinstance(result.get(metric), int | float):
+                    rows[(run["minutes"], stage, metric)] = result[metric]
+    return rows
+
+
+def compare_reports(
+    baseline: dict[str, Any], candidate: dict[str, Any], threshold: float = 0.1
+) -> tuple[list[dict[str, Any]], bool]:
+    """
+    Relative change of every metric present in both reports.
+
+    Returns:
+        Tuple of (rows, regressed) where regressed is True if any metric grew
+        by more than ``threshold`` (0.1 = 10%).
+    """
+    before, after = _rows(baseline), _rows(candidate)
+    rows = []
+    regressed = False
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        change = (new - old) / old if old else 0.0
+        worse = change > threshold
+        regressed = regressed or worse
+        minutes, stage, metric = key
+        rows.append(
+            {
+                "minutes": minutes,
+                "stage": stage,
+                "metric": metric,
+                "baseline": old,
+                "candidate": new,
+                "change": round(change, 4),
+                "regressed": worse,
+            }
+        )
+    return rows, regressed
+
+
+def format_comparison(rows: list[dict[str, Any]]) -> str:
+    lines = [
+        f"{'min':>6}  {'stage':<22} {'metric':<20} {'baseline':>10} "
+        f"{'candidate':>10} {'change':>8}"
+    ]
+    for row in rows:
+        flag = "  ⚠️" if row["regressed"] else ""
+        lines.append(
+            f"{row['minutes']:>6g}  {row['stage']:<22} {row['metric']:<20} "
+            f"{row['baseline']:>10.3f} {row['candidate']:>10.3f} "
+            f"{row['change']:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative slowdown that counts as a regression (default 0.1 = 10%%)",
+    )
+    args = parser.parse_args()
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    rows, regressed = compare_reports(baseline, candidate, args.threshold)
+    print(
+        f"{baseline.get('git', {}).get('commit', args.baseline)} -> "
+        f"{candidate.get('git', {}).get('commit', args.candidate)}"
+    )
+    print(format_comparison(rows))
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Replies are valid ``MeetingSummary`` JSON built from the prompt, paced like a
+real model: ``latency`` seconds plus prompt prefill time before the first
+token, then ``tokens_per_second`` while streaming (or before a non-streamed
+reply returns).
+
+Usage:
+    python -m benchmarks.fake_openai --port 8765 --latency 0.5
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_NAME_RE = re.compile(r"\b([A-Z][a-z]{2,})\b")
+_CHUNK_CHARS = 16  # characters per streamed delta, about four tokens
+
+
+@dataclass
+class FakeModelConfig:
+    latency: float = 0.3
+    prefill_tokens_per_second: float = 5000
+    tokens_per_second: float = 80
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _fake_summary(prompt: str) -> str:
+    names = sorted(set(_NAME_RE.findall(prompt)))[:6] or ["Participant"]
+    return json.dumps(
+        {
+            "agenda": ["Status updates", "Blockers", "Next steps"],
+            "participants": names,
+            "topics": ["Project status", "Testing", "Release planning"],
+            "summary": (
+                "The team reviewed progress on current work, discussed blockers "
+                "and agreed on owners and deadlines for the open items."
+            ),
+            "key_points": [
+                "Most work is on track",
+                "A few bugs remain before QA",
+            ],
+            "action_items": [f"{name} to follow up on open items" for name in names],
+            "decisions": ["Prioritize fixes that affect users"],
+            "next_steps": ["Re-run the regression suite after fixes"],
+        }
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    config: FakeModelConfig
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        prompt = "\n".join(
+            str(message.get("content") or "") for message in request["messages"]
+        )
+        content = _fake_summary(prompt)
+        usage = {
+            "prompt_tokens": _estimate_tokens(prompt),
+            "completion_tokens": _estimate_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = request.get("model", "fake")
+        time.sleep(
+            self.config.latency
+            + usage["prompt_tokens"] / self.config.prefill_tokens_per_second
+        )
+
+        if not request.get("stream"):
+            time.sleep(usage["completion_tokens"] / self.config.tokens_per_second)
+            self._send_json(
+                200,
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": content},
+                        }
+                    ],
+                    "usage": usage,
+                },
+            )
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send(chunk: dict) -> None:
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        base = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+        }
+        delay = _estimate_tokens("x" * _CHUNK_CHARS) / self.config.tokens_per_second
+        for start in range(0, len(content), _CHUNK_CHARS):
+            delta = {"content": content[start : start + _CHUNK_CHARS]}
+            send({**base, "choices": [{"index": 0, "delta": delta}]})
+            time.sleep(delay)
+        send({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if request.get("stream_options", {}).get("include_usage"):
+            send({**base, "choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def start_fake_openai(
+    config: FakeModelConfig, host: str = "127.0.0.1", port: int = 0
+) -> tuple[ThreadingHTTPServer, str]:
+    """Serve the fake API from a daemon thread; returns (server, base_url)."""
+    handler = type("FakeOpenAIHandler", (_Handler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=FakeModelConfig.latency)
+    parser.add_argument(
+        "--prefill-tokens-per-second",
+        type=float,
+        default=FakeModelConfig.prefill_tokens_per_second,
+    )
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=FakeModelConfig.tokens_per_second
+    )
+    args = parser.parse_args()
+    config = FakeModelConfig(
+        args.latency, args.prefill_tokens_per_second, args.tokens_per_second
+    )
+    server, url = start_fake_openai(config, args.host, args.port)
+    print(f"Fake OpenAI API listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
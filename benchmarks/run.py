@@ -0,0 +1,339 @@
+"""
+Offline pipeline benchmark.
+
+Generates synthetic meetings of the requested lengths, runs each stage and the
+end-to-end ``summaryAgent`` against a local fake OpenAI server, and writes
+latency, throughput, peak RSS and Whisper real-time factor to a JSON report.
+Transcript and LLM caches are disabled so every run does the full work.
+
+Usage:
+    python -m benchmarks.run --minutes 1 5 --repeat 3 -o benchmark-report.json
+    python -m benchmarks.run --minutes 5 --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.compare import compare_reports, format_comparison
+from benchmarks.fake_openai import FakeModelConfig, start_fake_openai
+from benchmarks.synthetic_meeting import generate_script, write_meeting_audio
+
+STAGES = ("transcribe", "refine", "summarize", "markdown", "end_to_end")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _process_tree_rss(pid: int) -> int:
+    """Resident bytes of ``pid`` and its descendants (Linux /proc)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            total = int(f.read().split()[1]) * _PAGE_SIZE
+        children: list[str] = []
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(f.read().split())
+    except OSError:
+        return 0
+    return total + sum(_process_tree_rss(int(child)) for child in children)
+
+
+class PeakRSS:
+    """Sample the peak resident memory of this process tree while active."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while True:
+            self.peak_bytes = max(self.peak_bytes, _process_tree_rss(os.getpid()))
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self) -> "PeakRSS":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        if not self.peak_bytes and resource is not None:
+            # No /proc: fall back to the lifetime peak (KiB on Linux, bytes on macOS).
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak_bytes = maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    @property
+    def peak_mb(self) -> float:
+        return round(self.peak_bytes / (1024 * 1024), 1)
+
+
+def _configure_environment(base_url: str, work_dir: str) -> None:
+    """Point the app at the fake server and a scratch job store, caches and archive off."""
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["TRANSCRIPT_CACHE_ENABLED"] = "false"
+    os.environ["ARCHIVE_ENABLED"] = "false"
+    os.environ["JOB_STORE_PATH"] = os.path.join(work_dir, "jobs.sqlite3")
+    os.environ["JOB_AUDIO_DIR"] = os.path.join(work_dir, "job_audio")
+
+
+def _git_info() -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+async def _measure(
+    fn: Callable[[], Awaitable[dict[str, Any]]], repeat: int
+) -> dict[str, Any]:
+    """Run ``fn`` ``repeat`` times; median latency, peak RSS, last run's extras."""
+    samples = []
+    peak_mb = 0.0
+    extras: dict[str, Any] = {}
+    for _ in range(repeat):
+        with PeakRSS() as rss:
+            started = time.perf_counter()
+            extras = await fn()
+            samples.append(time.perf_counter() - started)
+        peak_mb = max(peak_mb, rss.peak_mb)
+    return {
+        "seconds": round(statistics.median(samples), 4),
+        "samples": [round(s, 4) for s in samples],
+        "peak_rss_mb": peak_mb,
+        **extras,
+    }
+
+
+async def benchmark_meeting(
+    minutes: float, stages: list[str], repeat: int, work_dir: str, voice: str
+) -> dict[str, Any]:
+    # Imported here so the environment is configured before settings load.
+    from main import prepare_transcript, summaryAgent
+    from tools.speechToTextTool import speechToTextTool
+    from tools.summaryTool import summaryToolAsync
+    from utils.getMarkdown import generate_markdown_summary
+    from utils.token_utils import count_tokens
+
+    script = generate_script(minutes, seed=int(minutes * 1000))
+    audio_path = os.path.join(work_dir, f"meeting-{minutes:g}min.wav")
+    audio_seconds, voice_used = write_meeting_audio(script, audio_path, voice)
+    run: dict[str, Any] = {
+        "minutes": minutes,
+        "audio_seconds": round(audio_seconds, 2),
+        "voice": voice_used,
+        "words": len(script.split()),
+        "stages": {},
+    }
+    # Text stages use the reference script so they don't depend on Whisper.
+    state: dict[str, Any] = {"refined": None, "summary": None}
+
+    async def transcribe() -> dict[str, Any]:
+        result = await asyncio.to_thread(speechToTextTool, audio_path)
+        if not result.get("success", False):
+            raise RuntimeError(result.get("error", "Transcription failed"))
+        return {"words": len(result["text"].split())}
+
+    async def refine() -> dict[str, Any]:
+        state["refined"], _ = await prepare_transcript(script)
+        return {"words": len(state["refined"].split())}
+
+    async def summarize() -> dict[str, Any]:
+        if state["refined"] is None:
+            state["refined"], _ = await prepare_transcript(script)
+        state["summary"] = await summaryToolAsync(state["refined"])
+        return {"input_tokens": count_tokens(state["refined"])}
+
+    async def markdown() -> dict[str, Any]:
+        if state["summary"] is None:
+            await summarize()
+        return {"characters": len(generate_markdown_summary(state["summary"]))}
+
+    async def end_to_end() -> dict[str, Any]:
+        started = time.perf_counter()
+        first_result = None
+        final = None
+        async for status, accumulated in summaryAgent(audio_path):
+            if accumulated is not None:
+                first_result = first_result or time.perf_counter() - started
+                final = accumulated
+            if status.startswith("❌"):
+                raise RuntimeError(status)
+        if final is None:
+            raise RuntimeError("summaryAgent produced no summary")
+        return {"first_result_seconds": round(first_result, 4)}
+
+    runners = {
+        "transcribe": transcribe,
+        "refine": refine,
+        "summarize": summarize,
+        "markdown": markdown,
+        "end_to_end": end_to_end,
+    }
+    for stage in stages:
+        try:
+            result = await _measure(runners[stage], repeat)
+        except Exception as e:
+            print(f"  {stage}: failed ({e})", file=sys.stderr)
+            run["stages"][stage] = {"error": str(e)}
+            continue
+        if stage in ("transcribe", "end_to_end"):
+            result["rtf"] = round(result["seconds"] / audio_seconds, 4)
+            result["audio_seconds_per_second"] = round(
+                audio_seconds / result["seconds"], 2
+            )
+        elif stage in ("refine", "summarize"):
+            result["words_per_second"] = round(run["words"] / result["seconds"], 1)
+        run["stages"][stage] = result
+        print(f"  {stage}: {result['seconds']:.3f}s", file=sys.stderr)
+    return run
+
+
+async def run_benchmarks(args: argparse.Namespace, work_dir: str) -> dict[str, Any]:
+    from config.settings import settings
+
+    report: dict[str, Any] = {
+        "version": 1,
+        "created_at": datetime.datetime.now(datetime.UTC).isoformat(),
+        "git": _git_info(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "fake_openai": {
+                "latency": args.latency,
+                "prefill_tokens_per_second": args.prefill_tokens_per_second,
+                "tokens_per_second": args.tokens_per_second,
+            },
+            "repeat": args.repeat,
+            "transcription_engine": settings.TRANSCRIPTION_ENGINE,
+            "whisper_model": settings.WHISPER_MODEL,
+            "whisper_chunked": settings.WHISPER_CHUNKED,
+            "whisper_workers": settings.WHISPER_WORKERS,
+            "whisper_streaming": settings.WHISPER_STREAMING,
+            "vad_enabled": settings.VAD_ENABLED,
+            "summary_model": settings.OPENAI_MODEL,
+            "summary_streaming": settings.SUMMARY_STREAMING,
+            "summary_overlapped": settings.SUMMARY_OVERLAPPED,
+        },
+        "runs": [],
+    }
+    if args.warmup and {"transcribe", "end_to_end"} & set(args.stages):
+        # Load the Whisper model (and start the workers) outside the timings.
+        from tools.speechToTextTool import speechToTextTool
+
+        warmup_path = os.path.join(work_dir, "warmup.wav")
+        write_meeting_audio(generate_script(0.1), warmup_path, args.voice)
+        with PeakRSS() as rss:
+            started = time.perf_counter()
+            await asyncio.to_thread(speechToTextTool, warmup_path)
+            report["warmup"] = {
+                "seconds": round(time.perf_counter() - started, 4),
+            }
+        report["warmup"]["peak_rss_mb"] = rss.peak_mb
+
+    for minutes in args.minutes:
+        print(f"Benchmarking a {minutes:g} minute meeting", file=sys.stderr)
+        report["runs"].append(
+            await benchmark_meeting(
+                minutes, args.stages, args.repeat, work_dir, args.voice
+            )
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark")
+    parser.add_argument(
+        "--minutes", type=float, nargs="+", default=[1.0], help="Meeting lengths"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per stage")
+    parser.add_argument(
+        "--stages", nargs="+", choices=STAGES, default=list(STAGES), metavar="STAGE"
+    )
+    parser.add_argument(
+        "--voice",
+        choices=("auto", "espeak", "babble"),
+        default="auto",
+        help="Audio synthesis: espeak if installed, else formant babble",
+    )
+    parser.add_argument(
+        "--no-warmup",
+        dest="warmup",
+        action="store_false",
+        help="Include Whisper model loading in the first transcription",
+    )
+    parser.add_argument("-o", "--output", default="benchmark-report.json")
+    parser.add_argument("--latency", type=float, default=FakeModelConfig.latency)
+    parser.add_argument(
+        "--prefill-tokens-per-second",
+        type=float,
+        default=FakeModelConfig.prefill_tokens_per_second,
+    )
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=FakeModelConfig.tokens_per_second
+    )
+    parser.add_argument("--compare", help="Baseline report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    config = FakeModelConfig(
+        args.latency, args.prefill_tokens_per_second, args.tokens_per_second
+    )
+    server, base_url = start_fake_openai(config)
+    with tempfile.TemporaryDirectory(prefix="summarizer-bench-") as work_dir:
+        _configure_environment(base_url, work_dir)
+        try:
+            report = asyncio.run(run_benchmarks(args, work_dir))
+        finally:
+            server.shutdown()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressed = compare_reports(baseline, report, args.threshold)
+        print(format_comparison(rows))
+        sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
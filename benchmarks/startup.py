@@ -0,0 +1,252 @@
+"""
+Start-up benchmark.
+
+Measures how long the entry points take to import, and how long ``api.py``
+(and ``ui.py`` when Gradio is installed) take to answer ``/healthz`` (live)
+and ``/readyz`` (warmed up) when started as fresh processes. The report uses
+the same layout as ``benchmarks.run`` so ``benchmarks.compare`` works on it;
+start-up stages are recorded under ``minutes`` 0.
+
+Usage:
+    python -m benchmarks.startup --repeat 5 -o startup-report.json
+    python -m benchmarks.startup --compare startup-baseline.json
+"""
+
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Any
+
+from benchmarks.compare import compare_reports, format_comparison
+from benchmarks.run import _git_info
+
+STAGES = ("import_tools", "import_main", "import_api", "api", "ui")
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def _environment(work_dir: str, **overrides: str) -> dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    env["JOB_STORE_PATH"] = os.path.join(work_dir, "jobs.sqlite3")
+    env["API_UPLOAD_DIR"] = os.path.join(work_dir, "uploads")
+    env["ARCHIVE_ENABLED"] = "false"
+    env.update(overrides)
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _status(url: str) -> int | None:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def measure_import(module: str, repeat: int, work_dir: str) -> dict[str, Any]:
+    """Median time to import ``module`` in a fresh interpreter."""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SNIPPET.format(module=module)],
+            cwd=_ROOT,
+            env=_environment(work_dir),
+            capture_output=True,
+            text=True,
+        )
+        if output.returncode:
+            return {"error": output.stderr.strip().splitlines()[-1]}
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": round(statistics.median(samples), 4),
+        "samples": [round(s, 4) for s in samples],
+    }
+
+
+def measure_server(
+    command: list[str],
+    live_url: str,
+    ready_url: str,
+    env: dict[str, str],
+    timeout: float,
+) -> dict[str, Any]:
+    """Start ``command`` and time until ``live_url`` and ``ready_url`` return 200."""
+    result: dict[str, Any] = {}
+    started = time.perf_counter()
+    with subprocess.Popen(
+        command,
+        cwd=_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    ) as process:
+        try:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    result["error"] = f"Exited with code {process.returncode}"
+                    break
+                if "live_seconds" not in result and _status(live_url) == 200:
+                    result["live_seconds"] = round(time.perf_counter() - started, 4)
+                if "live_seconds" in result and _status(ready_url) == 200:
+                    result["ready_seconds"] = round(time.perf_counter() - started, 4)
+                    break
+                time.sleep(0.05)
+            else:
+                result["error"] = f"Not ready after {timeout:g}s"
+            if "error" in result and "live_seconds" in result:
+                try:
+                    with urllib.request.urlopen(ready_url, timeout=1) as response:
+                        result["readiness"] = json.load(response)
+                except urllib.error.HTTPError as e:
+                    result["readiness"] = json.load(e)
+                except OSError:
+                    pass
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    return result
+
+
+def _median_server(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    result: dict[str, Any] = {"samples": runs}
+    for key in ("live_seconds", "ready_seconds"):
+        values = [run[key] for run in runs if key in run]
+        if values:
+            result[key] = round(statistics.median(values), 4)
+    return result
+
+
+def run_benchmarks(args: argparse.Namespace, work_dir: str) -> dict[str, Any]:
+    from config.settings import settings
+
+    stages: dict[str, Any] = {}
+    for stage, module in (
+        ("import_tools", "tools"),
+        ("import_main", "main"),
+        ("import_api", "api"),
+    ):
+        if stage in args.stages:
+            print(f"Timing import {module}", file=sys.stderr)
+            stages[stage] = measure_import(module, args.repeat, work_dir)
+
+    if "api" in args.stages:
+        print("Timing api.py start-up", file=sys.stderr)
+        runs = []
+        for _ in range(args.repeat):
+            port = _free_port()
+            base = f"http://127.0.0.1:{port}"
+            env = _environment(work_dir, API_HOST="127.0.0.1", API_PORT=str(port))
+            runs.append(
+                measure_server(
+                    [sys.executable, "api.py"],
+                    f"{base}/healthz",
+                    f"{base}/readyz",
+                    env,
+                    args.timeout,
+                )
+            )
+        stages["api"] = _median_server(runs)
+
+    if "ui" in args.stages and importlib.util.find_spec("gradio"):
+        print("Timing ui.py start-up", file=sys.stderr)
+        runs = []
+        for _ in range(args.repeat):
+            port, metrics_port = _free_port(), _free_port()
+            env = _environment(
+                work_dir,
+                PORT=str(port),
+                METRICS_ENABLED="true",
+                METRICS_HOST="127.0.0.1",
+                METRICS_PORT=str(metrics_port),
+                GRADIO_SHARE="false",
+            )
+            runs.append(
+                measure_server(
+                    [sys.executable, "ui.py"],
+                    f"http://127.0.0.1:{port}/",
+                    f"http://127.0.0.1:{metrics_port}/readyz",
+                    env,
+                    args.timeout,
+                )
+            )
+        stages["ui"] = _median_server(runs)
+
+    return {
+        "version": 1,
+        "created_at": datetime.datetime.now(datetime.UTC).isoformat(),
+        "git": _git_info(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "repeat": args.repeat,
+            "warmup_enabled": settings.WARMUP_ENABLED,
+            "transcription_engine": settings.TRANSCRIPTION_ENGINE,
+            "whisper_preload_models": settings.WHISPER_PRELOAD_MODELS,
+            "whisper_workers": settings.WHISPER_WORKERS,
+        },
+        "runs": [{"minutes": 0, "stages": stages}],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Start-up benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage")
+    parser.add_argument(
+        "--stages", nargs="+", choices=STAGES, default=list(STAGES), metavar="STAGE"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=300,
+        help="Seconds to wait for a server to become ready",
+    )
+    parser.add_argument("-o", "--output", default="startup-report.json")
+    parser.add_argument("--compare", help="Baseline report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="summarizer-startup-") as work_dir:
+        report = run_benchmarks(args, work_dir)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressed = compare_reports(baseline, report, args.threshold)
+        print(format_comparison(rows))
+        sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Deterministic synthetic meetings: a scripted transcript and matching audio.
+
+Audio is rendered with ``espeak-ng``/``espeak`` when one is installed, so
+Whisper has real speech to decode. Otherwise a formant "babble" voice is
+synthesized with NumPy: it has the rhythm, pitch and spectrum of speech, which
+is enough to time every stage, but Whisper's output on it is meaningless.
+"""
+
+import random
+import shutil
+import subprocess
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+WORDS_PER_MINUTE = 150
+
+_NAMES = ["Alice", "Bob", "Carol", "David", "Eve", "Frank", "Grace", "Raj"]
+_TOPICS = [
+    "the onboarding flow",
+    "the analytics dashboard",
+    "the payment API",
+    "the mobile release",
+    "customer feedback",
+    "the caching layer",
+    "the design system",
+    "load testing",
+]
+_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "next week"]
+_TEMPLATES = [
+    "{other}, can you give us an update on {topic}?",
+    "I finished the first part of {topic} yesterday and I'm testing it today.",
+    "We ran into a couple of bugs with {topic}, but they should be fixed soon.",
+    "I will prepare a summary of {topic} and send it out by {day}.",
+    "Let's make sure {topic} is ready for QA before {day}.",
+    "I think we should prioritize {topic} because it affects most users.",
+    "{other} and I agreed to pair on {topic} this afternoon.",
+    "We decided to postpone the rest of {topic} until {day}.",
+    "Does anyone have concerns about the timeline for {topic}?",
+    "The numbers on {topic} look better than last sprint.",
+    "Um, so, yeah, I think {topic} is mostly on track, you know.",
+    "Action item for {other}: follow up with the vendor about {topic}.",
+]
+
+# Vowel formants (F1, F2, F3) in Hz for the babble voice.
+_VOWELS = [(730, 1090, 2440), (270, 2290, 3010), (530, 1840, 2480), (300, 870, 2240)]
+
+
+def generate_script(minutes: float, seed: int = 0) -> str:
+    """A meeting transcript of roughly ``minutes`` at a typical speaking rate."""
+    rng = random.Random(seed)
+    participants = rng.sample(_NAMES, 4)
+    target_words = int(minutes * WORDS_PER_MINUTE)
+    lines = [f"{participants[0]}: Alright everyone, let's get started."]
+    words = len(lines[0].split())
+    while words < target_words:
+        speaker, other = rng.sample(participants, 2)
+        sentences = [
+            rng.choice(_TEMPLATES).format(
+                other=other, topic=rng.choice(_TOPICS), day=rng.choice(_DAYS)
+            )
+            for _ in range(rng.randint(1, 3))
+        ]
+        line = f"{speaker}: {' '.join(sentences)}"
+        lines.append(line)
+        words += len(line.split())
+    return "\n".join(lines)
+
+
+def _babble(script: str, seconds: float, seed: int) -> np.ndarray:
+    """Formant-synthesized speech-like audio for ``script`` lasting ``seconds``."""
+    rng = np.random.default_rng(seed)
+    words = script.split()
+    pause = int(0.08 * SAMPLE_RATE)
+    word_samples = max(1, int(seconds * SAMPLE_RATE / max(1, len(words))) - pause)
+    t = np.arange(word_samples) / SAMPLE_RATE
+    envelope = np.sin(np.pi * np.arange(word_samples) / word_samples) ** 0.5
+    silence = np.zeros(pause, dtype=np.float32)
+
+    pieces = []
+    for word in words:
+        f0 = rng.uniform(100, 220) * (1.1 if word.endswith("?") else 1.0)
+        formants = _VOWELS[rng.integers(len(_VOWELS))]
+        harmonics = np.arange(1, int(4000 / f0))
+        # Harmonics of the pitch, shaped by three formant resonances.
+        gains = sum(
+            np.exp(-(((harmonics * f0) - formant) ** 2) / (2 * 120.0**2))
+            for formant in formants
+        )
+        voiced = np.sin(2 * np.pi * f0 * np.outer(t, harmonics)) @ gains
+        voiced = voiced / (np.abs(voiced).max() or 1)
+        pieces.append((0.3 * envelope * voiced).astype(np.float32))
+        pieces.append(silence)
+    audio = np.concatenate(pieces) if pieces else silence
+    return audio + rng.normal(0, 0.003, len(audio)).astype(np.float32)
+
+
+def _espeak_binary() -> str | None:
+    return shutil.which("espeak-ng") or shutil.which("espeak")
+
+
+def write_meeting_audio(
+    script: str, path: str, voice: str = "auto", seed: int = 0
+) -> tuple[float, str]:
+    """
+    Render ``script`` to a 16 kHz mono WAV file at ``path``.
+
+    ``voice`` is "espeak", "babble" or "auto" (espeak when installed).
+
+    Returns:
+        Tuple of (audio_seconds, voice_used)
+    """
+    binary = _espeak_binary()
+    if voice == "espeak" and binary is None:
+        raise RuntimeError("espeak-ng (or espeak) is not installed")
+    if voice in ("espeak", "auto") and binary is not None:
+        speech = subprocess.run(
+            [binary, "-s", str(WORDS_PER_MINUTE), "--stdout", "--stdin"],
+            input=script.encode(),
+            check=True,
+            capture_output=True,
+        ).stdout
+        # espeak speaks at 22050 Hz; resample to what Whisper decodes.
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-y",
+                "-v",
+                "error",
+                "-i",
+                "pipe:0",
+                "-ac",
+                "1",
+                "-ar",
+                str(SAMPLE_RATE),
+                path,
+            ],
+            input=speech,
+            check=True,
+            capture_output=True,
+        )
+        with wave.open(path, "rb") as f:
+            return f.getnframes() / f.getframerate(), "espeak"
+
+    seconds = len(script.split()) / WORDS_PER_MINUTE * 60
+    audio = _babble(script, seconds, seed)
+    pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+    return len(pcm) / SAMPLE_RATE, "babble"
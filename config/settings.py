@@ -14,14 +14,226 @@ class Settings:
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o")
     OPENAI_TEMPERATURE: float = float(os.getenv("OPENAI_TEMPERATURE", "0.2"))
+    # HTTP connection pool shared by all OpenAI calls.
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10")
+    )
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "120"))
+    # Requests- and tokens-per-minute budgets (0 disables the limit).
+    OPENAI_RPM: int = int(os.getenv("OPENAI_RPM", "0"))
+    OPENAI_TPM: int = int(os.getenv("OPENAI_TPM", "0"))
+    # Completion tokens reserved against OPENAI_TPM when max_tokens is unset.
+    OPENAI_EXPECTED_COMPLETION_TOKENS: int = int(
+        os.getenv("OPENAI_EXPECTED_COMPLETION_TOKENS", "1000")
+    )
+    # Retries on 429, timeouts, connection and 5xx errors with jittered
+    # exponential backoff (Retry-After wins when the API sends it).
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+    OPENAI_BACKOFF_BASE: float = float(os.getenv("OPENAI_BACKOFF_BASE", "1.0"))
+    OPENAI_BACKOFF_MAX: float = float(os.getenv("OPENAI_BACKOFF_MAX", "60"))
+
+    # Summary Settings
+    # Transcripts longer than SUMMARY_CHUNK_TOKENS are summarized in chunks
+    # (map) and merged (reduce) either deterministically ("merge") or by one
+    # more LLM call ("llm").
+    SUMMARY_CHUNK_TOKENS: int = int(os.getenv("SUMMARY_CHUNK_TOKENS", "12000"))
+    SUMMARY_CHUNK_OVERLAP_TOKENS: int = int(
+        os.getenv("SUMMARY_CHUNK_OVERLAP_TOKENS", "200")
+    )
+    SUMMARY_MAP_CONCURRENCY: int = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
+    SUMMARY_REDUCE_MODE: str = os.getenv("SUMMARY_REDUCE_MODE", "merge").lower()
+    # "json_schema" (native structured output), "json_object" or "text".
+    SUMMARY_RESPONSE_FORMAT: str = os.getenv(
+        "SUMMARY_RESPONSE_FORMAT", "json_schema"
+    ).lower()
+    # Re-asks after a reply that can't be repaired into a valid summary.
+    SUMMARY_REPAIR_ATTEMPTS: int = int(os.getenv("SUMMARY_REPAIR_ATTEMPTS", "1"))
+    # Stream the summary and render sections in the UI as they complete.
+    SUMMARY_STREAMING: bool = os.getenv("SUMMARY_STREAMING", "true").lower() == "true"
+    # Summarize chunked transcripts segment by segment while Whisper runs.
+    SUMMARY_OVERLAPPED: bool = (
+        os.getenv("SUMMARY_OVERLAPPED", "false").lower() == "true"
+    )
+    SUMMARY_OVERLAP_SEGMENT_TOKENS: int = int(
+        os.getenv("SUMMARY_OVERLAP_SEGMENT_TOKENS", "2000")
+    )
+
+    # Transcription Settings
+    # "whisper" (openai-whisper, PyTorch) or "faster-whisper" (CTranslate2,
+    # quantized CPU inference).
+    TRANSCRIPTION_ENGINE: str = os.getenv("TRANSCRIPTION_ENGINE", "whisper").lower()
+    FASTER_WHISPER_COMPUTE_TYPE: str = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+    FASTER_WHISPER_CPU_THREADS: int = int(os.getenv("FASTER_WHISPER_CPU_THREADS", "0"))
+    FASTER_WHISPER_BEAM_SIZE: int = int(os.getenv("FASTER_WHISPER_BEAM_SIZE", "5"))
 
     # Whisper Settings
     WHISPER_MODEL: str = os.getenv("WHISPER_MODEL", "base")
+    # Size of the transcription process pool (0 runs Whisper in-process).
+    # Each worker loads its own copy of the model, so raise it with care.
+    WHISPER_WORKERS: int = int(os.getenv("WHISPER_WORKERS", "1"))
+    # Chunked mode splits long recordings into overlapping windows that are
+    # transcribed in parallel on the process pool.
+    WHISPER_CHUNKED: bool = os.getenv("WHISPER_CHUNKED", "false").lower() == "true"
+    WHISPER_CHUNK_SECONDS: float = float(os.getenv("WHISPER_CHUNK_SECONDS", "60"))
+    WHISPER_CHUNK_OVERLAP_SECONDS: float = float(
+        os.getenv("WHISPER_CHUNK_OVERLAP_SECONDS", "3")
+    )
+    # Decode audio from ffmpeg in blocks instead of loading the whole file, and
+    # cap the decoded audio one job holds (buffer plus queued windows).
+    # Recordings too long to decode whole within the cap are always chunked.
+    WHISPER_STREAMING: bool = os.getenv("WHISPER_STREAMING", "true").lower() == "true"
+    WHISPER_JOB_MEMORY_MB: float = float(os.getenv("WHISPER_JOB_MEMORY_MB", "256"))
+    # Models loaded in the background at startup (comma separated) and the
+    # memory budget for resident models before least-recently-used eviction.
+    WHISPER_PRELOAD_MODELS: list = [
+        name.strip()
+        for name in os.getenv("WHISPER_PRELOAD_MODELS", WHISPER_MODEL).split(",")
+        if name.strip()
+    ]
+    WHISPER_POOL_MAX_MB: float = float(os.getenv("WHISPER_POOL_MAX_MB", "4096"))
+
+    # Voice-activity detection: silence and hold music are cut before Whisper.
+    # Frames must be VAD_ENERGY_THRESHOLD_DB above the noise floor and vary in
+    # loudness by VAD_MIN_MODULATION_DB over a second; pauses shorter than
+    # VAD_MIN_SILENCE_MS are kept and speech is padded by VAD_PAD_MS.
+    VAD_ENABLED: bool = os.getenv("VAD_ENABLED", "false").lower() == "true"
+    VAD_FRAME_MS: int = int(os.getenv("VAD_FRAME_MS", "30"))
+    VAD_ENERGY_THRESHOLD_DB: float = float(os.getenv("VAD_ENERGY_THRESHOLD_DB", "12"))
+    VAD_MIN_MODULATION_DB: float = float(os.getenv("VAD_MIN_MODULATION_DB", "3"))
+    VAD_MIN_SPEECH_MS: int = int(os.getenv("VAD_MIN_SPEECH_MS", "250"))
+    VAD_MIN_SILENCE_MS: int = int(os.getenv("VAD_MIN_SILENCE_MS", "1000"))
+    VAD_PAD_MS: int = int(os.getenv("VAD_PAD_MS", "300"))
+
+    # Hallucination-loop removal: blocks of up to DEDUP_MAX_PERIOD sentences
+    # repeated DEDUP_MIN_REPEATS+ times in a row are kept once. Off by default,
+    # like the other optional transcript stages.
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "false").lower() == "true"
+    DEDUP_MIN_REPEATS: int = int(os.getenv("DEDUP_MIN_REPEATS", "3"))
+    DEDUP_MAX_PERIOD: int = int(os.getenv("DEDUP_MAX_PERIOD", "4"))
+    DEDUP_SIMILARITY: float = float(os.getenv("DEDUP_SIMILARITY", "0.8"))
+
+    # Extractive pre-compression: keep the top-ranked sentences of long
+    # refined transcripts within EXTRACTIVE_TOKEN_BUDGET before summarizing.
+    # EXTRACTIVE_PREFILL_TOKENS_PER_SECOND only feeds the latency estimate.
+    EXTRACTIVE_COMPRESSION_ENABLED: bool = (
+        os.getenv("EXTRACTIVE_COMPRESSION_ENABLED", "false").lower() == "true"
+    )
+    EXTRACTIVE_TOKEN_BUDGET: int = int(os.getenv("EXTRACTIVE_TOKEN_BUDGET", "4000"))
+    # Sentences with names, dates or action items take at most this share of
+    # the budget, so the rest of the transcript is still ranked.
+    EXTRACTIVE_REQUIRED_SHARE: float = float(
+        os.getenv("EXTRACTIVE_REQUIRED_SHARE", "0.6")
+    )
+    EXTRACTIVE_PREFILL_TOKENS_PER_SECOND: float = float(
+        os.getenv("EXTRACTIVE_PREFILL_TOKENS_PER_SECOND", "2000")
+    )
+
+    # Transcript Cache Settings
+    TRANSCRIPT_CACHE_ENABLED: bool = (
+        os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").lower() == "true"
+    )
+    TRANSCRIPT_CACHE_DIR: str = os.getenv(
+        "TRANSCRIPT_CACHE_DIR", os.path.join(".cache", "transcripts")
+    )
+    TRANSCRIPT_CACHE_MAX_SIZE: int = (
+        int(os.getenv("TRANSCRIPT_CACHE_MAX_SIZE", "500")) * 1024 * 1024
+    )  # 500MB
+
+    # LLM Response Cache Settings
+    # Summaries are cached by model, temperature, system prompt and input;
+    # entries expire after LLM_CACHE_TTL_SECONDS (0 = never) and the least
+    # recently used are dropped beyond LLM_CACHE_MAX_ENTRIES.
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH: str = os.getenv(
+        "LLM_CACHE_PATH", os.path.join(".cache", "llm_responses.sqlite3")
+    )
+    LLM_CACHE_TTL_SECONDS: float = float(
+        os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))
+    )
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+
+    # Job Store Settings
+    # Each pipeline stage is checkpointed so failed or interrupted jobs resume
+    # where they stopped. Running jobs heartbeat every JOB_HEARTBEAT_SECONDS
+    # and count as interrupted after three missed beats.
+    JOB_STORE_BACKEND: str = os.getenv("JOB_STORE_BACKEND", "sqlite").lower()
+    JOB_STORE_PATH: str = os.getenv(
+        "JOB_STORE_PATH", os.path.join(".cache", "jobs.sqlite3")
+    )
+    JOB_HEARTBEAT_SECONDS: float = float(os.getenv("JOB_HEARTBEAT_SECONDS", "5"))
+    JOB_POLL_SECONDS: float = float(os.getenv("JOB_POLL_SECONDS", "1"))
+    # Each job keeps its own copy of the recording here, since it outlives the
+    # upload request; the copy is deleted once the job completes or has used
+    # up its JOB_MAX_ATTEMPTS claims. Jobs refer to it relative to this
+    # directory, so hosts may mount shared storage at different paths.
+    JOB_AUDIO_DIR: str = os.getenv("JOB_AUDIO_DIR", os.path.join(".cache", "job_audio"))
+
+    # Worker Settings (worker.py)
+    # With REMOTE_WORKERS the UI and API only queue jobs; worker processes
+    # claim them with a lease of JOB_LEASE_SECONDS, renewed while they work.
+    # Expired leases are picked up by the next worker, and a job fails once
+    # it has been claimed JOB_MAX_ATTEMPTS times. The SQLite job store and
+    # queue are single-host; workers on other hosts need networked backends
+    # for both and JOB_AUDIO_DIR on shared storage.
+    REMOTE_WORKERS: bool = os.getenv("REMOTE_WORKERS", "false").lower() == "true"
+    JOB_QUEUE_BACKEND: str = os.getenv("JOB_QUEUE_BACKEND", "sqlite").lower()
+    JOB_QUEUE_PATH: str = os.getenv(
+        "JOB_QUEUE_PATH", os.path.join(".cache", "job_queue.sqlite3")
+    )
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "1"))
+
+    # Archive Settings
+    # When enabled, finished meetings are stored with their transcript and
+    # summary in a searchable archive (archive.py, GET /search). Timed
+    # transcript segments go to one compact file per meeting in
+    # ARCHIVE_SEGMENTS_DIR.
+    ARCHIVE_ENABLED: bool = os.getenv("ARCHIVE_ENABLED", "false").lower() == "true"
+    ARCHIVE_PATH: str = os.getenv(
+        "ARCHIVE_PATH", os.path.join(".cache", "archive.sqlite3")
+    )
+    ARCHIVE_SEGMENTS_DIR: str = os.getenv(
+        "ARCHIVE_SEGMENTS_DIR", os.path.join(".cache", "archive-segments")
+    )
+
+    # Observability Settings
+    # Prometheus metrics are served at http://METRICS_HOST:METRICS_PORT/metrics
+    # next to the Gradio app; per-job trace spans are appended to TRACE_FILE
+    # as JSON lines when it is set.
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_HOST: str = os.getenv("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9464"))
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "")
+
+    # Startup Settings
+    # Load Whisper models, the OpenAI client and the tokenizer in the
+    # background once the server is listening; /readyz reports 503 until
+    # they are done. When false, they load on the first request instead.
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+
+    # Concurrency Settings
+    # Files refined and summarized at once by the batch CLI (batch.py).
+    BATCH_SUMMARY_CONCURRENCY: int = int(os.getenv("BATCH_SUMMARY_CONCURRENCY", "4"))
+    # Concurrent UI jobs.
+    UI_CONCURRENCY_LIMIT: int = int(os.getenv("UI_CONCURRENCY_LIMIT", "8"))
 
     # App Settings
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", "50")) * 1024 * 1024  # 50MB
+    # Longest recording accepted, checked with ffprobe (0 = no limit).
+    MAX_AUDIO_MINUTES: float = float(os.getenv("MAX_AUDIO_MINUTES", "240"))
     SUPPORTED_FORMATS: list = [".mp3", ".wav", ".m4a"]
 
+    # Headless API Settings (api.py)
+    # API_WORKERS jobs run at once; up to API_QUEUE_SIZE more wait, and
+    # further submissions get 429 until there is room.
+    API_HOST: str = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT: int = int(os.getenv("API_PORT", "8000"))
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "2"))
+    API_QUEUE_SIZE: int = int(os.getenv("API_QUEUE_SIZE", "16"))
+    API_UPLOAD_DIR: str = os.getenv("API_UPLOAD_DIR", os.path.join(".cache", "uploads"))
+
     # UI Settings
     PORT: int = int(os.getenv("PORT", "7860"))
     _running_in_space_env = os.getenv("RUNNING_IN_SPACE", "")
@@ -1,67 +1,605 @@
+import asyncio
+import contextlib
 import logging
-from collections.abc import AsyncGenerator
+import os
+import shutil
+import uuid
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+from functools import lru_cache
+from typing import Any
+
+from pydantic import ValidationError
 
 # Enhanced main.py with proper typing
-from config.settings import validate_environment
-from tools import speechToTextTool, summaryTool, textRefiningTool
+from config.settings import settings, validate_environment
+from tools import speechToTextTool, textRefiningTool
+from tools.speechToTextTool import (
+    cached_transcript,
+    get_transcript_cache,
+    iter_transcript_windows,
+)
+from tools.summaryTool import (
+    merge_summaries,
+    reduce_summaries,
+    summarize_part,
+    summaryToolAsync,
+    summaryToolStream,
+)
+from utils.archive import MeetingArchive
+from utils.extractive_compression import compress_transcript, extract_names
 from utils.getMarkdown import generate_markdown_summary
+from utils.job_queue import SUMMARIZE, TRANSCRIBE, QueueBackend, get_job_queue
+from utils.job_store import COMPLETED, FAILED, STAGES, JobStore, open_job_store
+from utils.metrics import jobs_total, queue_depth, stage_errors, track_stage
+from utils.segment_dedup import collapse_repeated_segments
+from utils.token_utils import count_tokens
+from utils.tracing import SpanContext, current_span, span
 
 logger = logging.getLogger(__name__)
 
 
-async def summaryAgent(input_path: str) -> AsyncGenerator[tuple[str, str | None], None]:
+# The stores are opened on first use, so importing this module (e.g. for a
+# fast start of ui.py or api.py) doesn't touch disk.
+@lru_cache(maxsize=1)
+def get_job_store() -> JobStore:
+    return open_job_store()
+
+
+@lru_cache(maxsize=1)
+def get_worker_queue() -> QueueBackend | None:
+    """The queue jobs go to for worker.py processes, or None to run them here."""
+    return get_job_queue() if settings.REMOTE_WORKERS else None
+
+
+@lru_cache(maxsize=1)
+def get_archive() -> MeetingArchive | None:
+    if not settings.ARCHIVE_ENABLED:
+        return None
+    return MeetingArchive(settings.ARCHIVE_PATH, settings.ARCHIVE_SEGMENTS_DIR)
+
+
+async def prepare_transcript(transcript_text: str) -> tuple[str, dict[str, Any]]:
+    """
+    Run the text stages between transcription and summarization: hallucination
+    loop removal, refinement and optional extractive compression.
+
+    Returns:
+        Tuple of (prepared_text, stats) where stats holds each optional stage's
+        statistics under "dedup" and "compression" (None when disabled).
+    """
+    stats: dict[str, Any] = {"dedup": None, "compression": None}
+    deduped_text = transcript_text
+    if settings.DEDUP_ENABLED:
+        # Collapse Whisper hallucination loops before they reach the LLM
+        deduped_text, stats["dedup"] = await asyncio.to_thread(
+            collapse_repeated_segments, transcript_text
+        )
+        if stats["dedup"]["removed_segments"]:
+            logger.info(f"Repeated segments removed: {stats['dedup']}")
+
+    refined_text = await asyncio.to_thread(textRefiningTool, deduped_text)
+
+    logger.info(f"original transcript word count: {len(transcript_text.split())}")
+    logger.info(f"Refined transcript word count: {len(refined_text.split())}")
+
+    if settings.EXTRACTIVE_COMPRESSION_ENABLED:
+        # Refinement lowercases, so names come from the raw transcript
+        refined_text, stats["compression"] = await asyncio.to_thread(
+            compress_transcript, refined_text, names=extract_names(deduped_text)
+        )
+        if stats["compression"]["compression_ratio"] < 1:
+            logger.info(f"Transcript compressed: {stats['compression']}")
+    return refined_text, stats
+
+
+def _job_audio_dir(job_id: str) -> str:
+    return os.path.join(settings.JOB_AUDIO_DIR, job_id)
+
+
+def job_audio_path(job: dict[str, Any]) -> str | None:
+    """
+    Local path of the job's recording. Jobs refer to their own copy relative
+    to JOB_AUDIO_DIR, which may be shared storage mounted anywhere.
+    """
+    if not job["audio_path"]:
+        return None
+    return os.path.join(settings.JOB_AUDIO_DIR, job["audio_path"])
+
+
+def _adopt_audio(job: dict[str, Any], input_path: str) -> None:
+    """Give the job its own copy of ``input_path`` unless it still has one."""
+    reference = os.path.join(
+        job["id"], "audio" + os.path.splitext(input_path)[1].lower()
+    )
+    path = os.path.join(settings.JOB_AUDIO_DIR, reference)
+    if job["audio_path"] == reference and os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Copied under a unique name first, so a concurrent re-upload of the same
+    # recording never sees half a file.
+    partial = f"{path}.{uuid.uuid4().hex}.partial"
+    shutil.copyfile(input_path, partial)
+    os.replace(partial, path)
+    get_job_store().set_audio_path(job["id"], reference)
+
+
+def release_job_audio(job_id: str) -> None:
+    """Delete the job's copy of its recording; a re-upload brings it back."""
+    shutil.rmtree(_job_audio_dir(job_id), ignore_errors=True)
+
+
+def resolve_job(input_path: str | None = None, job_id: str | None = None) -> str:
+    """
+    Return the job to run: ``job_id`` if given, otherwise the latest unfinished
+    job for the same recording (by content hash) or a new one.
+
+    An unfinished job is given its own copy of ``input_path``, so callers may
+    delete the upload once this returns.
+    """
+    if job_id:
+        job = get_job_store().get_job(job_id)
+        if job is None:
+            raise ValueError(f"Unknown job ID: {job_id}")
+    elif not input_path:
+        raise ValueError("Either an audio file or a job ID is required")
+    else:
+        audio_hash = get_transcript_cache().hash_file(input_path)
+        job = get_job_store().find_resumable_job(audio_hash)
+        if job is not None:
+            logger.info(f"Resuming job {job['id']} for {input_path}")
+        else:
+            job = get_job_store().get_job(
+                get_job_store().create_job(input_path, audio_hash)
+            )
+    if input_path and job["status"] != COMPLETED:
+        _adopt_audio(job, input_path)
+    return job["id"]
+
+
+def archive_job(job: dict[str, Any], into: MeetingArchive | None = None) -> None:
+    """Add a completed job's transcript and summary to ``into`` or the archive."""
+    stages = job["stages"]
+    (into or get_archive()).add(
+        job["audio_hash"] or job["id"],
+        stages["transcript"]["text"],
+        stages["summary"],
+        job_id=job["id"],
+        # The job's copy of the recording is deleted once it completes.
+        audio_path=None,
+        segments=stages["transcript"].get("segments"),
+    )
+
+
+def _vad_status(vad: dict[str, Any]) -> str:
+    return (
+        f"✅ Skipped {vad['skipped_seconds']:.0f}s of silence or music "
+        f"({vad['skipped_ratio']:.0%} of the recording)."
+    )
+
+
+@contextlib.asynccontextmanager
+async def _heartbeat(job_id: str) -> AsyncIterator[None]:
+    """Keep the job's heartbeat fresh so others see it as running."""
+
+    async def beat() -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            await asyncio.to_thread(get_job_store().heartbeat, job_id)
+
+    task = asyncio.create_task(beat())
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+def _in_flight(job: dict[str, Any]) -> bool:
+    """True while the job is running elsewhere or waiting for a worker."""
+    queue = get_worker_queue()
+    return get_job_store().is_active(job) or (
+        queue is not None and queue.is_queued(job["id"])
+    )
+
+
+def submit_to_workers(job: dict[str, Any]) -> None:
+    """Queue the job's next step for the workers unless it's already in flight."""
+    if not _in_flight(job):
+        kind = SUMMARIZE if "transcript" in job["stages"] else TRANSCRIBE
+        get_worker_queue().enqueue(job["id"], kind)
+
+
+async def follow_job(job_id: str) -> AsyncGenerator[tuple[str, str | None], None]:
+    """Report progress of a job running elsewhere until it stops being active."""
+    reported: set[str] = set()
+    while True:
+        job = await asyncio.to_thread(get_job_store().get_job, job_id)
+        for stage in STAGES:
+            if stage in job["stages"] and stage not in reported:
+                reported.add(stage)
+                yield f"✅ Stage completed: {stage}.", job["stages"].get("markdown")
+        if not await asyncio.to_thread(_in_flight, job):
+            return
+        await asyncio.sleep(settings.JOB_POLL_SECONDS)
+
+
+async def summaryAgent(
+    input_path: str | None = None, job_id: str | None = None
+) -> AsyncGenerator[tuple[str, str | None], None]:
     if not validate_environment():
         raise SystemExit("Missing required environment variables")
     """
     Process audio file through transcription and summarization pipeline.
-    
+
+    Every stage's output is checkpointed in the job store, so a retry (or a
+    reattach by job ID) resumes after the last completed stage. With
+    REMOTE_WORKERS the job is queued for worker.py and followed instead.
+
     Args:
         input_path: Path to the audio file to process
-        
+        job_id: Existing job to resume or reattach to
+
     Yields:
         Tuple of (status_message, accumulated_result)
     """
     try:
-        yield "🧠 Transcribe started...", None
+        job_id = await asyncio.to_thread(resolve_job, input_path, job_id)
+        yield f"🆔 Job ID: {job_id}", None
+
+        job = await asyncio.to_thread(get_job_store().get_job, job_id)
+        if settings.REMOTE_WORKERS and job["status"] != COMPLETED:
+            await asyncio.to_thread(submit_to_workers, job)
+            yield "📬 Job queued for a worker; following its progress...", None
+        elif get_job_store().is_active(job):
+            yield "🔗 Job is running elsewhere; following its progress...", None
+        if job["status"] != COMPLETED and await asyncio.to_thread(_in_flight, job):
+            async with contextlib.aclosing(follow_job(job_id)) as updates:
+                async for update in updates:
+                    yield update
+            job = await asyncio.to_thread(get_job_store().get_job, job_id)
+        if job["status"] == COMPLETED:
+            yield "✅ Summary complete.", job["stages"]["markdown"]
+            return
+        if settings.REMOTE_WORKERS:
+            yield f"❌ Error: {job['error'] or 'Job failed'}", None
+            return
+        if not await asyncio.to_thread(get_job_store().claim, job_id):
+            yield "❌ Error: Job is already being processed.", None
+            return
 
-        # Transcribe audio
-        logger.info(f"Transcribing audio file: {input_path}")
-        transcript_result = speechToTextTool(input_path)
+        # Closed with us if the consumer stops early (e.g. a client
+        # disconnects), so the heartbeat stops and the job is marked failed
+        # now rather than whenever the generator is collected.
+        async with contextlib.aclosing(run_claimed_job(job)) as updates:
+            async for update in updates:
+                yield update
 
-        if not transcript_result.get("success", False):
-            yield (
-                f"❌ Transcription failed: {transcript_result.get('error', 'Unknown error')}",
-                None,
-            )
+    except Exception as e:
+        logger.error(f"Error in summaryAgent: {e}")
+        yield f"❌ Error: {str(e)}", None
+
+
+def _fail_job(job_id: str, error: str | None) -> None:
+    """Mark the job failed, deleting its audio once it has no claims left."""
+    jobs_total.inc(status=FAILED)
+    get_job_store().finish(job_id, FAILED, error)
+    job = get_job_store().get_job(job_id)
+    if job["attempts"] >= settings.JOB_MAX_ATTEMPTS:
+        release_job_audio(job_id)
+
+
+async def run_claimed_job(
+    job: dict[str, Any], transcribe_only: bool = False
+) -> AsyncGenerator[tuple[str, str | None], None]:
+    """
+    Run the stages ``job`` is missing once this process has claimed it.
+
+    The job ends completed or failed, except with ``transcribe_only``: then
+    it stops after the transcript checkpoint and is released for whoever
+    runs the remaining stages.
+    """
+    job_id = job["id"]
+    stages = job["stages"]
+    status = None
+    input_path = job_audio_path(job)
+    with (
+        queue_depth.track(queue="jobs"),
+        span("job", trace_id=job_id, audio_path=input_path),
+    ):
+        trace = current_span()
+        async with (
+            _heartbeat(job_id),
+            contextlib.aclosing(
+                _run_stages(job_id, input_path, stages, trace, transcribe_only)
+            ) as updates,
+        ):
+            try:
+                async for status, accumulated in updates:
+                    yield status, accumulated
+            except GeneratorExit:
+                # Closed by the consumer: record it before the stages are
+                # closed, without awaiting.
+                _fail_job(job_id, "Closed before completion")
+                raise
+            except BaseException as e:
+                # Includes cancellation; the job stays resumable either way.
+                await asyncio.to_thread(_fail_job, job_id, str(e) or type(e).__name__)
+                raise
+    if "markdown" in stages:
+        jobs_total.inc(status=COMPLETED)
+        await asyncio.to_thread(get_job_store().finish, job_id, COMPLETED)
+        await asyncio.to_thread(release_job_audio, job_id)
+        if get_archive() is not None:
+            try:
+                await asyncio.to_thread(archive_job, {**job, "stages": stages})
+            except Exception as e:
+                # The summary is safe in the job store; backfill can retry.
+                logger.error(f"Failed to archive job {job_id}: {e}")
+    elif transcribe_only and "transcript" in stages:
+        await asyncio.to_thread(get_job_store().release, job_id)
+    else:
+        await asyncio.to_thread(_fail_job, job_id, status)
+
+
+async def _run_stages(
+    job_id: str,
+    input_path: str | None,
+    stages: dict[str, Any],
+    trace: SpanContext | None = None,
+    transcribe_only: bool = False,
+) -> AsyncGenerator[tuple[str, str | None], None]:
+    """
+    Run the stages missing from ``stages``, checkpointing each output.
+
+    Each stage is timed and traced under ``trace``, the job's span. With
+    ``transcribe_only``, stop after the transcript.
+    """
+    restored = set(stages)
+
+    async def checkpoint(stage: str, output: Any) -> None:
+        stages[stage] = output
+        await asyncio.to_thread(get_job_store().save_stage, job_id, stage, output)
+
+    transcript_result = stages.get("transcript")
+    if transcript_result is not None:
+        yield "✅ Transcript restored from job checkpoint.", None
+    else:
+        if not input_path or not os.path.exists(input_path):
+            yield "❌ Error: Audio file is no longer available; please re-upload.", None
             return
 
-        yield "✅ Transcription completed.", None
+        # Re-uploaded recordings skip straight to refinement
+        # Blocking stages run off the event loop so concurrent jobs and UI
+        # progress updates keep flowing while this one works.
+        transcript_result = await asyncio.to_thread(cached_transcript, input_path)
+        if transcript_result is not None:
+            logger.info(f"Using cached transcript for: {input_path}")
+            yield "✅ Transcript loaded from cache.", None
+        elif (
+            settings.SUMMARY_OVERLAPPED
+            and settings.WHISPER_CHUNKED
+            and not transcribe_only
+        ):
+            with track_stage("transcribe_and_summarize", parent=trace):
+                async with contextlib.aclosing(
+                    _run_overlapped(input_path, checkpoint)
+                ) as updates:
+                    async for update in updates:
+                        yield update
+            if "summary" not in stages:
+                return
+            transcript_result = stages["transcript"]
+        else:
+            yield "🧠 Transcribe started...", None
+
+            # Transcribe audio
+            logger.info(f"Transcribing audio file: {input_path}")
+            # Whisper itself runs on the transcription process pool
+            with track_stage("transcribe", parent=trace) as attributes:
+                transcript_result = await asyncio.to_thread(
+                    speechToTextTool, input_path
+                )
+                attributes["audio_seconds"] = transcript_result.get("duration", 0)
 
+            if not transcript_result.get("success", False):
+                stage_errors.inc(stage="transcribe")
+                yield (
+                    f"❌ Transcription failed: {transcript_result.get('error', 'Unknown error')}",
+                    None,
+                )
+                return
+
+            yield "✅ Transcription completed.", None
+            if "vad" in transcript_result:
+                yield _vad_status(transcript_result["vad"]), None
+        if "transcript" not in stages:
+            await checkpoint("transcript", transcript_result)
+    if transcribe_only:
+        return
+
+    refined = stages.get("refined")
+    if refined is not None:
+        refined_transcript = refined["text"]
+        if "refined" in restored:
+            yield "✅ Refined transcript restored from job checkpoint.", None
+    else:
         # Summarize transcript
         logger.info("Summarizing transcript...")
         yield "🧠 Refining transcript...", None
 
-        refined_transcript = textRefiningTool(transcript_result["text"])
+        with track_stage("refine", parent=trace):
+            refined_transcript, stage_stats = await prepare_transcript(
+                transcript_result["text"]
+            )
+        dedup_stats = stage_stats["dedup"]
+        if dedup_stats and dedup_stats["removed_segments"]:
+            yield (
+                f"✅ Removed {dedup_stats['removed_segments']} repeated segments "
+                f"(~{dedup_stats['tokens_saved']} tokens saved).",
+                None,
+            )
         yield "✅ Refinement completed.", None
 
-        logger.info(
-            f"original transcript word count: {len(transcript_result['text'].split())}"
-        )
-        logger.info(f"Refined transcript word count: {len(refined_transcript.split())}")
+        compression_stats = stage_stats["compression"]
+        if compression_stats and compression_stats["compression_ratio"] < 1:
+            yield (
+                f"✅ Compressed transcript to "
+                f"{compression_stats['compression_ratio']:.0%} "
+                f"({compression_stats['compressed_tokens']} tokens, "
+                f"~{compression_stats['estimated_seconds_saved']:.1f}s saved).",
+                None,
+            )
 
-        logger.info(f"original transcript word : {transcript_result['text']}")
-        logger.info(f"Refined transcript word : {refined_transcript}")
+        await checkpoint("refined", {"text": refined_transcript, "stats": stage_stats})
 
-        summary = summaryTool(refined_transcript)
+    summary = stages.get("summary")
+    if summary is not None:
+        if "summary" in restored:
+            yield "✅ Summary restored from job checkpoint.", None
+    else:
+        with track_stage("summarize", parent=trace):
+            if settings.SUMMARY_STREAMING:
+                # Show each section as soon as the model has finished it
+                yield "🧠 Generating summary...", None
+                async for summary, complete in summaryToolStream(refined_transcript):
+                    if complete:
+                        continue
+                    try:
+                        partial_markdown = generate_markdown_summary(
+                            summary, partial=True
+                        )
+                    except ValidationError as e:
+                        logger.debug(f"Skipping invalid partial summary: {e}")
+                        continue
+                    yield "🧠 Generating summary...", partial_markdown
+            else:
+                summary = await summaryToolAsync(refined_transcript)
         yield "✅ Summary generation completed.", None
+        await checkpoint("summary", summary)
 
-        # Generate markdown
+    # Generate markdown
+    with track_stage("markdown", parent=trace):
         marked_down_data = generate_markdown_summary(summary)
-        yield "✅ Summary complete.", marked_down_data
+    await checkpoint("markdown", marked_down_data)
+    yield "✅ Summary complete.", marked_down_data
 
-    except Exception as e:
-        logger.error(f"Error in summaryAgent: {e}")
-        yield f"❌ Error: {str(e)}", None
+
+async def _run_overlapped(
+    input_path: str, checkpoint: Callable[[str, Any], Awaitable[None]]
+) -> AsyncGenerator[tuple[str, str | None], None]:
+    """
+    Transcribe, refine and summarize at the same time.
+
+    Stitched text is cut into segments of about SUMMARY_OVERLAP_SEGMENT_TOKENS
+    as Whisper windows finish, and each segment is refined and summarized while
+    later windows are still being transcribed. Once transcription ends only
+    the last segment and the merge are left. Checkpoints the transcript,
+    refined and summary stages.
+    """
+    yield "🧠 Transcribe started (summarizing as it goes)...", None
+    logger.info(f"Transcribing and summarizing audio file: {input_path}")
+
+    windows = iter_transcript_windows(input_path)
+    semaphore = asyncio.Semaphore(max(1, settings.SUMMARY_MAP_CONCURRENCY))
+    segments: list[asyncio.Task] = []
+    pending: list[str] = []
+
+    async def summarize_segment(
+        index: int, text: str, whole: bool
+    ) -> tuple[str, dict[str, Any], dict]:
+        with span("segment", index=index, tokens=count_tokens(text)):
+            prepared, stage_stats = await prepare_transcript(text)
+            async with semaphore:
+                if whole:
+                    # Short recordings fit in one segment; summarize them as usual.
+                    summary = await summaryToolAsync(prepared)
+                else:
+                    summary = await summarize_part(prepared, index + 1)
+        return prepared, stage_stats, summary
+
+    def start_segment(last: bool = False) -> None:
+        text = " ".join(pending)
+        pending.clear()
+        if text or (last and not segments):
+            segments.append(
+                asyncio.create_task(
+                    summarize_segment(len(segments), text, last and not segments)
+                )
+            )
+
+    def partial_markdown() -> str | None:
+        done = [task.result()[2] for task in segments if task.done()]
+        if not done or settings.SUMMARY_REDUCE_MODE == "llm":
+            return None
+        try:
+            return generate_markdown_summary(merge_summaries(done), partial=True)
+        except ValidationError as e:
+            logger.debug(f"Skipping invalid partial summary: {e}")
+            return None
+
+    next_window = asyncio.ensure_future(asyncio.to_thread(next, windows))
+    try:
+        while next_window is not None or not all(task.done() for task in segments):
+            waiting = {task for task in segments if not task.done()}
+            if next_window is not None:
+                waiting.add(next_window)
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done - {next_window}:
+                # Surfaces a failed segment right away.
+                task.result()
+                yield "🧠 Partial summary updated.", partial_markdown()
+
+            if next_window not in done:
+                continue
+            item = next_window.result()
+            if item["text"]:
+                pending.append(item["text"])
+            if "transcript" in item:
+                next_window = None
+                start_segment(last=True)
+                # Checkpoint now so a failed summary doesn't redo transcription.
+                await checkpoint("transcript", item["transcript"])
+                yield "✅ Transcription completed; finishing summary...", None
+                if "vad" in item["transcript"]:
+                    yield _vad_status(item["transcript"]["vad"]), None
+                continue
+
+            next_window = asyncio.ensure_future(asyncio.to_thread(next, windows))
+            if (
+                count_tokens(" ".join(pending))
+                >= settings.SUMMARY_OVERLAP_SEGMENT_TOKENS
+            ):
+                start_segment()
+            total = f"/{item['windows']}" if item["windows"] else ""
+            yield f"🧠 Transcribed {item['window']}{total} windows...", None
+    finally:
+        for task in segments:
+            task.cancel()
+        if next_window is not None:
+            # The thread running next() can't be interrupted; once it returns,
+            # closing the generator stops decoding and releases its cache claim.
+            await asyncio.wait({next_window})
+            if not next_window.cancelled():
+                next_window.exception()
+        await asyncio.to_thread(windows.close)
+
+    results = [task.result() for task in segments]
+    await checkpoint(
+        "refined",
+        {
+            "text": " ".join(prepared for prepared, _, _ in results),
+            "stats": {"segments": [stage_stats for _, stage_stats, _ in results]},
+        },
+    )
+    yield "✅ Refinement completed.", None
+
+    if len(results) == 1:
+        summary = results[0][2]
+    else:
+        logger.info(f"Merging {len(results)} segment summaries")
+        summary = await reduce_summaries([summary for _, _, summary in results])
+    yield "✅ Summary generation completed.", None
+    await checkpoint("summary", summary)
 
 
 # async def summaryAgent(input) -> str:
@@ -0,0 +1,30 @@
+"""
+Test setup shared by every module.
+
+Settings are read from the environment when ``config.settings`` is first
+imported, so every store the app opens is pointed at a scratch directory
+here, before any test module imports the app.
+"""
+
+import os
+import tempfile
+
+_SCRATCH = tempfile.mkdtemp(prefix="summarizer-tests-")
+
+os.environ.update(
+    {
+        "OPENAI_API_KEY": "test",
+        "OPENAI_BASE_URL": "http://127.0.0.1:9/v1",
+        "JOB_STORE_PATH": os.path.join(_SCRATCH, "jobs.sqlite3"),
+        "JOB_QUEUE_PATH": os.path.join(_SCRATCH, "job_queue.sqlite3"),
+        "TRANSCRIPT_CACHE_DIR": os.path.join(_SCRATCH, "transcripts"),
+        "LLM_CACHE_PATH": os.path.join(_SCRATCH, "llm_responses.sqlite3"),
+        "ARCHIVE_PATH": os.path.join(_SCRATCH, "archive.sqlite3"),
+        "ARCHIVE_SEGMENTS_DIR": os.path.join(_SCRATCH, "archive-segments"),
+        "API_UPLOAD_DIR": os.path.join(_SCRATCH, "uploads"),
+        "JOB_AUDIO_DIR": os.path.join(_SCRATCH, "job_audio"),
+        "METRICS_ENABLED": "false",
+        "WARMUP_ENABLED": "false",
+        "REMOTE_WORKERS": "false",
+    }
+)
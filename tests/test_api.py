@@ -0,0 +1,122 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from config.settings import settings
+
+BOUNDARY = "test-boundary"
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """Submit jobs without running them; records each upload as resolved."""
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    resolved = []
+
+    def resolve_job(path):
+        with open(path, "rb") as f:
+            resolved.append((os.path.basename(path), f.read()))
+        return "job-1"
+
+    async def submit(job_id):
+        return None
+
+    monkeypatch.setattr(settings, "API_UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 1000)
+    monkeypatch.setattr(api, "validate_audio_file", lambda path: True)
+    monkeypatch.setattr(api, "resolve_job", resolve_job)
+    monkeypatch.setattr(api.jobs, "submit", submit)
+    client = TestClient(api.app)
+    client.resolved = resolved
+    client.upload_dir = upload_dir
+    return client
+
+
+def _multipart(data: bytes, name: str = "file", filename: str = "meeting.mp3"):
+    return (
+        (
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="note"\r\n\r\n'
+            "weekly sync\r\n"
+            f"--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            "Content-Type: audio/mpeg\r\n\r\n"
+        ).encode()
+        + data
+        + f"\r\n--{BOUNDARY}--\r\n".encode()
+    )
+
+
+def _chunked(body: bytes, size: int = 100):
+    # A generator body is sent with chunked encoding and no Content-Length.
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+def _post(client, body, **kwargs):
+    return client.post(
+        "/jobs",
+        content=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+        **kwargs,
+    )
+
+
+def test_multipart_file_is_streamed_to_the_upload_dir(client):
+    response = _post(client, _chunked(_multipart(b"x" * 900)))
+    assert response.status_code == 202
+    assert response.json() == {"job_id": "job-1", "status": "queued"}
+    [(name, data)] = client.resolved
+    assert name.endswith(".mp3")
+    assert data == b"x" * 900
+    # The job has its own copy; the upload is gone.
+    assert os.listdir(client.upload_dir) == []
+
+
+def test_chunked_multipart_over_the_limit_is_refused(monkeypatch, client):
+    async def spool(self, *args, **kwargs):
+        raise AssertionError("the whole body was spooled before the size check")
+
+    monkeypatch.setattr(api.Request, "form", spool)
+    response = _post(client, _chunked(_multipart(b"x" * 5000)))
+    assert response.status_code == 413
+    assert client.resolved == []
+    assert os.listdir(client.upload_dir) == []
+
+
+def test_multipart_without_a_file_field(client):
+    response = _post(client, _multipart(b"x" * 10, name="audio"))
+    assert response.status_code == 422
+    assert os.listdir(client.upload_dir) == []
+
+
+def test_multipart_with_an_unsupported_extension(client):
+    response = _post(client, _multipart(b"x" * 10, filename="notes.txt"))
+    assert response.status_code == 415
+    assert os.listdir(client.upload_dir) == []
+
+
+def test_raw_upload(client):
+    response = client.post(
+        "/jobs",
+        content=_chunked(b"y" * 500),
+        params={"filename": "meeting.wav"},
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    assert response.status_code == 202
+    [(name, data)] = client.resolved
+    assert name.endswith(".wav")
+    assert data == b"y" * 500
+
+
+def test_raw_upload_over_the_limit_is_refused(client):
+    response = client.post(
+        "/jobs",
+        content=_chunked(b"y" * 5000),
+        params={"filename": "meeting.wav"},
+    )
+    assert response.status_code == 413
+    assert os.listdir(client.upload_dir) == []
@@ -0,0 +1,136 @@
+import pytest
+
+from utils import archive
+from utils.archive import MeetingArchive, Query
+
+
+@pytest.fixture
+def small_segments(monkeypatch):
+    """Flush every 2 meetings and merge pairs, so tiers form quickly."""
+    monkeypatch.setattr(archive, "_SEGMENT_MEETINGS", 2)
+    monkeypatch.setattr(archive, "_MERGE_FACTOR", 2)
+
+
+@pytest.fixture
+def meetings(tmp_path):
+    return MeetingArchive(str(tmp_path / "archive.sqlite3"))
+
+
+def _add(meetings, key, transcript, **summary):
+    meetings.add(key, transcript, {"summary": f"Meeting {key}", **summary})
+
+
+def _keys(meetings, query):
+    return [result["key"] for result in meetings.search(query)]
+
+
+def _segments(meetings):
+    with meetings._connect() as conn:
+        return [
+            (row["level"], row["meetings"])
+            for row in conn.execute("SELECT level, meetings FROM segments ORDER BY id")
+        ]
+
+
+def test_query_parsing():
+    query = Query.parse('Payment API decisions:pricing participants:"Alice Smith" x:y')
+    assert query.terms == ["payment", "api", "x", "y"]
+    assert query.fielded == {
+        "decisions": ["pricing"],
+        "participants": ["alice", "smith"],
+    }
+    assert not Query.parse("the and of")
+
+
+def test_bm25_ranks_the_denser_match_first(meetings):
+    _add(meetings, "a", "We talked about the budget once and then lunch plans.")
+    _add(meetings, "b", "Budget, budget, budget: the budget review ran long.")
+    _add(meetings, "c", "Hiring update and the office move.")
+    assert _keys(meetings, "budget") == ["b", "a"]
+    assert meetings.search("budget", limit=1)[0]["key"] == "b"
+    assert meetings.search("nothing here") == []
+
+
+def test_fielded_clauses_must_match(meetings):
+    _add(
+        meetings,
+        "a",
+        "Pricing came up.",
+        decisions=["Keep pricing flat", "Hire a designer"],
+        participants=["Alice"],
+    )
+    _add(meetings, "b", "Pricing again.", decisions=["Delay the launch"])
+    [result] = meetings.search("decisions:pricing")
+    assert result["key"] == "a"
+    assert result["matches"] == {"decisions": ["Keep pricing flat"]}
+    assert _keys(meetings, "pricing participants:alice") == ["a"]
+    assert _keys(meetings, "decisions:pricing participants:bob") == []
+
+
+def test_readding_a_key_replaces_the_meeting(meetings):
+    _add(meetings, "a", "Old notes about the roadmap.")
+    _add(meetings, "a", "New notes about hiring.")
+    assert len(meetings) == 1
+    assert _keys(meetings, "roadmap") == []
+    assert _keys(meetings, "hiring") == ["a"]
+
+
+def test_remove(meetings):
+    _add(meetings, "a", "Roadmap review.")
+    assert meetings.remove("a")
+    assert not meetings.remove("a")
+    assert "a" not in meetings
+    assert _keys(meetings, "roadmap") == []
+
+
+def test_segments_flush_and_merge(meetings, small_segments):
+    for i in range(9):
+        _add(meetings, f"m{i}", f"Weekly sync {i} about the roadmap.")
+    # Eight flushed meetings merged up to the top level; one still pending.
+    assert _segments(meetings) == [(2, 8)]
+    assert len(meetings) == 9
+    assert sorted(_keys(meetings, "roadmap")) == [f"m{i}" for i in range(9)]
+    assert _keys(meetings, "transcript:3") == ["m3"]
+
+
+def test_tombstones_are_purged(meetings, small_segments):
+    for i in range(4):
+        _add(meetings, f"m{i}", f"Topic {i} and the roadmap.")
+    assert _segments(meetings) == [(1, 4)]
+
+    meetings.remove("m1")
+    with meetings._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM deleted").fetchone()[0] == 0
+    assert _segments(meetings) == [(1, 3)]
+    assert sorted(_keys(meetings, "roadmap")) == ["m0", "m2", "m3"]
+
+
+def test_removed_ids_are_not_reused(meetings, small_segments, monkeypatch):
+    monkeypatch.setattr(archive, "_PURGE_DELETED", 1.0)
+    _add(meetings, "a", "First meeting.")
+    _add(meetings, "b", "Second meeting.")
+    # "b" has the highest ID and stays tombstoned in its segment.
+    meetings.remove("b")
+    with meetings._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM deleted").fetchone()[0] == 1
+
+    _add(meetings, "c", "A fresh retrospective.")
+    assert _keys(meetings, "retrospective") == ["c"]
+    assert _keys(meetings, "second") == []
+
+
+def test_transcript_segments_locate_the_snippet(tmp_path):
+    meetings = MeetingArchive(
+        str(tmp_path / "archive.sqlite3"), segments_dir=str(tmp_path / "segments")
+    )
+    segments = [
+        {"start": 0.0, "end": 3.0, "text": " Good morning.", "confidence": 0.9},
+        {"start": 3.0, "end": 7.5, "text": " The launch slips a week."},
+    ]
+    meetings.add("a", "Good morning. The launch slips a week.", {}, segments=segments)
+    [result] = meetings.search("launch")
+    assert (result["snippet_start"], result["snippet_end"]) == (3.0, 7.5)
+    assert meetings.transcript_segments("a").excerpt(0, 3) == "Good morning."
+
+    meetings.remove("a")
+    assert meetings.transcript_segments("a") is None
@@ -0,0 +1,49 @@
+from utils.audio_chunking import (
+    TranscriptStitcher,
+    merge_overlap,
+    split_windows,
+    stitch_transcripts,
+)
+
+
+def test_split_windows_overlap_and_cover_the_audio():
+    windows = split_windows(100, window_seconds=40, overlap_seconds=10, sample_rate=1)
+    assert windows == [(0, 40), (30, 70), (60, 100)]
+    assert split_windows(10, 40, 10, sample_rate=1) == [(0, 10)]
+
+
+def test_split_windows_clamps_overlap_below_the_window():
+    windows = split_windows(5, window_seconds=2, overlap_seconds=5, sample_rate=1)
+    assert windows == [(0, 2), (1, 3), (2, 4), (3, 5)]
+
+
+def test_merge_overlap_keeps_the_duplicated_run_once():
+    left = ["so", "the", "quick", "brown", "fox", "jumps", "over"]
+    right = ["Fox,", "jumps", "over", "the", "lazy", "dog"]
+    assert merge_overlap(left, right, 8) == (
+        ["so", "the", "quick", "brown", "Fox,", "jumps", "over", "the", "lazy", "dog"]
+    )
+
+
+def test_merge_overlap_drops_words_cut_at_the_seam():
+    left = ["we", "ship", "on", "friday", "after", "the", "rev"]
+    right = ["iew", "ship", "on", "friday", "after", "the", "review", "meeting"]
+    merged = merge_overlap(left, right, 8)
+    assert " ".join(merged) == "we ship on friday after the review meeting"
+
+
+def test_merge_overlap_needs_two_common_words():
+    left = ["alpha", "beta", "the"]
+    right = ["the", "gamma", "delta"]
+    assert merge_overlap(left, right, 8) == left + right
+
+
+def test_stitch_transcripts_and_streaming_stitcher_agree():
+    words = [f"w{i}" for i in range(60)]
+    texts = [" ".join(words[0:25]), " ".join(words[20:45]), " ".join(words[40:60])]
+    expected = " ".join(words)
+    assert stitch_transcripts(texts, overlap_seconds=2) == expected
+
+    stitcher = TranscriptStitcher(overlap_seconds=2)
+    parts = [stitcher.add(text) for text in texts] + [stitcher.finish()]
+    assert " ".join(part for part in parts if part) == expected
@@ -0,0 +1,77 @@
+import pytest
+
+from config.settings import settings
+from utils import extractive_compression
+from utils.extractive_compression import (
+    _DATE_RE,
+    _action_re,
+    compress_transcript,
+    extract_names,
+)
+
+
+def test_names_need_two_mentions_or_a_participant():
+    text = (
+        "Then Sarah showed the dashboard. We asked Sarah about it. "
+        "It runs on Postgres now. On Friday we met Raj."
+    )
+    assert extract_names(text) == {"sarah"}
+    assert extract_names(text, participants=["Raj Patel"]) == {"sarah", "raj"}
+
+
+@pytest.mark.parametrize(
+    "sentence",
+    [
+        "sarah will send the deck tonight.",
+        "we'll quickly fix the login bug.",
+        "i'm going to review the pull request.",
+        "raj to follow up with finance.",
+    ],
+)
+def test_action_items_need_an_owner_modal_and_verb(sentence):
+    assert _action_re({"sarah", "raj"}).search(sentence)
+
+
+@pytest.mark.parametrize(
+    "sentence",
+    [
+        "it will be fine.",
+        "the review was long.",
+        "we should probably think about it.",
+    ],
+)
+def test_other_modals_are_not_action_items(sentence):
+    assert not _action_re({"sarah"}).search(sentence)
+
+
+def test_dates_must_be_specific_or_deadlines():
+    assert _DATE_RE.search("ship it by tomorrow.")
+    assert _DATE_RE.search("the review is on march 3rd.")
+    assert _DATE_RE.search("standup moved to 10am.")
+    assert not _DATE_RE.search("today we talked about hiring.")
+    assert not _DATE_RE.search("we had 2000 signups.")
+    assert not _DATE_RE.search("let's march on.")
+
+
+def test_must_keep_sentences_are_capped_at_their_share(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "EXTRACTIVE_REQUIRED_SHARE", 0.5)
+    filler = [f"topic {i} covered pricing and latency details." for i in range(40)]
+    actions = [f"we will send report number {i} to finance." for i in range(40)]
+    text = " ".join(s for pair in zip(filler, actions, strict=True) for s in pair)
+
+    with caplog.at_level("INFO", logger=extractive_compression.__name__):
+        compressed, stats = compress_transcript(text, token_budget=200)
+
+    assert stats["compressed_tokens"] <= 200
+    assert stats["required_tokens"] > 100
+    assert "over their 100-token share" in caplog.text
+    kept = compressed.split(". ")
+    assert any("topic" in s for s in kept)
+    assert any("send report" in s for s in kept)
+
+
+def test_short_transcripts_are_untouched():
+    text = "we will send the deck. thanks all."
+    compressed, stats = compress_transcript(text, token_budget=1000)
+    assert compressed == text
+    assert stats["compression_ratio"] == 1.0
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from utils.job_queue import SUMMARIZE, TRANSCRIBE, SQLiteQueue, get_job_queue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteQueue(str(tmp_path / "job_queue.sqlite3"))
+
+
+def test_claim_hands_out_each_task_once(queue):
+    queue.enqueue("a")
+    queue.enqueue("b", SUMMARIZE)
+
+    first = queue.claim("w1", (TRANSCRIBE,), 60)
+    assert (first.job_id, first.kind, first.attempts) == ("a", TRANSCRIBE, 1)
+    assert not first.reclaimed
+    assert queue.claim("w2", (TRANSCRIBE,), 60) is None
+    assert queue.claim("w2", (TRANSCRIBE, SUMMARIZE), 60).job_id == "b"
+    assert queue.depth() == {TRANSCRIBE: 1, SUMMARIZE: 1}
+
+
+def test_expired_lease_is_reclaimed(queue):
+    queue.enqueue("a")
+    lost = queue.claim("w1", (TRANSCRIBE,), 0.05)
+    time.sleep(0.1)
+
+    lease = queue.claim("w2", (TRANSCRIBE,), 60)
+    assert lease.job_id == "a"
+    assert lease.reclaimed
+    assert lease.attempts == 2
+    # The first worker finds out at its next renewal and can't remove the task.
+    assert not queue.renew(lost, 60)
+    queue.complete(lost)
+    assert queue.is_queued("a")
+
+    assert queue.renew(lease, 60)
+    queue.complete(lease)
+    assert not queue.is_queued("a")
+
+
+def test_release_makes_the_task_available_after_a_delay(queue):
+    queue.enqueue("a")
+    lease = queue.claim("w1", (TRANSCRIBE,), 60)
+    queue.release(lease, delay=0.1, error="API down")
+    assert queue.claim("w2", (TRANSCRIBE,), 60) is None
+    time.sleep(0.15)
+    retry = queue.claim("w2", (TRANSCRIBE,), 60)
+    assert retry.attempts == 2
+    assert not retry.reclaimed
+
+
+def test_enqueue_hands_off_to_the_next_kind(queue):
+    queue.enqueue("a")
+    lease = queue.claim("w1", (TRANSCRIBE,), 60)
+    queue.enqueue("a", SUMMARIZE)
+    # The transcribe lease no longer owns the task.
+    queue.complete(lease)
+    assert queue.claim("w2", (SUMMARIZE,), 60).job_id == "a"
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown job queue backend 'kafka'"):
+        get_job_queue("kafka")
@@ -0,0 +1,99 @@
+import sqlite3
+import time
+
+import pytest
+
+from config.settings import settings
+from utils.job_store import (
+    COMPLETED,
+    FAILED,
+    PENDING,
+    RUNNING,
+    SQLiteJobStore,
+    open_job_store,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), stale_seconds=60)
+
+
+def test_stage_checkpoints_survive_reopening(store):
+    job_id = store.create_job("meeting.mp3", "hash")
+    store.save_stage(job_id, "transcript", {"text": "hello", "segments": []})
+    store.save_stage(job_id, "refined", {"text": "hello."})
+
+    job = SQLiteJobStore(store.path).get_job(job_id)
+    assert job["status"] == PENDING
+    assert job["stages"] == {
+        "transcript": {"text": "hello", "segments": []},
+        "refined": {"text": "hello."},
+    }
+
+
+def test_find_resumable_job_skips_completed_jobs(store):
+    done = store.create_job("a.mp3", "hash")
+    store.finish(done, COMPLETED)
+    assert store.find_resumable_job("hash") is None
+
+    failed = store.create_job("a.mp3", "hash")
+    store.finish(failed, FAILED, "boom")
+    job = store.find_resumable_job("hash")
+    assert job["id"] == failed
+    assert job["error"] == "boom"
+    assert store.completed_job_ids() == [done]
+
+
+def test_claim_refuses_a_job_with_a_fresh_heartbeat(store):
+    job_id = store.create_job("a.mp3", "hash")
+    assert store.claim(job_id)
+    assert store.is_active(store.get_job(job_id))
+    assert not store.claim(job_id)
+
+    store.release(job_id)
+    job = store.get_job(job_id)
+    assert job["status"] == PENDING
+    assert store.claim(job_id)
+    assert store.get_job(job_id)["attempts"] == 2
+
+
+def test_claim_takes_over_a_stale_job(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), stale_seconds=0.05)
+    job_id = store.create_job("a.mp3", "hash")
+    assert store.claim(job_id)
+    time.sleep(0.1)
+    job = store.get_job(job_id)
+    assert job["status"] == RUNNING
+    assert not store.is_active(job)
+    assert store.claim(job_id)
+
+
+def test_adds_attempts_to_an_existing_store(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, audio_path TEXT,"
+            " audio_hash TEXT, status TEXT NOT NULL, error TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL,"
+            " heartbeat_at REAL)"
+        )
+        conn.execute(
+            "INSERT INTO jobs VALUES ('old', NULL, 'hash', ?, NULL, 0, 0, NULL)",
+            (PENDING,),
+        )
+    conn.close()
+
+    store = SQLiteJobStore(path)
+    assert store.get_job("old")["attempts"] == 0
+    assert store.claim("old")
+    assert store.get_job("old")["attempts"] == 1
+
+
+def test_open_job_store_picks_the_configured_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "JOB_STORE_PATH", str(tmp_path / "jobs.sqlite3"))
+    store = open_job_store("SQLite")
+    assert isinstance(store, SQLiteJobStore)
+    assert store.stale_seconds == 3 * settings.JOB_HEARTBEAT_SECONDS
+    with pytest.raises(ValueError, match="Unknown job store backend 'redis'"):
+        open_job_store("redis")
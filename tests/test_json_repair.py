@@ -0,0 +1,29 @@
+import pytest
+
+from utils.json_repair import loads_lenient
+
+
+@pytest.mark.parametrize(
+    "reply, expected",
+    [
+        ('{"a": 1}', {"a": 1}),
+        ('Sure! ```json\n{"a": [1, 2,],}\n``` Hope this helps.', {"a": [1, 2]}),
+        ('{"a": None, "b": True, "c": False}', {"a": None, "b": True, "c": False}),
+        ('{"summary": "line one\nline two"}', {"summary": "line one\nline two"}),
+        ('{"items": ["x", "y"', {"items": ["x", "y"]}),
+        ('{"summary": "cut off mid-sent', {"summary": "cut off mid-sent"}),
+        ('{"a": 1, "b":', {"a": 1, "b": None}),
+        ('{"a": "}{", "b": "\\"quoted\\""}', {"a": "}{", "b": '"quoted"'}),
+    ],
+)
+def test_repairs_common_model_mistakes(reply, expected):
+    assert loads_lenient(reply) == expected
+
+
+def test_drops_a_half_written_last_member():
+    assert loads_lenient('{"a": 1, "b": tru') == {"a": 1}
+
+
+def test_gives_up_without_any_json():
+    with pytest.raises(ValueError, match="No JSON object"):
+        loads_lenient("I can't summarize this meeting.")
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from utils.json_stream import IncrementalJSONParser
+
+REPLY = (
+    'Here you go:\n```json\n{"summary": "Ship, then {celebrate}",'
+    ' "participants": ["Sarah", "Raj"],'
+    ' "meta": {"date": null, "escaped": "a \\"quote\\", ok"},'
+    ' "action_items": []}\n```'
+)
+EXPECTED = {
+    "summary": "Ship, then {celebrate}",
+    "participants": ["Sarah", "Raj"],
+    "meta": {"date": None, "escaped": 'a "quote", ok'},
+    "action_items": [],
+}
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, len(REPLY)])
+def test_fields_complete_as_the_reply_streams_in(size):
+    parser = IncrementalJSONParser()
+    seen = []
+    for start in range(0, len(REPLY), size):
+        if parser.feed(REPLY[start : start + size]):
+            seen.append(list(parser.fields))
+    assert parser.fields == EXPECTED
+    assert parser.text == REPLY
+    if size == 1:
+        # One field at a time, in order.
+        assert seen == [list(EXPECTED)[: i + 1] for i in range(len(EXPECTED))]
+
+
+def test_members_of_a_properties_wrapper_are_top_level():
+    reply = json.dumps({"properties": {"summary": "s", "topics": ["t"]}})
+    parser = IncrementalJSONParser()
+    for char in reply:
+        parser.feed(char)
+    assert parser.fields == {"summary": "s", "topics": ["t"]}
+
+
+def test_undecodable_members_are_skipped():
+    parser = IncrementalJSONParser()
+    assert not parser.feed('{"a": nope, ')
+    assert parser.feed('"b": 2}')
+    assert parser.fields == {"b": 2}
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.llm_cache import LLMCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(str(tmp_path / "llm.sqlite3"), ttl_seconds=0, max_entries=2)
+
+
+def test_round_trip_and_lru_eviction(cache):
+    cache.put("a", {"summary": "a"})
+    cache.put("b", {"summary": "b"})
+    time.sleep(0.01)
+    assert cache.get("a") == {"summary": "a"}
+    time.sleep(0.01)
+    cache.put("c", {"summary": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"), ttl_seconds=0.05, max_entries=10)
+    cache.put("a", {"summary": "a"})
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+
+def test_concurrent_requests_share_one_computation(cache):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"summary": "shared"}
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_compute("k", compute) for _ in range(3))
+        )
+
+    assert asyncio.run(run()) == [{"summary": "shared"}] * 3
+    assert len(calls) == 1
+    assert asyncio.run(cache.get_or_compute("k", compute)) == {"summary": "shared"}
+    assert len(calls) == 1
+
+
+def test_errors_reach_every_waiter(cache):
+    async def compute():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("API down")
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_compute("k", compute) for _ in range(2)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache._inflight == {}
+
+
+def test_cancelled_owner_hands_over_to_a_waiter(cache):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"summary": f"attempt {len(calls)}"}
+
+    async def run():
+        owner = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await waiter
+
+    assert asyncio.run(run()) == {"summary": "attempt 2"}
+    assert len(calls) == 2
+    assert cache.get("k") == {"summary": "attempt 2"}
+
+
+def test_cancelled_waiter_leaves_the_others_alone(cache):
+    async def compute():
+        await asyncio.sleep(0.1)
+        return {"summary": "done"}
+
+    async def run():
+        owner = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        impatient = asyncio.create_task(cache.get_or_compute("k", compute))
+        patient = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await asyncio.gather(owner, patient)
+
+    assert asyncio.run(run()) == [{"summary": "done"}] * 2
@@ -0,0 +1,170 @@
+import asyncio
+import importlib
+import os
+import threading
+import time
+
+import pytest
+
+import main
+from config.settings import settings
+from utils.job_store import SQLiteJobStore
+from utils.transcript_cache import TranscriptCache
+
+stt = importlib.import_module("tools.speechToTextTool")
+
+KEY = "a" * 64
+
+
+@pytest.fixture
+def streamed(monkeypatch, tmp_path):
+    """Stream 50 slow fake windows through a real transcript cache claim."""
+    cache = TranscriptCache(str(tmp_path / "transcripts"), 10**9)
+    state = {"closed": threading.Event(), "windows": 0}
+
+    def fake_stream(path):
+        try:
+            for i in range(50):
+                time.sleep(0.02)
+                state["windows"] += 1
+                yield {"text": f"word{i} " * 5, "window": i + 1, "windows": 50}
+            transcript = {"success": True, "text": "done"}
+            yield {"text": "", "window": 50, "windows": 50, "transcript": transcript}
+        finally:
+            state["closed"].set()
+
+    monkeypatch.setattr(stt, "get_transcript_cache", lambda: cache)
+    monkeypatch.setattr(stt, "_cache_key", lambda path: KEY)
+    monkeypatch.setattr(stt, "_stream_transcript_windows", fake_stream)
+    monkeypatch.setattr(settings, "TRANSCRIPT_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "SUMMARY_OVERLAP_SEGMENT_TOKENS", 1)
+    state["lock"] = cache._lock_path(KEY)
+    return state
+
+
+async def _checkpoint(stage, output):
+    return None
+
+
+def test_overlapped_releases_claim_when_a_segment_fails(monkeypatch, streamed):
+    async def failing_prepare(text):
+        raise RuntimeError("refinement failed")
+
+    monkeypatch.setattr(main, "prepare_transcript", failing_prepare)
+
+    async def run():
+        async for _ in main._run_overlapped("meeting.mp3", _checkpoint):
+            pass
+
+    with pytest.raises(RuntimeError, match="refinement failed"):
+        asyncio.run(run())
+    assert streamed["closed"].is_set()
+    assert streamed["windows"] < 50
+    assert not os.path.exists(streamed["lock"])
+
+
+def test_overlapped_releases_claim_when_closed_early(monkeypatch, streamed):
+    async def slow_prepare(text):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(main, "prepare_transcript", slow_prepare)
+
+    async def run():
+        updates = main._run_overlapped("meeting.mp3", _checkpoint)
+        async for status, _ in updates:
+            if "windows" in status:
+                assert os.path.exists(streamed["lock"])
+                break
+        await updates.aclose()
+
+    asyncio.run(run())
+    assert streamed["closed"].is_set()
+    assert not os.path.exists(streamed["lock"])
+
+
+@pytest.fixture
+def jobs(monkeypatch, tmp_path):
+    """A scratch job store, with job audio kept under ``tmp_path``."""
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(main, "get_job_store", lambda: store)
+    monkeypatch.setattr(settings, "JOB_AUDIO_DIR", str(tmp_path / "job_audio"))
+    return store
+
+
+def _upload(tmp_path, name="upload.MP3", data=b"fake audio"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_resolve_job_keeps_a_copy_that_outlives_the_upload(jobs, tmp_path):
+    upload = _upload(tmp_path)
+    job_id = main.resolve_job(upload)
+    os.remove(upload)
+
+    audio_path = main.job_audio_path(jobs.get_job(job_id))
+    assert audio_path == os.path.join(settings.JOB_AUDIO_DIR, job_id, "audio.mp3")
+    # Stored relative to JOB_AUDIO_DIR, which may be mounted elsewhere on
+    # another host.
+    assert jobs.get_job(job_id)["audio_path"] == os.path.join(job_id, "audio.mp3")
+    with open(audio_path, "rb") as f:
+        assert f.read() == b"fake audio"
+    # Reattaching by ID without a file uses the same copy.
+    assert main.resolve_job(job_id=job_id) == job_id
+    assert main.job_audio_path(jobs.get_job(job_id)) == audio_path
+
+
+def test_reupload_restores_a_released_copy(jobs, tmp_path):
+    job_id = main.resolve_job(_upload(tmp_path))
+    main.release_job_audio(job_id)
+    assert not os.path.exists(main.job_audio_path(jobs.get_job(job_id)))
+
+    assert main.resolve_job(_upload(tmp_path, "again.mp3")) == job_id
+    assert os.path.exists(main.job_audio_path(jobs.get_job(job_id)))
+
+
+def test_failed_job_keeps_its_audio_until_out_of_attempts(monkeypatch, jobs, tmp_path):
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 2)
+
+    async def failing_stages(*args, **kwargs):
+        raise RuntimeError("API down")
+        yield
+
+    monkeypatch.setattr(main, "_run_stages", failing_stages)
+    job_id = main.resolve_job(_upload(tmp_path))
+    audio_path = main.job_audio_path(jobs.get_job(job_id))
+
+    async def attempt():
+        assert jobs.claim(job_id)
+        async for _ in main.run_claimed_job(jobs.get_job(job_id)):
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(attempt())
+    assert jobs.get_job(job_id)["status"] == main.FAILED
+    assert os.path.exists(audio_path)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(attempt())
+    assert not os.path.exists(audio_path)
+
+
+def test_completed_job_releases_its_audio(monkeypatch, jobs, tmp_path):
+    async def stages(job_id, input_path, stages, *args):
+        assert os.path.exists(input_path)
+        stages["markdown"] = "# Summary"
+        yield "✅ Summary complete.", "# Summary"
+
+    monkeypatch.setattr(main, "_run_stages", stages)
+    monkeypatch.setattr(main, "get_archive", lambda: None)
+    job_id = main.resolve_job(_upload(tmp_path))
+    audio_path = main.job_audio_path(jobs.get_job(job_id))
+
+    async def run():
+        assert jobs.claim(job_id)
+        async for _ in main.run_claimed_job(jobs.get_job(job_id)):
+            pass
+
+    asyncio.run(run())
+    assert jobs.get_job(job_id)["status"] == main.COMPLETED
+    assert not os.path.exists(os.path.dirname(audio_path))
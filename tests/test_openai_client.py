@@ -0,0 +1,32 @@
+import threading
+import time
+
+from utils.openai_client import OpenAIClient
+
+
+def test_concurrent_first_use_builds_one_client(monkeypatch):
+    monkeypatch.setattr(OpenAIClient, "_instance", None)
+    built = []
+
+    def slow_build(cls):
+        built.append(1)
+        # Wide enough for every thread to reach the check.
+        time.sleep(0.1)
+        return object.__new__(cls)
+
+    monkeypatch.setattr(OpenAIClient, "_build", classmethod(slow_build))
+    instances = []
+    start = threading.Barrier(8)
+
+    def create():
+        start.wait()
+        instances.append(OpenAIClient())
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    assert len({id(instance) for instance in instances}) == 1
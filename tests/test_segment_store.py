@@ -0,0 +1,100 @@
+import math
+
+import pytest
+
+from utils.segment_store import SegmentFile, write_segments
+
+
+def _segments(count):
+    return [
+        {
+            "start": i * 2.0,
+            "end": i * 2.0 + 1.5,
+            "text": f" line {i}.",
+            "confidence": 0.5,
+        }
+        for i in range(count)
+    ]
+
+
+def test_round_trip_in_start_order(tmp_path):
+    path = str(tmp_path / "meeting.seg")
+    segments = [
+        {"start": 4.0, "end": 6.0, "text": " Ship it.", "confidence": 0.875},
+        {"start": 0.0, "end": 2.5, "text": " Héllo", "confidence": None},
+        {"start": 2.5, "end": 4.0, "text": " everyone."},
+    ]
+    size = write_segments(path, segments)
+    assert size == (tmp_path / "meeting.seg").stat().st_size
+
+    store = SegmentFile(path)
+    assert len(store) == 3
+    assert store.start.tolist() == [0.0, 2.5, 4.0]
+    assert math.isnan(store.confidence[0])
+    assert store.segment(0) == {
+        "start": 0.0,
+        "end": 2.5,
+        "text": " Héllo",
+        "confidence": None,
+    }
+    assert store.segment(2)["confidence"] == 0.875
+    assert store.excerpt(0, 10) == "Héllo everyone. Ship it."
+
+
+def test_texts_across_blocks(tmp_path):
+    path = str(tmp_path / "meeting.seg")
+    write_segments(path, _segments(200))
+    store = SegmentFile(path)
+    assert len(store) == 200
+    assert [store.text(i) for i in (0, 63, 64, 199)] == [
+        " line 0.",
+        " line 63.",
+        " line 64.",
+        " line 199.",
+    ]
+    # Back to an earlier block after reading later ones.
+    assert store.text(1) == " line 1."
+
+
+def test_time_range_lookups(tmp_path):
+    path = str(tmp_path / "meeting.seg")
+    write_segments(path, _segments(10))
+    store = SegmentFile(path)
+    # Segment i spans 2i..2i+1.5, so 3.6..6.2 overlaps segments 2 and 3.
+    assert store.between(3.6, 6.2) == range(2, 4)
+    assert [s["text"] for s in store.segments(3.6, 6.2)] == [" line 2.", " line 3."]
+    assert store.excerpt(3.6, 6.2) == "line 2. line 3."
+    # A gap between segments matches nothing.
+    assert store.between(1.6, 1.9) == range(1, 1)
+    assert store.excerpt(100, 200) == ""
+
+
+def test_find_matches_whole_words(tmp_path):
+    path = str(tmp_path / "meeting.seg")
+    write_segments(
+        path,
+        [
+            {"start": 0.0, "end": 1.0, "text": " Pricing-wise we wait."},
+            {"start": 1.0, "end": 2.0, "text": " The API is ready."},
+        ],
+    )
+    store = SegmentFile(path)
+    assert store.find(["api"]) == 1
+    assert store.find(["pricing"]) == 0
+    assert store.find(["price"]) is None
+    assert store.find([]) is None
+
+
+def test_empty_file(tmp_path):
+    path = str(tmp_path / "meeting.seg")
+    write_segments(path, [])
+    store = SegmentFile(path)
+    assert len(store) == 0
+    assert store.excerpt(0, 10) == ""
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "meeting.seg"
+    path.write_bytes(b"RIFF" + b"\0" * 64)
+    with pytest.raises(ValueError, match="segment file"):
+        SegmentFile(str(path))
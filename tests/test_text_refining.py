@@ -0,0 +1,51 @@
+import importlib
+import random
+import re
+
+import pytest
+
+refining = importlib.import_module("tools.textRefiningTool")
+
+
+def _reference(text: str) -> str:
+    """The regex pipeline the streaming refiner replaced."""
+    text = text.lower()
+    fillers = r"\b(?:" + "|".join(map(re.escape, refining.FILLER_WORDS)) + r")\b"
+    text = re.sub(fillers, "", text, flags=re.IGNORECASE)
+    polite = r"\b(?:" + "|".join(map(re.escape, refining.POLITE_PHRASES)) + r")\b"
+    text = re.sub(polite, "", text, flags=re.IGNORECASE)
+    text = re.sub(r"\b(\w+)( \1\b)+", r"\1", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Um, so I I I am going to, uh, ship it.", ", i am going to, , ship it."),
+        # Like regex alternation, the earliest listed phrase wins.
+        ("Thank you very much, Sarah!", "very much, sarah!"),
+        ("  I think   we\nneed\n\nmore  tests ", "we need more tests"),
+        ("okay okay", ""),
+    ],
+)
+def test_refines_fillers_repeats_and_whitespace(text, expected):
+    assert refining.textRefiningTool(text) == expected
+
+
+def test_matches_the_regex_pipeline_for_any_chunking():
+    vocabulary = [
+        *refining.FILLER_WORDS,
+        *refining.POLITE_PHRASES,
+        "we", "ship", "Friday", "the", "the", "i", "am", "Σ", "ΟΔΟΣ",
+        "rightly", "ok.", "well,", "\n", "  ",
+    ]  # fmt: skip
+    rng = random.Random(7)
+    for _ in range(200):
+        text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 40)))
+        expected = _reference(text)
+        assert refining.textRefiningTool(text) == expected
+        cuts = sorted(rng.sample(range(len(text) + 1), min(len(text), 5)))
+        chunks = [
+            text[a:b] for a, b in zip([0, *cuts], [*cuts, len(text)], strict=True)
+        ]
+        assert "".join(refining.refine_stream(chunks)) == expected
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+
+import pytest
+
+from utils.transcript_cache import TranscriptCache
+
+KEY = "b" * 64
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TranscriptCache(
+        str(tmp_path), 10**9, lock_stale_seconds=0.4, poll_interval=0.01
+    )
+
+
+def _age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_put_get_round_trip(cache):
+    assert cache.get(KEY) is None
+    cache.put(KEY, {"success": True, "text": "hello"})
+    assert cache.get(KEY) == {"success": True, "text": "hello"}
+
+
+def test_unreadable_entry_is_discarded(cache):
+    with open(cache._entry_path(KEY), "w") as f:
+        f.write("{not json")
+    assert cache.get(KEY) is None
+    assert not os.path.exists(cache._entry_path(KEY))
+
+
+def test_concurrent_claims_compute_once(cache):
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"success": True, "text": "once"}
+
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_compute(KEY, compute))
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result["text"] == "once" for result in results)
+    assert not os.path.exists(cache._lock_path(KEY))
+
+
+def test_heartbeat_keeps_a_slow_claim_from_going_stale(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        # Several stale periods; the heartbeat keeps the lock fresh.
+        time.sleep(1.0)
+        return {"success": True, "text": "slow"}
+
+    owner = threading.Thread(target=cache.get_or_compute, args=(KEY, compute))
+    owner.start()
+    time.sleep(0.05)
+    assert cache.get_or_compute(KEY, compute)["text"] == "slow"
+    owner.join()
+    assert len(calls) == 1
+
+
+def test_stale_lock_of_a_dead_holder_is_broken(cache):
+    lock_path = cache._lock_path(KEY)
+    open(lock_path, "w").close()
+    _age(lock_path, 10)
+
+    with cache.claim(KEY) as cached:
+        assert cached is None
+        assert os.path.exists(lock_path)
+    assert not os.path.exists(lock_path)
+
+
+def test_breaking_a_stale_lock_spares_its_replacement(cache):
+    lock_path = cache._lock_path(KEY)
+    open(lock_path, "w").close()
+    _age(lock_path, 10)
+    # Two waiters see the same stale lock; the first breaks it and a new
+    # owner takes the key before the second gets to it.
+    stale = os.stat(lock_path)
+    cache._break_stale_lock(KEY, stale)
+    token = cache._try_lock(KEY)
+    assert token is not None
+
+    cache._break_stale_lock(KEY, stale)
+    with open(lock_path) as f:
+        assert f.read() == token
+    assert os.listdir(cache.cache_dir) == [os.path.basename(lock_path)]
+
+
+def test_unlock_leaves_a_lock_taken_over_by_another(cache):
+    first = cache._try_lock(KEY)
+    os.remove(cache._lock_path(KEY))
+    second = cache._try_lock(KEY)
+
+    cache._unlock(KEY, first)
+    assert os.path.exists(cache._lock_path(KEY))
+    cache._unlock(KEY, second)
+    assert not os.path.exists(cache._lock_path(KEY))
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = TranscriptCache(str(tmp_path), max_bytes=150)
+    for i, key in enumerate(("old", "mid", "new")):
+        cache.put(key, {"success": True, "text": "x" * 40})
+        _age(cache._entry_path(key), 30 - i * 10)
+
+    cache.put("newest", {"success": True, "text": "x" * 40})
+    assert cache.get("old") is None
+    assert cache.get("newest") is not None
@@ -1,41 +1,483 @@
+import contextlib
 import logging
 import os
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from functools import lru_cache
 from typing import Any
 
-import whisper
+import numpy as np
 from dotenv import load_dotenv
 
 from config.settings import settings
+from utils.audio_chunking import (
+    SAMPLE_RATE,
+    TranscriptStitcher,
+    split_windows,
+    stitch_transcripts,
+)
+from utils.audio_stream import (
+    BYTES_PER_SECOND,
+    decode_blocks,
+    probe_duration,
+    stream_windows,
+)
+from utils.executors import get_transcription_executor, warm_transcription_executor
+from utils.metrics import (
+    audio_seconds,
+    cache_requests,
+    queue_depth,
+    vad_skipped_seconds,
+    whisper_real_time_factor,
+)
+from utils.transcript_cache import TranscriptCache
+from utils.transcription_backends import get_backend
+from utils.vad import SpeechTrimmer, TimestampMap
 
 load_dotenv()  # Load environment variables from .env
 
-# Add to top of speechToTextTool.py
-_model_cache = {}
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def get_transcript_cache() -> TranscriptCache:
+    """The transcript cache, created on first use so imports don't touch disk."""
+    return TranscriptCache(
+        settings.TRANSCRIPT_CACHE_DIR, settings.TRANSCRIPT_CACHE_MAX_SIZE
+    )
+
+
+def preload_local_models() -> threading.Thread:
+    """Start loading the configured Whisper models in this process."""
+    return get_backend().preload(settings.WHISPER_PRELOAD_MODELS)
+
+
+def wait_for_local_models(preload: threading.Thread | None) -> None:
+    """Block until ``preload`` finishes; raise if a configured model failed."""
+    if preload is not None:
+        preload.join()
+    resident = set(get_backend().pool.stats()["resident"])
+    missing = [n for n in settings.WHISPER_PRELOAD_MODELS if n not in resident]
+    if missing:
+        raise RuntimeError(f"Whisper models failed to load: {', '.join(missing)}")
+
+
+def preload_models(wait: bool = False) -> None:
+    """
+    Load the configured Whisper models wherever transcription runs.
+
+    Returns immediately unless ``wait`` is set, in which case it blocks until
+    every worker (or this process) holds them.
+    """
+    if settings.WHISPER_WORKERS > 0:
+        # Each worker process preloads its own model pool on start-up.
+        warm_transcription_executor(wait)
+    else:
+        preload = preload_local_models()
+        if wait:
+            wait_for_local_models(preload)
+
+
+def _submit(fn: Callable, *args: Any) -> Future:
+    """Run a transcription job on the process pool, or inline when it's disabled."""
+    if settings.WHISPER_WORKERS > 0:
+        queue_depth.inc(queue="transcription")
+        future = get_transcription_executor().submit(fn, *args)
+        future.add_done_callback(lambda _: queue_depth.dec(queue="transcription"))
+        return future
+
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _transcribe_audio(engine: str, model_name: str, audio) -> dict[str, Any]:
+    """Transcribe a file path or audio window (runs inside a pool worker)."""
+    return get_backend(engine).transcribe(audio, model_name)
+
+
+class AudioStream:
+    """
+    One recording decoded block by block, with non-speech cut when VAD is on.
+
+    ``duration``, ``timestamps`` and ``vad`` are complete once ``blocks()``
+    has been exhausted.
+    """
+
+    def __init__(self, mp3File: str):
+        self.path = mp3File
+        self.samples = 0
+        self.trimmer = SpeechTrimmer() if settings.VAD_ENABLED else None
+
+    def blocks(self) -> Iterator[np.ndarray]:
+        if settings.WHISPER_STREAMING:
+            source = decode_blocks(self.path)
+        else:
+            import whisper
+
+            source = iter([whisper.load_audio(self.path)])
+        for block in source:
+            self.samples += len(block)
+            yield self.trimmer.trim(block) if self.trimmer else block
+
+    @property
+    def duration(self) -> float:
+        """Seconds of the original recording decoded so far."""
+        return self.samples / SAMPLE_RATE
+
+    @property
+    def timestamps(self) -> TimestampMap | None:
+        return self.trimmer.timestamps if self.trimmer else None
+
+    @property
+    def vad(self) -> dict[str, Any] | None:
+        return self.trimmer.stats() if self.trimmer else None
+
+
+def _to_original(
+    segments: list[dict[str, Any]], offset: float, timestamps: TimestampMap | None
+) -> list[dict[str, Any]]:
+    """Shift segment times by ``offset`` and map them onto the original audio."""
+    mapped = []
+    for segment in segments:
+        start, end = segment["start"] + offset, segment["end"] + offset
+        if timestamps is not None:
+            start = timestamps.to_original(start)
+            end = timestamps.to_original(end, end=True)
+        mapped.append(
+            {
+                "start": round(start, 2),
+                "end": round(end, 2),
+                "text": segment["text"],
+                "confidence": segment.get("confidence"),
+            }
+        )
+    return mapped
+
+
+def _transcript(
+    text: str,
+    language: str,
+    duration: float,
+    segments: list[dict[str, Any]],
+    vad: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    transcript = {
+        "success": True,
+        "text": text,
+        "language": language,
+        "duration": duration,
+        "segments": segments,
+    }
+    if vad is not None:
+        transcript["vad"] = vad
+    return transcript
+
+
+def _transcribe_file(engine: str, model_name: str, mp3File: str) -> dict[str, Any]:
+    """Transcribe a whole file in one pass (runs inside a pool worker)."""
+    if not settings.VAD_ENABLED:
+        # Whisper decodes the file itself.
+        result = _transcribe_audio(engine, model_name, mp3File)
+        return _transcript(
+            result["text"],
+            result["language"],
+            result["duration"],
+            _to_original(result.get("segments", []), 0, None),
+        )
+
+    stream = AudioStream(mp3File)
+    speech = np.concatenate([np.zeros(0, np.float32), *stream.blocks()])
+    if not len(speech):
+        return _transcript("", "unknown", stream.duration, [], stream.vad)
+    result = _transcribe_audio(engine, model_name, speech)
+    return _transcript(
+        result["text"],
+        result["language"],
+        stream.duration,
+        _to_original(result.get("segments", []), 0, stream.timestamps),
+        stream.vad,
+    )
+
+
+def _memory_budget() -> int:
+    return int(settings.WHISPER_JOB_MEMORY_MB * 1024 * 1024)
+
+
+def _transcribe_windows(
+    stream: AudioStream,
+) -> Iterator[tuple[tuple[int, int], dict[str, Any]]]:
+    """
+    Transcribe the stream's overlapping windows, yielding results in order.
+
+    Windows are queued on the process pool as they are decoded, but no more
+    than WHISPER_JOB_MEMORY_MB of audio is held for this job at once: past
+    that, the oldest window is awaited before more audio is read.
+    """
+    budget = _memory_budget()
+    pending: deque[tuple[tuple[int, int], Future, int]] = deque()
+    in_flight = 0
+    try:
+        for start, samples in stream_windows(
+            stream.blocks(),
+            settings.WHISPER_CHUNK_SECONDS,
+            settings.WHISPER_CHUNK_OVERLAP_SECONDS,
+        ):
+            while pending and in_flight + samples.nbytes > budget:
+                window, future, size = pending.popleft()
+                in_flight -= size
+                yield window, future.result()
+            future = _submit(
+                _transcribe_audio,
+                settings.TRANSCRIPTION_ENGINE,
+                settings.WHISPER_MODEL,
+                samples,
+            )
+            pending.append(((start, start + len(samples)), future, samples.nbytes))
+            in_flight += samples.nbytes
+        while pending:
+            window, future, _ = pending.popleft()
+            yield window, future.result()
+    finally:
+        # Closed early: drop windows the pool hasn't started on.
+        for _, future, _ in pending:
+            future.cancel()
+
+
+def _window_segments(
+    stream: AudioStream,
+    windows: list[tuple[int, int]],
+    results: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """
+    Segments of all windows on the original timeline.
+
+    Windows overlap, so each overlap is split down the middle: a segment is
+    kept only by the window its midpoint falls in.
+    """
+    half_overlap = settings.WHISPER_CHUNK_OVERLAP_SECONDS / 2
+    segments = []
+    for index, ((start, end), result) in enumerate(zip(windows, results, strict=True)):
+        offset = start / SAMPLE_RATE
+        low = half_overlap if index else float("-inf")
+        high = (end - start) / SAMPLE_RATE - half_overlap
+        if index == len(windows) - 1:
+            high = float("inf")
+        kept = [
+            segment
+            for segment in result.get("segments", [])
+            if low <= (segment["start"] + segment["end"]) / 2 < high
+        ]
+        segments.extend(_to_original(kept, offset, stream.timestamps))
+    return segments
+
+
+def _record_transcription(started: float, transcript: dict[str, Any]) -> None:
+    elapsed = time.perf_counter() - started
+    duration = transcript["duration"]
+    if duration > 0:
+        audio_seconds.inc(duration)
+        whisper_real_time_factor.observe(elapsed / duration)
+    logger.info(f"Transcribed {duration:.0f}s of audio in {elapsed:.1f}s")
+    if "vad" in transcript:
+        vad = transcript["vad"]
+        vad_skipped_seconds.inc(vad["skipped_seconds"])
+        logger.info(
+            f"VAD skipped {vad['skipped_seconds']:.0f}s of "
+            f"{vad['original_seconds']:.0f}s ({vad['skipped_ratio']:.0%})"
+        )
+
+
+def _majority_language(results: list[dict[str, Any]]) -> str:
+    languages = Counter(r["language"] for r in results)
+    return languages.most_common(1)[0][0] if languages else "unknown"
+
+
+def _chunked_transcript(
+    stream: AudioStream,
+    windows: list[tuple[int, int]],
+    results: list[dict[str, Any]],
+) -> dict[str, Any]:
+    return _transcript(
+        stitch_transcripts(
+            [r["text"] for r in results], settings.WHISPER_CHUNK_OVERLAP_SECONDS
+        ),
+        _majority_language(results),
+        stream.duration,
+        _window_segments(stream, windows, results),
+        stream.vad,
+    )
+
+
+def _transcribe_chunked(mp3File: str) -> dict[str, Any]:
+    """Transcribe overlapping windows in parallel and stitch the results."""
+    stream = AudioStream(mp3File)
+    windows, results = [], []
+    for window, result in _transcribe_windows(stream):
+        windows.append(window)
+        results.append(result)
+    logger.info(f"Transcribed {len(windows)} windows")
+    return _chunked_transcript(stream, windows, results)
+
+
+def _expected_windows(mp3File: str) -> int | None:
+    """Number of windows the file will be split into, if known up front."""
+    duration = probe_duration(mp3File)
+    if duration is None or settings.VAD_ENABLED:
+        return None
+    return len(
+        split_windows(
+            round(duration * SAMPLE_RATE),
+            settings.WHISPER_CHUNK_SECONDS,
+            settings.WHISPER_CHUNK_OVERLAP_SECONDS,
+        )
+    )
+
+
+def iter_transcript_windows(mp3File: str) -> Iterator[dict[str, Any]]:
+    """
+    Transcribe in overlapping windows, yielding stitched text as it settles.
+
+    One item is yielded per window, in order, as soon as that window and all
+    earlier ones are done: ``text`` holds the newly stitched words, plus
+    ``window`` (1-based) and ``windows`` (the expected total, None when VAD
+    makes it unknown). A final item carries the remaining words and the
+    complete ``transcript`` result, which is also cached.
+
+    The recording's cache lock is held throughout, so other processes wait
+    for this transcript; if one was cached meanwhile, only the final item is
+    yielded.
+    """
+    with contextlib.ExitStack() as stack:
+        if settings.TRANSCRIPT_CACHE_ENABLED:
+            key = _cache_key(mp3File)
+            cached = stack.enter_context(get_transcript_cache().claim(key))
+            if cached is not None:
+                yield {
+                    "text": cached["text"],
+                    "window": 0,
+                    "windows": 0,
+                    "transcript": cached,
+                }
+                return
+        yield from _stream_transcript_windows(mp3File)
+
+
+def _stream_transcript_windows(mp3File: str) -> Iterator[dict[str, Any]]:
+    started = time.perf_counter()
+    stream = AudioStream(mp3File)
+    expected = _expected_windows(mp3File)
+    stitcher = TranscriptStitcher(settings.WHISPER_CHUNK_OVERLAP_SECONDS)
+    windows, results = [], []
+    for window, result in _transcribe_windows(stream):
+        windows.append(window)
+        results.append(result)
+        yield {
+            "text": stitcher.add(result["text"]),
+            "window": len(windows),
+            # Probed durations can be off by a few samples.
+            "windows": max(expected, len(windows)) if expected else None,
+        }
+
+    transcript = _chunked_transcript(stream, windows, results)
+    _record_transcription(started, transcript)
+    if settings.TRANSCRIPT_CACHE_ENABLED:
+        try:
+            get_transcript_cache().put(_cache_key(mp3File), transcript)
+        except OSError as e:
+            logger.warning(f"Could not cache transcript: {e}")
+    yield {
+        "text": stitcher.finish(),
+        "window": len(windows),
+        "windows": len(windows),
+        "transcript": transcript,
+    }
+
+
+def _chunked(mp3File: str) -> bool:
+    """Chunked mode, also used when decoding the whole file would bust the budget."""
+    if settings.WHISPER_CHUNKED:
+        return True
+    duration = probe_duration(mp3File)
+    return duration is not None and duration * BYTES_PER_SECOND > _memory_budget()
+
+
+def _transcribe(mp3File: str) -> dict[str, Any]:
+    started = time.perf_counter()
+    if _chunked(mp3File):
+        transcript = _transcribe_chunked(mp3File)
+    else:
+        transcript = _submit(
+            _transcribe_file,
+            settings.TRANSCRIPTION_ENGINE,
+            settings.WHISPER_MODEL,
+            mp3File,
+        ).result()
+
+    _record_transcription(started, transcript)
+    return transcript
+
+
+def _decode_options(mp3File: str) -> dict[str, Any]:
+    """Settings that change the transcript and therefore belong in the cache key."""
+    chunked = _chunked(mp3File)
+    options: dict[str, Any] = {**get_backend().options(), "chunked": chunked}
+    if chunked:
+        options["chunk_seconds"] = settings.WHISPER_CHUNK_SECONDS
+        options["chunk_overlap_seconds"] = settings.WHISPER_CHUNK_OVERLAP_SECONDS
+    if settings.VAD_ENABLED:
+        options["vad"] = {
+            # Streamed audio is analysed block by block.
+            "streaming": settings.WHISPER_STREAMING,
+            "frame_ms": settings.VAD_FRAME_MS,
+            "energy_threshold_db": settings.VAD_ENERGY_THRESHOLD_DB,
+            "min_modulation_db": settings.VAD_MIN_MODULATION_DB,
+            "min_speech_ms": settings.VAD_MIN_SPEECH_MS,
+            "min_silence_ms": settings.VAD_MIN_SILENCE_MS,
+            "pad_ms": settings.VAD_PAD_MS,
+        }
+    return options
+
+
+def _cache_key(mp3File: str) -> str:
+    return get_transcript_cache().make_key(
+        mp3File, settings.WHISPER_MODEL, _decode_options(mp3File)
+    )
+
+
+def cached_transcript(mp3File: str) -> dict[str, Any] | None:
+    """Return the cached transcription result for the file, if there is one."""
+    if not settings.TRANSCRIPT_CACHE_ENABLED or not os.path.exists(mp3File):
+        return None
+    try:
+        result = get_transcript_cache().get(_cache_key(mp3File))
+    except OSError as e:
+        logger.warning(f"Transcript cache lookup failed: {e}")
+        return None
+    if result is not None:
+        # Misses are counted where the transcript is then computed.
+        cache_requests.inc(cache="transcript", result="hit")
+    return result
+
+
 def speechToTextTool(mp3File: str) -> dict[str, Any]:
     """Tool to convert mp3 file to text with comprehensive error handling."""
     try:
         if not os.path.exists(mp3File):
             raise FileNotFoundError(f"Audio file not found: {mp3File}")
 
-        if settings.WHISPER_MODEL not in _model_cache:
-            logger.info("Loading Whisper model...")
-            _model_cache[settings.WHISPER_MODEL] = whisper.load_model(
-                settings.WHISPER_MODEL
+        if settings.TRANSCRIPT_CACHE_ENABLED:
+            # Concurrent uploads of the same recording wait for one transcription.
+            return get_transcript_cache().get_or_compute(
+                _cache_key(mp3File), lambda: _transcribe(mp3File)
             )
-
-        logger.info("model loaded!!!!!!!!!")
-        model = _model_cache[settings.WHISPER_MODEL]
-        transcript = model.transcribe(mp3File)
-        logger.info(f"transcript: {transcript['text']}")
-        return {
-            "success": True,
-            "text": transcript["text"],
-            "language": transcript.get("language", "unknown"),
-            "duration": transcript.get("duration", 0),
-        }
+        return _transcribe(mp3File)
     except FileNotFoundError as e:
         logger.error(f"File error: {e}")
         return {"success": False, "error": str(e)}
@@ -1,25 +1,56 @@
+import asyncio
+import hashlib
 import json
 import logging
+import re
+from collections.abc import AsyncIterator, Callable
+from functools import lru_cache
+from typing import get_args, get_origin
 
 from dotenv import load_dotenv
 
 from config.settings import settings
 from models.meeting_schema import MeetingSummary
+from utils.json_repair import loads_lenient
+from utils.json_stream import IncrementalJSONParser
+from utils.llm_cache import LLMCache
 from utils.openai_client import OpenAIClient
+from utils.token_utils import chunk_text, count_tokens
 
 load_dotenv()  # Load environment variables from .env
-client = OpenAIClient().client
 logger = logging.getLogger(__name__)
 
+_LIST_FIELDS = [
+    name
+    for name, field in MeetingSummary.model_fields.items()
+    if list in (get_origin(arg) for arg in get_args(field.annotation))
+]
+_NORMALIZE_ITEM_RE = re.compile(r"[^\w]+")
 
-def summaryTool(text: str) -> dict:
-    """
-    You are a meeting summarizer. You will be given a meeting transcript and you will need to summarize the meeting, don't ask further questions.
-    """
+# Receives the fields of a summary that is still being generated.
+FieldsCallback = Callable[[dict], None]
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> LLMCache | None:
+    """The response cache (None when disabled), opened on first use."""
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    return LLMCache(
+        settings.LLM_CACHE_PATH,
+        settings.LLM_CACHE_TTL_SECONDS,
+        settings.LLM_CACHE_MAX_ENTRIES,
+    )
+
+
+# Built once so the prompt prefix is byte-identical across calls and the
+# provider's prompt cache can reuse it.
+@lru_cache(maxsize=1)
+def _build_system_prompt() -> str:
     schema = MeetingSummary.model_json_schema()
     schemaData = json.dumps(schema, indent=2)
 
-    systemPrompt = f"""
+    return f"""
             You are a meeting summarizer. You will be given a meeting transcript.
             Your task is to generate a strict JSON summary of a meeting, following this JSON schema exactly:
 
@@ -28,26 +59,269 @@ def summaryTool(text: str) -> dict:
             Please respond with **valid JSON only**. Do not include any explanation, markdown, or commentary and don't ask further questions. Do not wrap the JSON in code blocks. Only the raw JSON object should be returned.
             """
 
-    print("ready to call summary tool!!!")
 
-    # Optionally validate it's proper JSON
-    try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            temperature=settings.OPENAI_TEMPERATURE,
-            messages=[
-                {"role": "system", "content": systemPrompt},
-                {"role": "user", "content": f"Here is the meeting transcript: {text}"},
-            ],
+def _strict_schema(node):
+    """Adapt a pydantic JSON schema to OpenAI's strict structured-output subset."""
+    if isinstance(node, list):
+        return [_strict_schema(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    strict = {k: _strict_schema(v) for k, v in node.items() if k != "default"}
+    if strict.get("type") == "object":
+        strict["additionalProperties"] = False
+        strict["required"] = list(strict.get("properties", {}))
+    return strict
+
+
+@lru_cache(maxsize=1)
+def _response_format() -> dict:
+    """Extra request arguments for SUMMARY_RESPONSE_FORMAT."""
+    if settings.SUMMARY_RESPONSE_FORMAT == "json_schema":
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "MeetingSummary",
+                    "strict": True,
+                    "schema": _strict_schema(MeetingSummary.model_json_schema()),
+                },
+            }
+        }
+    if settings.SUMMARY_RESPONSE_FORMAT == "json_object":
+        return {"response_format": {"type": "json_object"}}
+    return {}
+
+
+async def _request_summary(
+    system_prompt: str,
+    user_content: str,
+    bypass_cache: bool = False,
+    on_fields: FieldsCallback | None = None,
+) -> dict:
+    llm_cache = get_llm_cache()
+    if llm_cache is None:
+        return await _call_summary_model(system_prompt, user_content, on_fields)
+    # The system prompt embeds the schema, so schema changes change the key.
+    key = LLMCache.make_key(
+        model=settings.OPENAI_MODEL,
+        temperature=settings.OPENAI_TEMPERATURE,
+        response_format=settings.SUMMARY_RESPONSE_FORMAT,
+        system_prompt=hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+        user_content=user_content,
+    )
+    return await llm_cache.get_or_compute(
+        key,
+        lambda: _call_summary_model(system_prompt, user_content, on_fields),
+        bypass=bypass_cache,
+    )
+
+
+async def _call_summary_model(
+    system_prompt: str, user_content: str, on_fields: FieldsCallback | None = None
+) -> dict:
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content},
+    ]
+    request = {
+        "model": settings.OPENAI_MODEL,
+        "temperature": settings.OPENAI_TEMPERATURE,
+        "messages": messages,
+        **_response_format(),
+    }
+    if on_fields is None:
+        content = await _complete(request)
+    else:
+        # Report each field as soon as its JSON value is complete
+        parser = IncrementalJSONParser()
+        async for delta in OpenAIClient().stream_chat_completion(**request):
+            if parser.feed(delta):
+                on_fields(dict(parser.fields))
+        content = parser.text.strip()
+
+    # A malformed reply is repaired locally first, then re-asked a bounded
+    # number of times rather than failing the whole pipeline.
+    for attempt in range(settings.SUMMARY_REPAIR_ATTEMPTS + 1):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Summary reply: {len(content)} chars, {count_tokens(content)} tokens"
+            )
+        try:
+            # ✅ Parse JSON from the string
+            summary_data = _parse_summary(content)
+        except ValueError as e:
+            if attempt == settings.SUMMARY_REPAIR_ATTEMPTS:
+                raise ValueError("Response from model is not valid JSON") from e
+            logger.warning(f"Unparseable summary reply, asking again: {e}")
+            request["messages"] = [
+                *messages,
+                {"role": "assistant", "content": content},
+                {
+                    "role": "user",
+                    "content": f"Your reply could not be parsed: {e}. Respond "
+                    "again with only the corrected JSON object.",
+                },
+            ]
+            content = await _complete(request)
+            continue
+        logger.debug(f"Parsed summary with {len(summary_data)} fields")
+        return summary_data
+
+
+async def _complete(request: dict) -> str:
+    response = await OpenAIClient().chat_completion(**request)
+    return (response.choices[0].message.content or "").strip()
+
+
+def _parse_summary(content: str) -> dict:
+    """Parse a reply leniently and check it against MeetingSummary."""
+    summary_data = loads_lenient(content)
+    if not isinstance(summary_data, dict):
+        raise ValueError("Expected a JSON object")
+    # pydantic's ValidationError is a ValueError
+    MeetingSummary.model_validate(_unwrap(summary_data))
+    return summary_data
+
+
+def _unwrap(summary: dict) -> dict:
+    """Models sometimes echo the schema shape; return the plain field values."""
+    if isinstance(summary, dict) and "properties" in summary:
+        return summary["properties"]
+    return summary
+
+
+def merge_summaries(partials: list[dict]) -> dict:
+    """
+    Deterministically merge partial summaries of consecutive transcript chunks.
+
+    List fields are concatenated in order with duplicates (compared
+    case- and punctuation-insensitively) dropped, the summary texts are joined,
+    and other scalar fields keep the first value any chunk reported.
+    """
+    merged: dict = {}
+    for name in MeetingSummary.model_fields:
+        values = [_unwrap(p).get(name) for p in partials]
+        if name in _LIST_FIELDS:
+            items, seen = [], set()
+            for value in values:
+                for item in value or []:
+                    key = _NORMALIZE_ITEM_RE.sub(" ", str(item).lower()).strip()
+                    if key and key not in seen:
+                        seen.add(key)
+                        items.append(item)
+            merged[name] = items
+        elif name == "summary":
+            merged[name] = " ".join(str(v).strip() for v in values if v) or None
+        else:
+            merged[name] = next((v for v in values if v), None)
+    return merged
+
+
+async def summarize_part(
+    text: str, part: int, total: int | None = None, bypass_cache: bool = False
+) -> dict:
+    """Summarize one part (1-based) of a longer transcript, for ``reduce_summaries``."""
+    of_total = f" of {total}" if total else ""
+    return _unwrap(
+        await _request_summary(
+            _build_system_prompt(),
+            f"Here is part {part}{of_total} of the meeting transcript: {text}",
+            bypass_cache,
         )
-        content = response.choices[0].message.content.strip()
-        logger.info(f"got content: {content}")
-        # ✅ Parse JSON from the string
-        summary_data = json.loads(content)
-        logger.info(f"summary_data: {summary_data}")
-
-        # summary_data = json.loads({"properties": {"agenda": {"items": ["Progress on the onboarding flow", "Updates on the analytics dashboard", "Status of customer feedback processing"], "title": "Agenda", "type": "array"}, "location": {"anyOf": [{"type": "string", "value": "Online"}, {"type": "None"}], "title": "Location"}, "date": {"anyOf": [{"type": "string", "value": "Not specified"}, {"type": "None"}], "title": "Date"}, "time": {"anyOf": [{"type": "string", "value": "Not specified"}, {"type": "None"}], "title": "Time"}, "duration": {"anyOf": [{"type": "string", "value": "Not specified"}, {"type": "None"}], "title": "Duration"}, "participants": {"items": ["John", "Sarah", "Raj", "Lisa"], "title": "Participants", "type": "array"}, "topics": {"items": ["Onboarding flow progress", "Analytics dashboard updates", "Customer feedback processing status"], "title": "Topics", "type": "array"}, "summary": {"title": "Summary", "type": "string", "value": "The team discussed the progress of various tasks. Sarah is finishing the onboarding flow, Raj is fixing bugs in the analytics dashboard, and Lisa is preparing a summary report of customer feedback."}, "key_points": {"items": ["Sarah finished the UI components for the onboarding flow", "Raj is fixing bugs with dynamic filtering in the analytics dashboard", "Lisa has categorized about 300 customer responses"], "title": "Key Points", "type": "array"}, "action_items": {"items": ["Sarah to integrate UI components with the backend and complete testing", "Raj to fix bugs and pass the dashboard to Ka", "Lisa to prepare a summary report of customer feedback"], "title": "Action Items", "type": "array"}, "next_steps": {"items": ["Wrap up all tasks before Friday"], "title": "Next Steps", "type": "array"}, "decisions": {"items": [], "title": "Decisions", "type": "array"}, "recommendations": {"items": [], "title": "Recommendations", "type": "array"}, "follow_ups": {"items": [], "title": "Follow Ups", "type": "array"}, "questions": {"items": [], "title": "Questions", "type": "array"}, "concerns": {"items": [], "title": "Concerns", "type": "array"}, "feedback": {"items": [], "title": "Feedback", "type": "array"}, "suggestions": {"items": [], "title": "Suggestions", "type": "array"}, "improvements": {"items": [], "title": "Improvements", "type": "array"}}, "required": ["agenda", "location", "date", "time", "duration", "participants", "topics", "summary", "key_points", "action_items", "next_steps", "decisions", "recommendations", "follow_ups", "questions", "concerns", "feedback", "suggestions", "improvements"], "title": "MeetingSummary", "type": "object"});
-        # return {"properties": {"agenda": ["Onboarding flow progress", "Analytics dashboard update", "Customer feedback processing"], "location": None, "date": None, "time": None, "duration": None, "participants": ["John", "Sarah", "Raj", "Lisa"], "topics": ["Onboarding flow", "Analytics dashboard", "Customer feedback"], "summary": "The team discussed the progress of various tasks. Sarah is integrating the UI components with the backend and testing should be done by tomorrow. Raj is fixing bugs with dynamic filtering in the analytics dashboard. Lisa has categorized about 300 customer responses and will prepare a summary report by end of day. The aim is to wrap all tasks up before Friday.", "key_points": ["Sarah finished the UI components for the onboarding flow", "Raj is fixing bugs in the analytics dashboard", "Lisa has categorized 300 customer responses"], "action_items": ["Sarah to integrate UI components with backend and complete testing", "Raj to fix bugs in analytics dashboard", "Lisa to prepare summary report of customer feedback"], "next_steps": ["Sarah to complete testing of onboarding flow", "Raj to fix bugs and pass the dashboard to Ka", "Lisa to prepare customer feedback summary report"], "decisions": ["All tasks to be wrapped up before Friday"], "recommendations": [], "follow_ups": [], "questions": [], "concerns": [], "feedback": [], "suggestions": [], "improvements": []}, "title": "MeetingSummary", "type": "object"};
-        return summary_data  # ensure it's valid JSON
-    except json.JSONDecodeError as e:
-        raise ValueError("Response from model is not valid JSON") from e
+    )
+
+
+async def reduce_summaries(
+    partials: list[dict],
+    bypass_cache: bool = False,
+    on_fields: FieldsCallback | None = None,
+) -> dict:
+    """Combine part summaries in order, per SUMMARY_REDUCE_MODE."""
+    if settings.SUMMARY_REDUCE_MODE == "llm":
+        return await _request_summary(
+            _build_system_prompt(),
+            "Here are JSON summaries of consecutive parts of one meeting. Merge "
+            "them into a single summary of the whole meeting, removing duplicate "
+            f"items: {json.dumps(partials)}",
+            bypass_cache,
+            on_fields,
+        )
+    return merge_summaries(partials)
+
+
+async def _summarize_map_reduce(
+    text: str,
+    bypass_cache: bool = False,
+    on_fields: FieldsCallback | None = None,
+) -> dict:
+    chunks = chunk_text(
+        text, settings.SUMMARY_CHUNK_TOKENS, settings.SUMMARY_CHUNK_OVERLAP_TOKENS
+    )
+    logger.info(
+        f"Transcript too long for one call; summarizing {len(chunks)} chunks "
+        f"with concurrency {settings.SUMMARY_MAP_CONCURRENCY}"
+    )
+    semaphore = asyncio.Semaphore(max(1, settings.SUMMARY_MAP_CONCURRENCY))
+    partials: list[dict | None] = [None] * len(chunks)
+
+    async def summarize_chunk(index: int, chunk: str) -> None:
+        async with semaphore:
+            partials[index] = await summarize_part(
+                chunk, index + 1, len(chunks), bypass_cache
+            )
+        if on_fields is not None and settings.SUMMARY_REDUCE_MODE != "llm":
+            on_fields(merge_summaries([p for p in partials if p is not None]))
+
+    await asyncio.gather(
+        *(summarize_chunk(index, chunk) for index, chunk in enumerate(chunks))
+    )
+    return await reduce_summaries(partials, bypass_cache, on_fields)
+
+
+async def summaryToolAsync(
+    text: str, bypass_cache: bool = False, on_fields: FieldsCallback | None = None
+) -> dict:
+    """
+    Async variant of ``summaryTool`` for callers already on an event loop.
+
+    ``on_fields``, if given, is called with the summary fields completed so far
+    while the response streams in.
+    """
+    systemPrompt = _build_system_prompt()
+
+    # Long transcripts are summarized chunk by chunk and merged
+    if count_tokens(text) > settings.SUMMARY_CHUNK_TOKENS:
+        return await _summarize_map_reduce(text, bypass_cache, on_fields)
+    return await _request_summary(
+        systemPrompt,
+        f"Here is the meeting transcript: {text}",
+        bypass_cache,
+        on_fields,
+    )
+
+
+async def summaryToolStream(
+    text: str, bypass_cache: bool = False
+) -> AsyncIterator[tuple[dict, bool]]:
+    """
+    Yield ``(summary, complete)`` pairs: partial summaries holding the fields
+    finished so far, then the complete summary. Cached responses arrive whole.
+    """
+    updates: asyncio.Queue = asyncio.Queue()
+    task = asyncio.ensure_future(
+        summaryToolAsync(text, bypass_cache, on_fields=updates.put_nowait)
+    )
+    task.add_done_callback(lambda _: updates.put_nowait(None))
+    try:
+        while (fields := await updates.get()) is not None:
+            yield fields, False
+        yield _unwrap(await task), True
+    finally:
+        task.cancel()
+
+
+def summaryTool(text: str, bypass_cache: bool = False) -> dict:
+    """
+    You are a meeting summarizer. You will be given a meeting transcript and you will need to summarize the meeting, don't ask further questions.
+    """
+    return OpenAIClient().run_sync(summaryToolAsync(text, bypass_cache))
@@ -1,5 +1,7 @@
 import logging
 import re
+from collections import deque
+from collections.abc import Iterable, Iterator
 
 # List of common filler words and phrases to remove
 
@@ -39,33 +41,175 @@ POLITE_PHRASES = [
 
 logger = logging.getLogger(__name__)
 
+# The refiner works on a token stream that strictly alternates separator and
+# word: ``sep, (word, sep)*``. Words are maximal runs of regex ``\w``
+# characters, separators everything in between (possibly "" at either end).
+# Phrase removal, repeat collapsing and whitespace normalization are chained
+# generators over that stream, so the transcript is scanned once and no
+# intermediate copies of it are built.
+_WORD_SPLIT_RE = re.compile(r"(\w+)")
+_WHITESPACE_RE = re.compile(r"\s+")
+# After lower(), these are the only characters that case-insensitive regex
+# matching treats as equal to the ASCII letters used in the phrase lists.
+_CASE_FOLD = str.maketrans({"ı": "i", "ſ": "s"})
+_TERMINAL = ""
+# Long strings are fed through the stream in slices to bound token buffers.
+_SLICE_SIZE = 64 * 1024
+
+
+class _PhraseTrie:
+    """Word-level trie of phrases whose words are separated by single spaces."""
+
+    def __init__(self, phrases: list[str]):
+        self.root: dict = {}
+        self.max_words = 0
+        for index, phrase in enumerate(phrases):
+            words = phrase.lower().split(" ")
+            node = self.root
+            for word in words:
+                node = node.setdefault(word, {})
+            # Like regex alternation, the earliest listed phrase wins.
+            node.setdefault(_TERMINAL, index)
+            self.max_words = max(self.max_words, len(words))
+
+
+_FILLER_TRIE = _PhraseTrie(FILLER_WORDS)
+_POLITE_TRIE = _PhraseTrie(POLITE_PHRASES)
+
+
+def _fold(word: str) -> str:
+    return word if word.isascii() else word.translate(_CASE_FOLD)
+
+
+def _lowercase_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """Lowercase streamed text exactly as ``str.lower`` would on the whole text."""
+    # Final-sigma lowercasing looks at neighbouring characters, so only text up
+    # to the last whitespace of a chunk is final; the rest waits for more input.
+    pending = ""
+    for chunk in chunks:
+        # ``pending`` holds no whitespace, so only the new chunk is searched.
+        cut = len(chunk)
+        while cut and not chunk[cut - 1].isspace():
+            cut -= 1
+        if not cut:
+            pending += chunk
+            continue
+        yield (pending + chunk[:cut]).lower()
+        pending = chunk[cut:]
+    if pending:
+        yield pending.lower()
+
+
+def _tokenize(pieces: Iterable[str]) -> Iterator[str]:
+    # Pieces end after whitespace, so words never straddle two pieces, but
+    # separators can and are merged back together.
+    separator = ""
+    for piece in pieces:
+        parts = _WORD_SPLIT_RE.split(piece)
+        parts[0] = separator + parts[0]
+        separator = parts.pop()
+        yield from parts
+    yield separator
+
+
+def _remove_phrases(tokens: Iterator[str], trie: _PhraseTrie) -> Iterator[str]:
+    """Drop trie phrases, merging the separators on either side of each one."""
+    root = trie.root
+    lookahead: deque[tuple[str, str]] = deque()
+    separator = next(tokens)
+    while True:
+        if lookahead:
+            word, next_separator = lookahead.popleft()
+        else:
+            word = next(tokens, None)
+            if word is None:
+                break
+            next_separator = next(tokens)
+
+        node = root.get(_fold(word))
+        if node is not None:
+            best_index = node.get(_TERMINAL)
+            best_words = 1
+            words = 1
+            gap = next_separator
+            while gap == " " and words < trie.max_words:
+                if len(lookahead) < words:
+                    following = next(tokens, None)
+                    if following is None:
+                        break
+                    lookahead.append((following, next(tokens)))
+                following, after = lookahead[words - 1]
+                node = node.get(_fold(following))
+                if node is None:
+                    break
+                words += 1
+                index = node.get(_TERMINAL)
+                if index is not None and (best_index is None or index < best_index):
+                    best_index, best_words = index, words
+                gap = after
+
+            if best_index is not None:
+                for _ in range(best_words - 1):
+                    _, next_separator = lookahead.popleft()
+                separator += next_separator
+                continue
+
+        yield separator
+        yield word
+        separator = next_separator
+    yield separator
+
+
+def _collapse_repeats(tokens: Iterator[str]) -> Iterator[str]:
+    """Collapse runs of the same word separated by single spaces ("i i i am")."""
+    yield next(tokens)
+    held_word = next(tokens, None)
+    if held_word is None:
+        return
+    held_separator = next(tokens)
+    for word in tokens:
+        separator = next(tokens)
+        if held_separator == " " and word == held_word:
+            held_separator = separator
+            continue
+        yield held_word
+        yield held_separator
+        held_word, held_separator = word, separator
+    yield held_word
+    yield held_separator
+
+
+def _normalize_whitespace(tokens: Iterator[str]) -> Iterator[str]:
+    """Squash whitespace runs to one space and strip both ends of the text."""
+    separator = _WHITESPACE_RE.sub(" ", next(tokens)).lstrip(" ")
+    for word in tokens:
+        yield separator
+        yield word
+        separator = next(tokens)
+        if separator != " ":
+            separator = _WHITESPACE_RE.sub(" ", separator)
+    yield separator.rstrip(" ")
+
+
+def refine_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """Refine streamed transcript text, yielding refined pieces as they are ready."""
+    tokens = _tokenize(_lowercase_chunks(chunks))
+    tokens = _remove_phrases(tokens, _FILLER_TRIE)
+    tokens = _remove_phrases(tokens, _POLITE_TRIE)
+    return _normalize_whitespace(_collapse_repeats(tokens))
+
 
 def textRefiningTool(text):
     """Tool to refine the text and remove any unnecessary information."""
     try:
-        if not isinstance(text, str):
-            raise ValueError("Input must be a string")
-
-        # 1. Lowercase the text for uniformity
-        text = text.lower()
-
-        # 2. Remove filler words
-        filler_pattern = (
-            r"\b(?:" + "|".join(re.escape(w) for w in FILLER_WORDS) + r")\b"
-        )
-        text = re.sub(filler_pattern, "", text, flags=re.IGNORECASE)
-
-        # 3. Remove polite/empty phrases
-        polite_pattern = (
-            r"\b(?:" + "|".join(re.escape(word) for word in POLITE_PHRASES) + r")\b"
-        )
-        text = re.sub(polite_pattern, "", text, flags=re.IGNORECASE)
-
-        # 4. Remove repeated words (like "I I I am going")
-        text = re.sub(r"\b(\w+)( \1\b)+", r"\1", text)
-
-        # 5. Remove extra spaces and line breaks
-        text = re.sub(r"\s+", " ", text).strip()
-        return text
+        if isinstance(text, str):
+            slices = (
+                text[start : start + _SLICE_SIZE]
+                for start in range(0, len(text), _SLICE_SIZE)
+            )
+            return "".join(refine_stream(slices))
+        if isinstance(text, Iterable):
+            return "".join(refine_stream(text))
+        raise ValueError("Input must be a string or an iterable of strings")
     except Exception as e:
-        print(f"Error refining transcript: {e}")
+        logger.exception(f"Error refining transcript: {e}")
@@ -3,6 +3,7 @@ Optimized UI module for the Agentic Summarizer App.
 Features improved error handling, progress tracking, and user experience.
 """
 
+import asyncio
 import logging
 import os
 import tempfile
@@ -12,9 +13,12 @@ import gradio as gr
 from dotenv import load_dotenv
 
 from config.settings import settings
-from main import summaryAgent
+from main import resolve_job, summaryAgent
+from utils.executors import shutdown_executors
 from utils.file_utils import cleanup_temp_file, validate_audio_file
 from utils.logging_config import setup_logging
+from utils.metrics import start_metrics_server
+from utils.warmup import warmup
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -113,43 +117,56 @@ class UIComponents:
 
 
 async def gradio_wrapper(
-    audio_path: str, progress=gr.Progress()
-) -> AsyncGenerator[tuple[str, str | None], None]:
+    audio_path: str | None, progress=gr.Progress(), job_id: str | None = None
+) -> AsyncGenerator[tuple[str, str | None, str], None]:
     """
     Enhanced wrapper for the summary agent with comprehensive error handling and progress tracking.
 
     Args:
         audio_path: Path to the audio file
         progress: Gradio progress tracker
+        job_id: Job to reattach to instead of starting from a file
 
     Yields:
-        Tuple of (status_html, final_summary)
+        Tuple of (status_html, final_summary, job_id)
     """
     final_summary = None
     progress_tracker = ProgressTracker()
 
     try:
-        # Validate input file
-        if not audio_path:
-            error_html = UIComponents.get_error_html(
-                "No file uploaded. Please select an audio file."
-            )
-            yield error_html, None
-            return
-
-        if not os.path.exists(audio_path):
-            error_html = UIComponents.get_error_html(f"File not found: {audio_path}")
-            yield error_html, None
-            return
-
-        # Validate file type and size
-        if not validate_audio_file(audio_path):
-            error_html = UIComponents.get_error_html(
-                f"Invalid file. Please upload a supported audio file (MP3, WAV, M4A) "
-                f"under {settings.MAX_FILE_SIZE // (1024 * 1024)}MB."
-            )
-            yield error_html, None
-            return
+        if job_id is None:
+            # Validate input file
+            if not audio_path:
+                error_html = UIComponents.get_error_html(
+                    "No file uploaded. Please select an audio file."
+                )
+                yield error_html, None, ""
+                return
+
+            if not os.path.exists(audio_path):
+                error_html = UIComponents.get_error_html(
+                    f"File not found: {audio_path}"
+                )
+                yield error_html, None, ""
+                return
+
+            # Validate file type, size and duration
+            if not await asyncio.to_thread(validate_audio_file, audio_path):
+                error_html = UIComponents.get_error_html(
+                    f"Invalid file. Please upload a supported audio file (MP3, WAV, M4A) "
+                    f"under {settings.MAX_FILE_SIZE // (1024 * 1024)}MB"
+                    + (
+                        f" and {settings.MAX_AUDIO_MINUTES:g} minutes."
+                        if settings.MAX_AUDIO_MINUTES > 0
+                        else "."
+                    )
+                )
+                yield error_html, None, ""
+                return
+
+        # Shown in the UI so the user can reattach to this job later. The job
+        # gets its own copy of the upload, which outlives this request.
+        job_id = await asyncio.to_thread(resolve_job, audio_path, job_id)
 
         # Initialize progress
         step_name, step_num = progress_tracker.next_step()
@@ -157,19 +174,25 @@ async def gradio_wrapper(
             step_num, progress_tracker.total_steps, step_name
         )
         status_html = UIComponents.get_status_html("🚀 Starting processing...")
-        yield progress_html + status_html, None
+        yield progress_html + status_html, None, job_id
 
         # Process through summary agent
-        async for status, accumulated in summaryAgent(audio_path):
-            step_name, step_num = progress_tracker.next_step()
+        last_status = None
+        async for status, accumulated in summaryAgent(job_id=job_id):
+            # Streamed partial summaries repeat the status; don't advance on them
+            if status != last_status:
+                step_name, step_num = progress_tracker.next_step()
+                last_status = status
             progress_html = UIComponents.get_progress_html(
                 step_num, progress_tracker.total_steps, step_name
             )
             status_html = UIComponents.get_status_html(status)
 
             combined_html = progress_html + status_html
-            yield combined_html, None
-            final_summary = accumulated
+            # Keep showing the latest (partial) summary while later steps run
+            if accumulated is not None:
+                final_summary = accumulated
+            yield combined_html, final_summary, job_id
 
         # Final success state
         progress_html = UIComponents.get_progress_html(
@@ -178,20 +201,21 @@ async def gradio_wrapper(
         success_html = UIComponents.get_success_html("Summary generated successfully!")
         final_html = progress_html + success_html
 
-        yield final_html, final_summary
+        yield final_html, final_summary, job_id
 
     except Exception as e:
         logger.error(f"Error in gradio_wrapper: {e}")
         error_html = UIComponents.get_error_html(
             f"An unexpected error occurred: {str(e)}"
         )
-        yield error_html, None
+        yield error_html, None, job_id or ""
 
     finally:
         try:
             if audio_path and os.path.exists(audio_path):
                 tmp_dir = tempfile.gettempdir()
-                # Only delete if it's inside the OS temp directory (i.e., a Gradio temp upload)
+                # Only delete if it's inside the OS temp directory (i.e., a Gradio
+                # temp upload); the job works from its own copy.
                 if (
                     os.path.commonprefix([os.path.abspath(audio_path), tmp_dir])
                     == tmp_dir
@@ -201,6 +225,18 @@ async def gradio_wrapper(
             logger.warning(f"Failed to cleanup file {audio_path}: {e}")
 
 
+async def reattach_wrapper(
+    job_id: str, progress=gr.Progress()
+) -> AsyncGenerator[tuple[str, str | None, str], None]:
+    """Reattach to a running or finished job, resuming it if it was interrupted."""
+    job_id = (job_id or "").strip()
+    if not job_id:
+        yield UIComponents.get_error_html("Please enter a job ID."), None, ""
+        return
+    async for update in gradio_wrapper(None, progress, job_id=job_id):
+        yield update
+
+
 def create_ui() -> gr.Blocks:
     """Create and configure the Gradio UI interface."""
 
@@ -273,6 +309,14 @@ def create_ui() -> gr.Blocks:
                     value="<p style='color: #6b7280; text-align: center; margin: 20px 0;'>Ready to process your audio file...</p>"
                 )
 
+                # Job ID of the current run; paste one to reattach to it later
+                gr.Markdown("### 🆔 Job")
+                job_id_box = gr.Textbox(
+                    label="Job ID",
+                    placeholder="Paste a job ID to reattach to a running or finished job",
+                )
+                reattach_btn = gr.Button("🔗 Reattach to Job", size="sm")
+
             with gr.Column(scale=2):
                 # Output section
                 gr.Markdown("### 📋 Meeting Summary")
@@ -295,7 +339,13 @@ def create_ui() -> gr.Blocks:
         summarize_btn.click(
             fn=gradio_wrapper,
             inputs=input_file,
-            outputs=[progress_and_status, formatted_output],
+            outputs=[progress_and_status, formatted_output, job_id_box],
+            show_progress=False,
+        )
+        reattach_btn.click(
+            fn=reattach_wrapper,
+            inputs=job_id_box,
+            outputs=[progress_and_status, formatted_output, job_id_box],
             show_progress=False,
         )
 
@@ -325,9 +375,17 @@ def main():
         )
         logger.info("Starting Agentic Summarizer App...")
 
+        if settings.METRICS_ENABLED:
+            # Also serves /healthz and /readyz for the warm-up below.
+            start_metrics_server(
+                settings.METRICS_HOST, settings.METRICS_PORT, warmup.status
+            )
+
         # Create and launch the UI
         demo = create_ui()
-        demo.queue()
+        # Let several uploads run at once; the heavy stages are offloaded to
+        # executors so the event loop stays responsive.
+        demo.queue(default_concurrency_limit=settings.UI_CONCURRENCY_LIMIT)
 
         launch_kwargs = {
             "share": settings.GRADIO_SHARE,
@@ -335,11 +393,17 @@ def main():
             "server_port": settings.PORT,
             "show_error": True,
             "quiet": False,
-            "prevent_thread_lock": False,
+            "prevent_thread_lock": True,
             "inbrowser": False,
         }
 
         demo.launch(**launch_kwargs)
+        # The UI is listening; load models and clients behind it.
+        warmup.start()
+        try:
+            demo.block_thread()
+        finally:
+            shutdown_executors()
 
     except Exception as e:
         logger.error(f"Failed to start application: {e}")
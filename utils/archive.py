@@ -0,0 +1,631 @@
+"""Searchable archive of finished meetings: transcripts, summaries and an index."""
+
+import contextlib
+import itertools
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from utils.extractive_compression import STOP_WORDS
+from utils.segment_store import SegmentFile, write_segments
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+# field:"several words", field:word, "several words" or a plain word.
+_QUERY_RE = re.compile(r'(\w+):"([^"]*)"|(\w+):(\S+)|"([^"]*)"|(\S+)')
+_K1 = 1.2
+_B = 0.75
+_SNIPPET_CHARS = 240
+# One posting: meeting, term frequency and the length of the meeting's field.
+_POSTING = np.dtype([("id", "<i4"), ("tf", "<i4"), ("length", "<i4")])
+# Pending meetings are flushed into a segment once there are this many, and
+# _MERGE_FACTOR segments of a level are merged into one of the next, up to
+# _MAX_LEVEL: segments hold 32, 256 or 2048 meetings.
+_SEGMENT_MEETINGS = 32
+_MERGE_FACTOR = 8
+_MAX_LEVEL = 2
+# A segment is rewritten without its removed meetings once they are this
+# share of it, so tombstones in segments that are not merged soon get purged.
+_PURGE_DELETED = 0.25
+
+# Indexed fields and the MeetingSummary keys each one is built from.
+SUMMARY_FIELDS = {
+    "summary": (
+        "summary",
+        "topics",
+        "key_points",
+        "agenda",
+        "next_steps",
+        "recommendations",
+        "questions",
+        "concerns",
+    ),
+    "action_items": ("action_items", "follow_ups"),
+    "decisions": ("decisions",),
+    "participants": ("participants",),
+}
+FIELDS = ("transcript", *SUMMARY_FIELDS)
+# Weights of each field when plain query terms are scored across all of them.
+_FIELD_WEIGHTS = {
+    "transcript": 1.0,
+    "summary": 2.0,
+    "action_items": 1.5,
+    "decisions": 1.5,
+    "participants": 1.0,
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased words of ``text`` without stop words."""
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in STOP_WORDS]
+
+
+def _field_texts(transcript: str, summary: dict[str, Any]) -> dict[str, str]:
+    texts = {"transcript": transcript}
+    for name, keys in SUMMARY_FIELDS.items():
+        parts: list[str] = []
+        for key in keys:
+            value = summary.get(key)
+            if isinstance(value, str):
+                parts.append(value)
+            elif isinstance(value, list):
+                parts.extend(str(item) for item in value)
+        texts[name] = "\n".join(parts)
+    return texts
+
+
+@dataclass
+class Query:
+    """Plain terms scored across every field, and clauses one field must match."""
+
+    terms: list[str] = field(default_factory=list)
+    fielded: dict[str, list[str]] = field(default_factory=dict)
+
+    @classmethod
+    def parse(cls, text: str) -> "Query":
+        """
+        Parse ``payment api decisions:payment participants:"alice smith"``.
+
+        Unknown ``field:`` prefixes are searched as plain text.
+        """
+        query = cls()
+        for match in _QUERY_RE.finditer(text):
+            name = (match.group(1) or match.group(3) or "").lower()
+            value = match.group(2) or match.group(4)
+            if name in FIELDS:
+                query.fielded.setdefault(name, []).extend(tokenize(value))
+            else:
+                query.terms.extend(tokenize(match.group(0)))
+        query.fielded = {name: terms for name, terms in query.fielded.items() if terms}
+        return query
+
+    def __bool__(self) -> bool:
+        return bool(self.terms or self.fielded)
+
+
+def _sum_by_id(
+    ids: list[np.ndarray], scores: list[np.ndarray]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Unique meeting IDs, their summed scores and how many arrays had each."""
+    if not ids:
+        return np.zeros(0, np.int32), np.zeros(0), np.zeros(0, np.int64)
+    unique, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+    return (
+        unique,
+        np.bincount(inverse, weights=np.concatenate(scores), minlength=len(unique)),
+        np.bincount(inverse, minlength=len(unique)),
+    )
+
+
+class MeetingArchive:
+    """
+    SQLite archive of meetings with an inverted index kept up to date on add.
+
+    Each field has its own postings (term -> meeting, term frequency, field
+    length) and length statistics, so plain terms are ranked with BM25 per
+    field and ``field:term`` clauses filter and rank on that field alone.
+
+    The index is log-structured. A new meeting's postings go to a pending
+    table; every _SEGMENT_MEETINGS meetings they are flushed into an
+    immutable segment holding one packed numpy array per field and term, and
+    segments are merged in tiers. Looking a term up reads a handful of
+    arrays, however many meetings contain it, and scoring is vectorized.
+    Removed meetings are tombstoned until their segment is merged, or
+    rewritten once enough of its meetings are gone.
+
+    With ``segments_dir``, each meeting's timed transcript segments are kept
+    there in a columnar file (see ``utils.segment_store``) for time-range
+    lookups and excerpts linked to playback.
+    """
+
+    def __init__(self, path: str, segments_dir: str | None = None):
+        self.path = path
+        self.segments_dir = segments_dir
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meetings ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " key TEXT NOT NULL UNIQUE,"
+                " job_id TEXT,"
+                " audio_path TEXT,"
+                " archived_at REAL NOT NULL,"
+                " summary TEXT NOT NULL,"
+                " transcript TEXT NOT NULL,"
+                # The segment holding the meeting's postings; NULL while pending.
+                " segment_id INTEGER)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS meetings_segment ON meetings (segment_id)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending_postings ("
+                " field TEXT NOT NULL,"
+                " term TEXT NOT NULL,"
+                " meeting_id INTEGER NOT NULL,"
+                " tf INTEGER NOT NULL,"
+                " length INTEGER NOT NULL,"
+                " PRIMARY KEY (field, term, meeting_id)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " level INTEGER NOT NULL,"
+                " meetings INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS segment_postings ("
+                " field TEXT NOT NULL,"
+                " term TEXT NOT NULL,"
+                " segment_id INTEGER NOT NULL,"
+                " postings BLOB NOT NULL,"
+                " PRIMARY KEY (field, term, segment_id)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS segment_postings_segment"
+                " ON segment_postings (segment_id)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS deleted ("
+                " meeting_id INTEGER PRIMARY KEY,"
+                " segment_id INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS deleted_segment ON deleted (segment_id)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS field_lengths ("
+                " meeting_id INTEGER NOT NULL,"
+                " field TEXT NOT NULL,"
+                " length INTEGER NOT NULL,"
+                " PRIMARY KEY (meeting_id, field)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS field_stats ("
+                " field TEXT PRIMARY KEY,"
+                " meetings INTEGER NOT NULL,"
+                " total_length INTEGER NOT NULL)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        # Safe under WAL; skips an fsync per archived meeting.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(
+        self,
+        key: str,
+        transcript: str,
+        summary: dict[str, Any],
+        job_id: str | None = None,
+        audio_path: str | None = None,
+        segments: list[dict[str, Any]] | None = None,
+    ) -> None:
+        """Archive a meeting and index it, replacing any earlier one with ``key``."""
+        terms = {
+            name: Counter(tokenize(text))
+            for name, text in _field_texts(transcript, summary).items()
+        }
+        if self.segments_dir is not None:
+            if segments:
+                write_segments(self._segments_path(key), segments)
+            else:
+                self._remove_segments(key)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            old = conn.execute(
+                "SELECT id FROM meetings WHERE key = ?", (key,)
+            ).fetchone()
+            if old is not None:
+                self._unindex(conn, old["id"])
+            meeting_id = conn.execute(
+                "INSERT INTO meetings (key, job_id, audio_path, archived_at,"
+                " summary, transcript) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, job_id, audio_path, time.time(), json.dumps(summary), transcript),
+            ).lastrowid
+            for name, counts in terms.items():
+                length = sum(counts.values())
+                conn.executemany(
+                    "INSERT INTO pending_postings VALUES (?, ?, ?, ?, ?)",
+                    ((name, t, meeting_id, tf, length) for t, tf in counts.items()),
+                )
+                conn.execute(
+                    "INSERT INTO field_lengths VALUES (?, ?, ?)",
+                    (meeting_id, name, length),
+                )
+                conn.execute(
+                    "INSERT INTO field_stats VALUES (?, 1, ?) ON CONFLICT (field)"
+                    " DO UPDATE SET meetings = meetings + 1,"
+                    " total_length = total_length + excluded.total_length",
+                    (name, length),
+                )
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM meetings WHERE segment_id IS NULL"
+            ).fetchone()[0]
+            if pending >= _SEGMENT_MEETINGS:
+                self._flush(conn, pending)
+            self._purge(conn)
+        logger.info(f"Archived meeting {key} ({sum(map(len, terms.values()))} terms)")
+
+    def _unindex(self, conn: sqlite3.Connection, meeting_id: int) -> None:
+        row = conn.execute(
+            "SELECT segment_id FROM meetings WHERE id = ?", (meeting_id,)
+        ).fetchone()
+        if row["segment_id"] is not None:
+            conn.execute(
+                "INSERT INTO deleted VALUES (?, ?)", (meeting_id, row["segment_id"])
+            )
+        else:
+            conn.execute(
+                "DELETE FROM pending_postings WHERE meeting_id = ?", (meeting_id,)
+            )
+        for row in conn.execute(
+            "SELECT field, length FROM field_lengths WHERE meeting_id = ?",
+            (meeting_id,),
+        ).fetchall():
+            conn.execute(
+                "UPDATE field_stats SET meetings = meetings - 1,"
+                " total_length = total_length - ? WHERE field = ?",
+                (row["length"], row["field"]),
+            )
+        conn.execute("DELETE FROM field_lengths WHERE meeting_id = ?", (meeting_id,))
+        conn.execute("DELETE FROM meetings WHERE id = ?", (meeting_id,))
+
+    def _flush(self, conn: sqlite3.Connection, meetings: int) -> None:
+        """Move the pending postings into a new level-0 segment."""
+        segment_id = conn.execute(
+            "INSERT INTO segments (level, meetings) VALUES (0, ?)", (meetings,)
+        ).lastrowid
+        rows = conn.execute(
+            "SELECT field, term, meeting_id, tf, length FROM pending_postings"
+            " ORDER BY field, term, meeting_id"
+        ).fetchall()
+        conn.executemany(
+            "INSERT INTO segment_postings VALUES (?, ?, ?, ?)",
+            (
+                (
+                    name,
+                    term,
+                    segment_id,
+                    np.array([tuple(row)[2:] for row in group], _POSTING).tobytes(),
+                )
+                for (name, term), group in itertools.groupby(rows, key=lambda r: r[:2])
+            ),
+        )
+        conn.execute("DELETE FROM pending_postings")
+        conn.execute(
+            "UPDATE meetings SET segment_id = ? WHERE segment_id IS NULL",
+            (segment_id,),
+        )
+        self._merge(conn)
+
+    def _merge(self, conn: sqlite3.Connection) -> None:
+        """Merge every _MERGE_FACTOR segments of a level into one of the next."""
+        while True:
+            full = conn.execute(
+                "SELECT level FROM segments WHERE level < ? GROUP BY level"
+                " HAVING COUNT(*) >= ? ORDER BY level LIMIT 1",
+                (_MAX_LEVEL, _MERGE_FACTOR),
+            ).fetchone()
+            if full is None:
+                return
+            merging = [
+                row["id"]
+                for row in conn.execute(
+                    "SELECT id FROM segments WHERE level = ? ORDER BY id LIMIT ?",
+                    (full["level"], _MERGE_FACTOR),
+                )
+            ]
+            meetings = self._rewrite(conn, merging, full["level"] + 1)
+            logger.info(f"Merged {len(merging)} archive segments ({meetings} meetings)")
+
+    def _purge(self, conn: sqlite3.Connection) -> None:
+        """Rewrite segments whose removed meetings reach _PURGE_DELETED."""
+        for row in conn.execute(
+            "SELECT s.id, s.level, COUNT(*) AS gone FROM segments s"
+            " JOIN deleted d ON d.segment_id = s.id GROUP BY s.id"
+            " HAVING COUNT(*) >= s.meetings * ?",
+            (_PURGE_DELETED,),
+        ).fetchall():
+            self._rewrite(conn, [row["id"]], row["level"])
+            logger.info(
+                f"Purged {row['gone']} removed meetings from an archive segment"
+            )
+
+    def _rewrite(self, conn: sqlite3.Connection, sources: list[int], level: int) -> int:
+        """
+        Replace ``sources`` with one segment at ``level``, less removed meetings.
+
+        Their tombstones are dropped with their postings. Returns how many
+        meetings the new segment holds.
+        """
+        placeholders = ", ".join("?" for _ in sources)
+        deleted = np.array(
+            [
+                row[0]
+                for row in conn.execute(
+                    "SELECT meeting_id FROM deleted"
+                    f" WHERE segment_id IN ({placeholders})",
+                    sources,
+                )
+            ],
+            np.int32,
+        )
+        meetings = conn.execute(
+            f"SELECT SUM(meetings) FROM segments WHERE id IN ({placeholders})",
+            sources,
+        ).fetchone()[0] - len(deleted)
+        segment_id = conn.execute(
+            "INSERT INTO segments (level, meetings) VALUES (?, ?)", (level, meetings)
+        ).lastrowid
+        rows = conn.execute(
+            "SELECT field, term, postings FROM segment_postings"
+            f" WHERE segment_id IN ({placeholders}) ORDER BY field, term",
+            sources,
+        ).fetchall()
+        merged = []
+        for (name, term), group in itertools.groupby(rows, key=lambda r: r[:2]):
+            postings = np.concatenate(
+                [np.frombuffer(row["postings"], _POSTING) for row in group]
+            )
+            postings = postings[~np.isin(postings["id"], deleted)]
+            if len(postings):
+                merged.append((name, term, segment_id, postings.tobytes()))
+        conn.executemany("INSERT INTO segment_postings VALUES (?, ?, ?, ?)", merged)
+        conn.execute(
+            f"DELETE FROM segment_postings WHERE segment_id IN ({placeholders})",
+            sources,
+        )
+        conn.execute(f"DELETE FROM segments WHERE id IN ({placeholders})", sources)
+        conn.execute(
+            f"DELETE FROM deleted WHERE segment_id IN ({placeholders})", sources
+        )
+        conn.execute(
+            f"UPDATE meetings SET segment_id = ? WHERE segment_id IN ({placeholders})",
+            [segment_id, *sources],
+        )
+        if not meetings:
+            conn.execute("DELETE FROM segments WHERE id = ?", (segment_id,))
+        return meetings
+
+    def _deleted(self, conn: sqlite3.Connection) -> np.ndarray:
+        return np.array(
+            [row[0] for row in conn.execute("SELECT meeting_id FROM deleted")],
+            np.int32,
+        )
+
+    def remove(self, key: str) -> bool:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM meetings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._unindex(conn, row["id"])
+                self._purge(conn)
+        if row is not None and self.segments_dir is not None:
+            self._remove_segments(key)
+        return row is not None
+
+    def _segments_path(self, key: str) -> str:
+        return os.path.join(self.segments_dir, f"{key}.seg")
+
+    def _remove_segments(self, key: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._segments_path(key))
+
+    def transcript_segments(self, key: str) -> SegmentFile | None:
+        """The meeting's timed transcript segments, if they were stored."""
+        if self.segments_dir is None:
+            return None
+        try:
+            return SegmentFile(self._segments_path(key))
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, key: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM meetings WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM meetings").fetchone()[0]
+
+    def _postings(
+        self, conn: sqlite3.Connection, name: str, term: str, deleted: np.ndarray
+    ) -> np.ndarray:
+        arrays = [
+            np.frombuffer(row[0], _POSTING)
+            for row in conn.execute(
+                "SELECT postings FROM segment_postings WHERE field = ? AND term = ?",
+                (name, term),
+            )
+        ]
+        pending = conn.execute(
+            "SELECT meeting_id, tf, length FROM pending_postings"
+            " WHERE field = ? AND term = ?",
+            (name, term),
+        ).fetchall()
+        if pending:
+            arrays.append(np.array([tuple(row) for row in pending], _POSTING))
+        if not arrays:
+            return np.zeros(0, _POSTING)
+        postings = np.concatenate(arrays)
+        if len(deleted):
+            postings = postings[~np.isin(postings["id"], deleted)]
+        return postings
+
+    def _bm25(
+        self,
+        conn: sqlite3.Connection,
+        name: str,
+        terms: list[str],
+        stats: dict[str, tuple[int, float]],
+        deleted: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        BM25 scores of meetings whose ``name`` field has any of ``terms``.
+
+        Returns the meeting IDs, their scores and whether each has all terms.
+        """
+        meetings, average_length = stats.get(name, (0, 1.0))
+        counts = Counter(terms)
+        ids, scores = [], []
+        for term, count in counts.items() if meetings else ():
+            postings = self._postings(conn, name, term, deleted)
+            idf = np.log(1 + (meetings - len(postings) + 0.5) / (len(postings) + 0.5))
+            tf = postings["tf"].astype(np.float64)
+            norm = _K1 * (1 - _B + _B * postings["length"] / average_length)
+            ids.append(postings["id"])
+            scores.append(count * idf * tf * (_K1 + 1) / (tf + norm))
+        matched, summed, hits = _sum_by_id(ids, scores)
+        return matched, summed, hits == len(counts)
+
+    def search(self, text: str, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        Meetings matching ``text``, best first.
+
+        Plain terms are ranked with BM25 over the transcript and the summary
+        fields; every ``field:terms`` clause must match in that field.
+        Results carry the summary, a transcript snippet around the first
+        match, and the list items that matched each fielded clause.
+        """
+        query = Query.parse(text)
+        if not query:
+            return []
+        with self._connect() as conn:
+            stats = {
+                row["field"]: (
+                    row["meetings"],
+                    max(1.0, row["total_length"] / max(1, row["meetings"])),
+                )
+                for row in conn.execute("SELECT * FROM field_stats")
+            }
+            deleted = self._deleted(conn)
+            candidates: np.ndarray | None = None
+            ids, scores = [], []
+            for name, terms in query.fielded.items():
+                matched, field_scores, has_all = self._bm25(
+                    conn, name, terms, stats, deleted
+                )
+                matched = matched[has_all]
+                candidates = (
+                    matched
+                    if candidates is None
+                    else np.intersect1d(candidates, matched, assume_unique=True)
+                )
+                ids.append(matched)
+                scores.append(field_scores[has_all])
+            for name in FIELDS if query.terms else ():
+                matched, field_scores, _ = self._bm25(
+                    conn, name, query.terms, stats, deleted
+                )
+                ids.append(matched)
+                scores.append(_FIELD_WEIGHTS[name] * field_scores)
+            matched, total, _ = _sum_by_id(ids, scores)
+            if candidates is not None:
+                keep = np.isin(matched, candidates, assume_unique=True)
+                matched, total = matched[keep], total[keep]
+            if len(total) > limit:
+                top = np.argpartition(-total, limit)[:limit]
+            else:
+                top = np.arange(len(total))
+            top = top[np.argsort(-total[top], kind="stable")]
+
+            results = []
+            for index in top:
+                row = conn.execute(
+                    "SELECT * FROM meetings WHERE id = ?", (int(matched[index]),)
+                ).fetchone()
+                results.append(self._result(row, float(total[index]), query))
+        return results
+
+    def _result(self, row: sqlite3.Row, score: float, query: Query) -> dict[str, Any]:
+        summary = json.loads(row["summary"])
+        matches = {}
+        for name, terms in query.fielded.items():
+            if name in ("transcript", "summary"):
+                continue
+            wanted = set(terms)
+            matches[name] = [
+                item
+                for item in summary.get(name) or []
+                if wanted <= set(tokenize(str(item)))
+            ]
+        snippet_terms = query.terms or query.fielded.get("transcript", [])
+        # Where the snippet is spoken, so players can seek to it.
+        snippet_start = snippet_end = None
+        segments = self.transcript_segments(row["key"])
+        index = segments.find(snippet_terms) if segments is not None else None
+        if index is not None:
+            snippet_start = round(float(segments.start[index]), 2)
+            snippet_end = round(float(segments.end[index]), 2)
+        return {
+            "key": row["key"],
+            "job_id": row["job_id"],
+            "audio_path": row["audio_path"],
+            "archived_at": row["archived_at"],
+            "score": round(score, 4),
+            "date": summary.get("date"),
+            "summary": summary,
+            "snippet": _snippet(row["transcript"], snippet_terms),
+            "snippet_start": snippet_start,
+            "snippet_end": snippet_end,
+            "matches": matches,
+        }
+
+
+def _snippet(transcript: str, terms: list[str]) -> str:
+    """About _SNIPPET_CHARS of ``transcript`` around the first query term."""
+    start = 0
+    if terms:
+        pattern = r"\b(?:" + "|".join(map(re.escape, terms)) + r")\b"
+        match = re.search(pattern, transcript, re.IGNORECASE)
+        if match:
+            start = max(0, match.start() - _SNIPPET_CHARS // 3)
+    snippet = transcript[start : start + _SNIPPET_CHARS].strip()
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + _SNIPPET_CHARS < len(transcript) else ""
+    return f"{prefix}{snippet}{suffix}"
@@ -0,0 +1,98 @@
+"""Helpers for splitting decoded audio into windows and stitching transcripts."""
+
+import re
+from difflib import SequenceMatcher
+
+SAMPLE_RATE = 16000  # Whisper always decodes to 16 kHz mono
+
+_NORMALIZE_RE = re.compile(r"[^\w']+")
+
+
+def split_windows(
+    num_samples: int,
+    window_seconds: float,
+    overlap_seconds: float,
+    sample_rate: int = SAMPLE_RATE,
+) -> list[tuple[int, int]]:
+    """Return (start, end) sample ranges covering the audio with overlap."""
+    window = max(1, int(window_seconds * sample_rate))
+    overlap = max(0, min(int(overlap_seconds * sample_rate), window - 1))
+    step = window - overlap
+
+    windows = []
+    start = 0
+    while start < num_samples:
+        end = min(start + window, num_samples)
+        windows.append((start, end))
+        if end == num_samples:
+            break
+        start += step
+    return windows
+
+
+def _normalize_word(word: str) -> str:
+    return _NORMALIZE_RE.sub("", word.lower())
+
+
+def merge_overlap(left: list[str], right: list[str], search_words: int) -> list[str]:
+    """
+    Join two word lists whose edges were transcribed from the same audio.
+
+    The tail of ``left`` and the head of ``right`` are aligned on normalized
+    words; the duplicated run is kept once and words that were cut off at
+    either window edge are dropped.
+    """
+    if not left or not right:
+        return left + right
+
+    tail_start = max(0, len(left) - search_words)
+    tail = [_normalize_word(w) for w in left[tail_start:]]
+    head = [_normalize_word(w) for w in right[:search_words]]
+
+    match = SequenceMatcher(None, tail, head, autojunk=False).find_longest_match(
+        0, len(tail), 0, len(head)
+    )
+    # A single common word is too weak a signal to drop text on.
+    if match.size < 2:
+        return left + right
+
+    return left[: tail_start + match.a] + right[match.b :]
+
+
+def _search_words(overlap_seconds: float) -> int:
+    # Roughly 2.5 spoken words per second, doubled to absorb timing drift.
+    return max(8, int(overlap_seconds * 5))
+
+
+def stitch_transcripts(texts: list[str], overlap_seconds: float) -> str:
+    """Stitch per-window transcripts into one, removing duplicated overlap words."""
+    search_words = _search_words(overlap_seconds)
+
+    words: list[str] = []
+    for text in texts:
+        words = merge_overlap(words, text.split(), search_words)
+    return " ".join(words)
+
+
+class TranscriptStitcher:
+    """
+    Incremental ``stitch_transcripts`` for windows that arrive in order.
+
+    ``add`` returns the words the next window's overlap can no longer replace;
+    the last few are held back until then. ``finish`` returns the remainder.
+    Windows shorter than the overlap search span may stitch slightly
+    differently than the batch version, which can cut further back.
+    """
+
+    def __init__(self, overlap_seconds: float):
+        self.search_words = _search_words(overlap_seconds)
+        self._pending: list[str] = []
+
+    def add(self, text: str) -> str:
+        words = merge_overlap(self._pending, text.split(), self.search_words)
+        self._pending = words[-self.search_words :]
+        return " ".join(words[: -self.search_words])
+
+    def finish(self) -> str:
+        rest, self._pending = self._pending, []
+        return " ".join(rest)
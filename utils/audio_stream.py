@@ -0,0 +1,129 @@
+"""Bounded-memory audio decoding: ffmpeg PCM blocks and overlapping windows."""
+
+import logging
+import shutil
+import subprocess
+import wave
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from utils.audio_chunking import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Seconds of PCM read from ffmpeg at a time (about 3.8 MB as float32).
+BLOCK_SECONDS = 60
+BYTES_PER_SECOND = SAMPLE_RATE * np.dtype(np.float32).itemsize
+
+
+def probe_duration(path: str) -> float | None:
+    """Duration of an audio file in seconds, or None if it can't be determined."""
+    if shutil.which("ffprobe"):
+        try:
+            output = subprocess.run(
+                [
+                    "ffprobe",
+                    "-v",
+                    "error",
+                    "-show_entries",
+                    "format=duration",
+                    "-of",
+                    "default=noprint_wrappers=1:nokey=1",
+                    path,
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=30,
+            ).stdout.strip()
+            return float(output)
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            logger.warning(f"Could not probe duration of {path}: {e}")
+            return None
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as f:
+                return f.getnframes() / f.getframerate()
+        except (OSError, EOFError, wave.Error):
+            return None
+    return None
+
+
+def decode_blocks(
+    path: str, block_seconds: float = BLOCK_SECONDS
+) -> Iterator[np.ndarray]:
+    """
+    Decode ``path`` to 16 kHz mono float32 in blocks of ``block_seconds``.
+
+    Only one block is held at a time, unlike ``whisper.load_audio`` which
+    returns the whole recording as one array.
+    """
+    command = [
+        "ffmpeg",
+        "-nostdin",
+        "-v",
+        "error",
+        "-threads",
+        "0",
+        "-i",
+        path,
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-",
+    ]
+    block_bytes = max(2, int(block_seconds * SAMPLE_RATE) * 2)
+    with subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    ) as process:
+        finished = False
+        try:
+            while data := process.stdout.read(block_bytes):
+                pcm = np.frombuffer(data[: len(data) // 2 * 2], np.int16)
+                yield pcm.astype(np.float32) / 32768.0
+            finished = True
+        finally:
+            if not finished:
+                # Closed early (e.g. the job failed): don't decode the rest.
+                process.kill()
+        errors = process.stderr.read().decode(errors="replace").strip()
+        if process.wait() > 0:
+            raise RuntimeError(f"Failed to decode audio: {errors}")
+
+
+def stream_windows(
+    blocks: Iterable[np.ndarray],
+    window_seconds: float,
+    overlap_seconds: float,
+    sample_rate: int = SAMPLE_RATE,
+) -> Iterator[tuple[int, np.ndarray]]:
+    """
+    ``split_windows`` over a stream of blocks: yields (start_sample, samples).
+
+    Window boundaries are identical to ``split_windows`` on the concatenated
+    audio, but at most one window plus one block is buffered.
+    """
+    window = max(1, int(window_seconds * sample_rate))
+    overlap = max(0, min(int(overlap_seconds * sample_rate), window - 1))
+    step = window - overlap
+
+    buffer = np.zeros(0, dtype=np.float32)
+    buffer_start = 0  # sample index of buffer[0]
+    last_end = 0
+    for block in blocks:
+        buffer = np.concatenate((buffer, block)) if len(buffer) else block
+        while len(buffer) >= window:
+            yield buffer_start, buffer[:window].copy()
+            last_end = buffer_start + window
+            buffer = buffer[step:]
+            buffer_start += step
+
+    # The last, shorter window, unless the previous one already reached the end.
+    if buffer_start + len(buffer) > last_end:
+        yield buffer_start, buffer.copy()
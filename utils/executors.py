@@ -0,0 +1,80 @@
+"""Shared executors that keep blocking pipeline stages off the event loop."""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from config.settings import settings
+
+_transcription_executor: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+# The model preload started by a worker process's initializer.
+_worker_preload: threading.Thread | None = None
+
+
+def _init_transcription_worker() -> None:
+    global _worker_preload
+    # Imported here so worker processes only pull in the tools they run.
+    from tools.speechToTextTool import preload_local_models
+
+    _worker_preload = preload_local_models()
+
+
+def _noop() -> None:
+    return None
+
+
+def _wait_for_worker_models() -> int:
+    from tools.speechToTextTool import wait_for_local_models
+
+    wait_for_local_models(_worker_preload)
+    return os.getpid()
+
+
+def get_transcription_executor() -> ProcessPoolExecutor:
+    """Process pool for Whisper jobs, sized by WHISPER_WORKERS."""
+    global _transcription_executor
+    with _lock:
+        if _transcription_executor is None:
+            # "spawn" avoids forking a parent that may already hold torch threads.
+            _transcription_executor = ProcessPoolExecutor(
+                max_workers=max(1, settings.WHISPER_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_transcription_worker,
+            )
+        return _transcription_executor
+
+
+def warm_transcription_executor(wait: bool = False) -> None:
+    """
+    Start every transcription worker now so they preload their models.
+
+    With ``wait``, block until each worker reports its models are loaded.
+    """
+    executor = get_transcription_executor()
+    workers = max(1, settings.WHISPER_WORKERS)
+    if not wait:
+        # Each submit with no idle worker spawns a new one, up to max_workers.
+        for _ in range(workers):
+            executor.submit(_noop)
+        return
+
+    # A worker that is already warm may pick up more than one probe, so keep
+    # probing until every worker process has answered.
+    ready: set[int] = set()
+    while len(ready) < workers:
+        probes = [
+            executor.submit(_wait_for_worker_models)
+            for _ in range(workers - len(ready))
+        ]
+        ready.update(probe.result() for probe in probes)
+
+
+def shutdown_executors() -> None:
+    """Stop the transcription workers, dropping jobs they haven't started."""
+    global _transcription_executor
+    with _lock:
+        if _transcription_executor is not None:
+            _transcription_executor.shutdown(wait=False, cancel_futures=True)
+            _transcription_executor = None
@@ -0,0 +1,226 @@
+"""Extractive pre-compression of transcripts with TF-IDF weighted TextRank."""
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+
+from config.settings import settings
+from utils.token_utils import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+# Capitalized words that don't start a sentence, in the unrefined transcript.
+_NAME_RE = re.compile(r"(?<![.!?]\s)(?<!^)(?<!\n)\b([A-Z][a-z]{2,})\b")
+_WEEKDAYS = "monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+_MONTHS = (
+    "january|february|march|april|may|june|july|august|september|october|"
+    "november|december"
+)
+# Specific dates and times, or relative ones only as a deadline ("by
+# tomorrow"), so "today" in passing or "march" as a verb don't count.
+_DATE_RE = re.compile(
+    rf"\b(?:{_WEEKDAYS}|(?:{_MONTHS})\s+\d{{1,2}}(?:st|nd|rd|th)?|"
+    rf"\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:{_MONTHS})|"
+    r"(?:by|before|until|due|on)\s+(?:today|tomorrow|tonight|eod|eow|"
+    r"(?:the\s+)?end\s+of\s+(?:the\s+)?(?:day|week|month|quarter)|"
+    r"next\s+(?:week|month|quarter))|"
+    r"q[1-4]|\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?|\d{1,2}(?::\d{2})?\s?(?:am|pm))\b"
+)
+_PRONOUN_OWNERS = ("i", "we", "you", "he", "she", "they")
+_MODAL = (
+    r"(?:will|'ll|shall|should|must|can|needs?\s+to|ha(?:s|ve)\s+to|"
+    r"(?:am|is|are|'m|'re|'s)\s+going\s+to)"
+)
+_ACTION_VERB = (
+    r"(?:send|share|schedule|book|review|prepare|draft|write|update|finish|"
+    r"complete|deliver|ship|fix|test|check|call|email|follow\s+up|reach\s+out|"
+    r"set\s+up|look\s+into|sync|merge|deploy|present|contact|confirm|"
+    r"investigate|integrate|handle|own)"
+)
+# Phrases that mark an action item whoever says them.
+_ACTION_MARKER_RE = re.compile(
+    r"\b(?:action items?|assigned to|deadline|due (?:by|on))\b"
+)
+_STOP_WORDS_TEXT = """
+a an and are as at be been but by can could did do does for from had has have
+he her him his how i if in into is it its just me my no not of on or our out
+she so than that the their them then there these they this those to too up us
+very was we were what when where which who why with would you your
+"""
+STOP_WORDS = frozenset(_STOP_WORDS_TEXT.split())
+_DAMPING = 0.85
+_MAX_ITERATIONS = 100
+_TOLERANCE = 1e-6
+# Above this many sentences the n x n similarity graph gets too large, and
+# sentences are scored by TF-IDF similarity to the whole transcript instead.
+_MAX_GRAPH_SENTENCES = 3000
+
+
+def extract_names(text: str, participants: Iterable[str] = ()) -> set[str]:
+    """
+    Lowercased names in ``text``: capitalized words seen mid-sentence at least
+    twice, or matching one of ``participants``.
+    """
+    known = {
+        name.lower() for participant in participants for name in participant.split()
+    }
+    counts = Counter(match.lower() for match in _NAME_RE.findall(text))
+    names = {word for word, count in counts.items() if count >= 2 or word in known}
+    return names - STOP_WORDS - set(_WEEKDAYS.split("|")) - set(_MONTHS.split("|"))
+
+
+def _action_re(names: set[str]) -> re.Pattern:
+    """An owner (pronoun or name), then a modal and an action verb, or "<owner> to"."""
+    owners = "|".join(map(re.escape, sorted({*_PRONOUN_OWNERS, *names})))
+    return re.compile(
+        rf"\b(?:{owners})(?:\s+|(?=')){_MODAL}\s+(?:\w+\s+)?{_ACTION_VERB}\b|"
+        rf"\b(?:{owners})\s+to\s+{_ACTION_VERB}\b"
+    )
+
+
+def _is_required(
+    sentence: str, words: list[str], names: set[str], action_re: re.Pattern
+) -> bool:
+    """True for sentences naming a participant, giving a date or an action item."""
+    return bool(
+        names.intersection(words)
+        or _DATE_RE.search(sentence)
+        or _ACTION_MARKER_RE.search(sentence)
+        or action_re.search(sentence)
+    )
+
+
+def _tfidf_matrix(sentences: list[list[str]]) -> np.ndarray:
+    """L2-normalized sentence x term TF-IDF matrix."""
+    vocabulary: dict[str, int] = {}
+    rows: list[int] = []
+    cols: list[int] = []
+    for row, words in enumerate(sentences):
+        for word in words:
+            rows.append(row)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    counts = np.zeros((len(sentences), max(1, len(vocabulary))), dtype=np.float32)
+    np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(cols)), 1.0)
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    tfidf = np.log1p(counts) * idf.astype(np.float32)
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    return tfidf / np.where(norms == 0, 1, norms)
+
+
+def _textrank(tfidf: np.ndarray) -> np.ndarray:
+    if len(tfidf) > _MAX_GRAPH_SENTENCES:
+        centroid = tfidf.sum(axis=0)
+        return tfidf @ (centroid / (np.linalg.norm(centroid) or 1))
+
+    similarity = tfidf @ tfidf.T
+    np.fill_diagonal(similarity, 0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences with no overlap spread their rank evenly.
+    transition = np.where(
+        out_weight > 0,
+        similarity / np.where(out_weight == 0, 1, out_weight),
+        1 / len(tfidf),
+    )
+    count = len(tfidf)
+    scores = np.full(count, 1 / count, dtype=np.float32)
+    for _ in range(_MAX_ITERATIONS):
+        updated = (1 - _DAMPING) / count + _DAMPING * (transition.T @ scores)
+        converged = np.abs(updated - scores).sum() < _TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def compress_transcript(
+    text: str, token_budget: int | None = None, names: set[str] | None = None
+) -> tuple[str, dict[str, Any]]:
+    """
+    Keep the highest-ranked sentences of ``text`` within ``token_budget``.
+
+    Sentences mentioning one of ``names`` (see ``extract_names``), a date or an
+    action item (an owner with a modal and an action verb) come first, best
+    ranked first, up to EXTRACTIVE_REQUIRED_SHARE of the budget; the rest of
+    the budget goes to the remaining sentences in score order. Everything is
+    emitted in original order.
+
+    Returns:
+        Tuple of (compressed_text, stats)
+    """
+    started = time.perf_counter()
+    token_budget = token_budget or settings.EXTRACTIVE_TOKEN_BUDGET
+    names = names or set()
+
+    sentences = [s for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
+    tokens = np.array([count_tokens(s) for s in sentences], dtype=np.int64)
+    original_tokens = int(tokens.sum())
+    stats: dict[str, Any] = {
+        "sentences": len(sentences),
+        "kept_sentences": len(sentences),
+        "original_tokens": original_tokens,
+        "compressed_tokens": original_tokens,
+        "compression_ratio": 1.0,
+        "required_tokens": 0,
+        "seconds": 0.0,
+        "estimated_seconds_saved": 0.0,
+    }
+    if original_tokens <= token_budget:
+        return text, stats
+
+    words = [_WORD_RE.findall(s.lower()) for s in sentences]
+    scores = _textrank(
+        _tfidf_matrix([[w for w in ws if w not in STOP_WORDS] for ws in words])
+    )
+    action_re = _action_re(names)
+    required = np.array(
+        [
+            _is_required(s.lower(), ws, names, action_re)
+            for s, ws in zip(sentences, words, strict=True)
+        ]
+    )
+    required_tokens = int(tokens[required].sum())
+    required_budget = int(token_budget * settings.EXTRACTIVE_REQUIRED_SHARE)
+    if required_tokens > required_budget:
+        logger.info(
+            f"Must-keep sentences need {required_tokens} tokens, "
+            f"{required_tokens - required_budget} over their {required_budget}-token "
+            f"share of the {token_budget}-token budget; keeping the best ranked"
+        )
+
+    keep = np.zeros(len(sentences), dtype=bool)
+    used = 0
+    ranked = np.argsort(-scores, kind="stable")
+    for budget, candidates in (
+        (required_budget, ranked[required[ranked]]),
+        (token_budget, ranked),
+    ):
+        for index in candidates:
+            if keep[index] or used + tokens[index] > budget:
+                continue
+            keep[index] = True
+            used += int(tokens[index])
+
+    compressed = " ".join(s for s, kept in zip(sentences, keep, strict=True) if kept)
+    elapsed = time.perf_counter() - started
+    stats.update(
+        required_tokens=required_tokens,
+        kept_sentences=int(keep.sum()),
+        compressed_tokens=used,
+        compression_ratio=round(used / original_tokens, 3),
+        seconds=round(elapsed, 3),
+        estimated_seconds_saved=round(
+            (original_tokens - used) / settings.EXTRACTIVE_PREFILL_TOKENS_PER_SECOND
+            - elapsed,
+            3,
+        ),
+    )
+    return compressed, stats
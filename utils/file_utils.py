@@ -3,6 +3,7 @@ import logging
 import os
 
 from config.settings import settings
+from utils.audio_stream import probe_duration
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +17,16 @@ def validate_audio_file(file_path: str) -> bool:
         return False
 
     _, ext = os.path.splitext(file_path)
-    return ext.lower() in settings.SUPPORTED_FORMATS
+    if ext.lower() not in settings.SUPPORTED_FORMATS:
+        return False
+
+    if settings.MAX_AUDIO_MINUTES > 0:
+        # Admit by duration, which is what transcription cost scales with.
+        duration = probe_duration(file_path)
+        if duration is not None and duration > settings.MAX_AUDIO_MINUTES * 60:
+            logger.info(f"Rejected {file_path}: {duration / 60:.0f} minutes long")
+            return False
+    return True
 
 
 def cleanup_temp_file(file_path: str) -> None:
@@ -1,74 +1,94 @@
 from models.meeting_schema import MeetingSummary
 
+_PENDING = "_⏳ Generating..._"
 
-def generate_markdown_summary(summary: MeetingSummary | dict) -> str:
-    if isinstance(summary, dict) and "properties" in summary:
-        summary_obj = MeetingSummary(**summary["properties"])
-    elif isinstance(summary, dict):
-        summary_obj = MeetingSummary(**summary)
 
-    def format_list(items: list[str]) -> str:
+def generate_markdown_summary(
+    summary: MeetingSummary | dict, partial: bool = False
+) -> str:
+    """
+    Render a summary as Markdown. With ``partial``, fields missing from the
+    dict are still being generated and show a placeholder.
+    """
+    if isinstance(summary, dict) and "properties" in summary:
+        summary = summary["properties"]
+    if isinstance(summary, dict):
+        pending = set(MeetingSummary.model_fields) - set(summary) if partial else set()
+        summary_obj = MeetingSummary(
+            **{k: v for k, v in summary.items() if k in MeetingSummary.model_fields}
+        )
+    else:
+        pending = set()
+        summary_obj = summary
+
+    def format_list(name: str) -> str:
+        if name in pending:
+            return _PENDING
+        items = getattr(summary_obj, name)
         return (
             "\n".join(f"- {item}" for item in items) if items else "**Not Specified**"
         )
 
-    def format_str(item: str | None) -> str:
+    def format_str(name: str) -> str:
+        if name in pending:
+            return _PENDING
+        item = getattr(summary_obj, name)
         return item if item else "**Not Specified**"
 
     md = f"""
 # 📋 Meeting Summary
 
-**📅 Date:** {format_str(summary_obj.date)}  
-**📍 Location:** {format_str(summary_obj.location)}  
-**⏰ Time:** {format_str(summary_obj.time)}  
-**🕒 Duration:** {format_str(summary_obj.duration)}
+**📅 Date:** {format_str("date")}  
+**📍 Location:** {format_str("location")}  
+**⏰ Time:** {format_str("time")}  
+**🕒 Duration:** {format_str("duration")}
 
 ---
 
 ## 📝 Agenda
-{format_list(summary_obj.agenda)}
+{format_list("agenda")}
 
 ## 👥 Participants
-{format_list(summary_obj.participants)}
+{format_list("participants")}
 
 ## 🧠 Topics Discussed
-{format_list(summary_obj.topics)}
+{format_list("topics")}
 
 ## 🧾 Summary
-> {format_str(summary_obj.summary)}
+> {format_str("summary")}
 
 ## 📌 Key Points
-{format_list(summary_obj.key_points)}
+{format_list("key_points")}
 
 ## ✅ Action Items
-{format_list(summary_obj.action_items)}
+{format_list("action_items")}
 
 ## 🔜 Next Steps
-{format_list(summary_obj.next_steps)}
+{format_list("next_steps")}
 
 ## 🧑‍⚖️ Decisions
-{format_list(summary_obj.decisions)}
+{format_list("decisions")}
 
 ## 💡 Recommendations
-{format_list(summary_obj.recommendations)}
+{format_list("recommendations")}
 
 ## 🔁 Follow Ups
-{format_list(summary_obj.follow_ups)}
+{format_list("follow_ups")}
 
 ## ❓ Questions
-{format_list(summary_obj.questions)}
+{format_list("questions")}
 
 ## 😟 Concerns
-{format_list(summary_obj.concerns)}
+{format_list("concerns")}
 
 ## 🗣️ Feedback
-{format_list(summary_obj.feedback)}
+{format_list("feedback")}
 
 ## 💬 Suggestions
-{format_list(summary_obj.suggestions)}
+{format_list("suggestions")}
 
 ## 🛠️ Improvements
-{format_list(summary_obj.improvements)}
+{format_list("improvements")}
 """
     return md
     # return Markdown(md)
@@ -0,0 +1,225 @@
+"""Shared queue of pipeline jobs claimed by worker processes with leases."""
+
+import contextlib
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Task kinds, in pipeline order: transcription, then everything after it.
+TRANSCRIBE = "transcribe"
+SUMMARIZE = "summarize"
+KINDS = (TRANSCRIBE, SUMMARIZE)
+
+
+@dataclass
+class Lease:
+    """A worker's time-limited claim on a queued job."""
+
+    job_id: str
+    kind: str
+    token: str
+    attempts: int
+    expires_at: float
+    # True if the previous holder's lease expired without finishing.
+    reclaimed: bool = False
+
+
+class QueueBackend:
+    """
+    Base class for job queues.
+
+    Each job has at most one queued task, which names the next step to run.
+    ``claim`` hands out the oldest available task with a lease; its holder
+    must ``renew`` the lease while it works and ``complete`` or ``release``
+    the task when done. A task whose lease expires becomes claimable again,
+    so a crashed worker's job is picked up by the next one. Implementations
+    must make ``claim`` atomic across processes and hosts.
+    """
+
+    name = ""
+
+    def enqueue(self, job_id: str, kind: str = TRANSCRIBE) -> None:
+        """Queue ``kind`` for the job, replacing any task it already has."""
+        raise NotImplementedError
+
+    def claim(
+        self, owner: str, kinds: tuple[str, ...], lease_seconds: float
+    ) -> Lease | None:
+        """Lease the oldest available task of one of ``kinds``, or None."""
+        raise NotImplementedError
+
+    def renew(self, lease: Lease, lease_seconds: float) -> bool:
+        """Extend the lease; False if it was lost to another worker."""
+        raise NotImplementedError
+
+    def complete(self, lease: Lease) -> None:
+        """Remove the task, unless the lease has been lost or handed off."""
+        raise NotImplementedError
+
+    def release(self, lease: Lease, delay: float = 0, error: str | None = None) -> None:
+        """Give the task back to be claimed again after ``delay`` seconds."""
+        raise NotImplementedError
+
+    def is_queued(self, job_id: str) -> bool:
+        """True while the job has a task waiting or leased."""
+        raise NotImplementedError
+
+    def depth(self) -> dict[str, int]:
+        """Tasks per kind (waiting or leased)."""
+        raise NotImplementedError
+
+
+class SQLiteQueue(QueueBackend):
+    """
+    Queue in a SQLite database, for worker processes on a single host.
+
+    Claims take SQLite's write lock, so only one worker can lease a task.
+    The database runs in WAL mode, whose shared memory index does not work
+    across hosts: keep it on local storage, never on a network filesystem.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_queue ("
+                " job_id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " enqueued_at REAL NOT NULL,"
+                " available_at REAL NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " lease_token TEXT,"
+                " lease_owner TEXT,"
+                " lease_expires_at REAL,"
+                " last_error TEXT)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS job_queue_available"
+                " ON job_queue (kind, available_at)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, job_id: str, kind: str = TRANSCRIBE) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_queue (job_id, kind, enqueued_at,"
+                " available_at) VALUES (?, ?, ?, ?)",
+                (job_id, kind, now, now),
+            )
+        logger.info(f"Queued {kind} for job {job_id}")
+
+    def claim(
+        self, owner: str, kinds: tuple[str, ...], lease_seconds: float
+    ) -> Lease | None:
+        now = time.time()
+        placeholders = ", ".join("?" for _ in kinds)
+        with self._connect() as conn:
+            # Take the write lock before reading so two workers can't pick
+            # the same task.
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT job_id, kind, attempts, lease_token FROM job_queue"
+                f" WHERE kind IN ({placeholders}) AND available_at <= ?"
+                " AND (lease_token IS NULL OR lease_expires_at < ?)"
+                " ORDER BY available_at LIMIT 1",
+                (*kinds, now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            lease = Lease(
+                job_id=row["job_id"],
+                kind=row["kind"],
+                token=uuid.uuid4().hex,
+                attempts=row["attempts"] + 1,
+                expires_at=now + lease_seconds,
+                reclaimed=row["lease_token"] is not None,
+            )
+            conn.execute(
+                "UPDATE job_queue SET attempts = ?, lease_token = ?,"
+                " lease_owner = ?, lease_expires_at = ? WHERE job_id = ?",
+                (lease.attempts, lease.token, owner, lease.expires_at, lease.job_id),
+            )
+        return lease
+
+    def renew(self, lease: Lease, lease_seconds: float) -> bool:
+        expires_at = time.time() + lease_seconds
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE job_queue SET lease_expires_at = ?"
+                " WHERE job_id = ? AND lease_token = ?",
+                (expires_at, lease.job_id, lease.token),
+            )
+        if cursor.rowcount == 1:
+            lease.expires_at = expires_at
+            return True
+        return False
+
+    def complete(self, lease: Lease) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM job_queue WHERE job_id = ? AND lease_token = ?",
+                (lease.job_id, lease.token),
+            )
+
+    def release(self, lease: Lease, delay: float = 0, error: str | None = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE job_queue SET available_at = ?, lease_token = NULL,"
+                " lease_owner = NULL, lease_expires_at = NULL, last_error = ?"
+                " WHERE job_id = ? AND lease_token = ?",
+                (time.time() + delay, error, lease.job_id, lease.token),
+            )
+
+    def is_queued(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM job_queue WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return row is not None
+
+    def depth(self) -> dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT kind, COUNT(*) AS tasks FROM job_queue GROUP BY kind"
+            ).fetchall()
+        return dict.fromkeys(KINDS, 0) | {row["kind"]: row["tasks"] for row in rows}
+
+
+_QUEUE_CLASSES: dict[str, type[QueueBackend]] = {
+    SQLiteQueue.name: SQLiteQueue,
+}
+
+
+def get_job_queue(name: str | None = None) -> QueueBackend:
+    """Return a queue client for ``name`` or the configured JOB_QUEUE_BACKEND."""
+    name = (name or settings.JOB_QUEUE_BACKEND).lower()
+    queue_class = _QUEUE_CLASSES.get(name)
+    if queue_class is None:
+        raise ValueError(
+            f"Unknown job queue backend '{name}'. "
+            f"Choose one of: {', '.join(_QUEUE_CLASSES)}"
+        )
+    return queue_class(settings.JOB_QUEUE_PATH)
@@ -0,0 +1,257 @@
+"""Store of summaryAgent jobs and the output of each completed stage."""
+
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from collections.abc import Iterator
+from typing import Any
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in order; a job resumes after the last one it completed.
+STAGES = ("transcript", "refined", "summary", "markdown")
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class JobStore:
+    """
+    Base class for the persistent record of jobs and their stage checkpoints.
+
+    A running job refreshes its heartbeat; a job whose heartbeat is older than
+    ``stale_seconds`` is treated as interrupted and may be resumed by anyone.
+    ``attempts`` counts the claims, so callers can tell when to give up. A
+    job's ``audio_path`` is whatever its caller stored, typically a reference
+    relative to shared audio storage. Implementations must make ``claim``
+    atomic across processes and hosts.
+    """
+
+    name = ""
+
+    def __init__(self, stale_seconds: float = 60):
+        self.stale_seconds = stale_seconds
+
+    def create_job(self, audio_path: str | None, audio_hash: str | None) -> str:
+        """Record a new pending job and return its ID."""
+        raise NotImplementedError
+
+    def get_job(self, job_id: str) -> dict[str, Any] | None:
+        """Return the job row plus a ``stages`` dict of completed stage outputs."""
+        raise NotImplementedError
+
+    def find_resumable_job(self, audio_hash: str) -> dict[str, Any] | None:
+        """Latest unfinished job for the same recording, if any."""
+        raise NotImplementedError
+
+    def completed_job_ids(self) -> list[str]:
+        """IDs of completed jobs, oldest first."""
+        raise NotImplementedError
+
+    def is_active(self, job: dict[str, Any]) -> bool:
+        """True if the job is running somewhere with a fresh heartbeat."""
+        return job["status"] == RUNNING and (
+            time.time() - (job["heartbeat_at"] or 0) < self.stale_seconds
+        )
+
+    def claim(self, job_id: str) -> bool:
+        """Mark the job running unless another worker holds it; True on success."""
+        raise NotImplementedError
+
+    def save_stage(self, job_id: str, stage: str, output: Any) -> None:
+        """Checkpoint a stage's JSON-serializable output and refresh the heartbeat."""
+        raise NotImplementedError
+
+    def finish(self, job_id: str, status: str, error: str | None = None) -> None:
+        """Record the job's final status and stop treating it as running."""
+        raise NotImplementedError
+
+    def set_audio_path(self, job_id: str, audio_path: str) -> None:
+        raise NotImplementedError
+
+    def release(self, job_id: str) -> None:
+        """Stop treating the job as running, leaving it for the next claim."""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id: str) -> None:
+        raise NotImplementedError
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store in a SQLite database, for processes on a single host.
+
+    The database runs in WAL mode, whose shared memory index does not work
+    across hosts: keep it on local storage, never on a network filesystem.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, stale_seconds: float = 60):
+        super().__init__(stale_seconds)
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " audio_path TEXT,"
+                " audio_hash TEXT,"
+                " status TEXT NOT NULL,"
+                " error TEXT,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " heartbeat_at REAL,"
+                " attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "attempts" not in columns:
+                # Stores created before attempts were counted
+                conn.execute(
+                    "ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"
+                )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_audio_hash ON jobs (audio_hash)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_stages ("
+                " job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,"
+                " stage TEXT NOT NULL,"
+                " output TEXT NOT NULL,"
+                " completed_at REAL NOT NULL,"
+                " PRIMARY KEY (job_id, stage))"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create_job(self, audio_path: str | None, audio_hash: str | None) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, audio_path, audio_hash, status, created_at,"
+                " updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, audio_path, audio_hash, PENDING, now, now),
+            )
+        logger.info(f"Created job {job_id} for {audio_path}")
+        return job_id
+
+    def get_job(self, job_id: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            stages = conn.execute(
+                "SELECT stage, output FROM job_stages WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        job = dict(row)
+        job["stages"] = {stage: json.loads(output) for stage, output in stages}
+        return job
+
+    def find_resumable_job(self, audio_hash: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE audio_hash = ? AND status != ?"
+                " ORDER BY created_at DESC LIMIT 1",
+                (audio_hash, COMPLETED),
+            ).fetchone()
+        return self.get_job(row["id"]) if row else None
+
+    def completed_job_ids(self) -> list[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at",
+                (COMPLETED,),
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def claim(self, job_id: str) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = NULL, updated_at = ?,"
+                " heartbeat_at = ?, attempts = attempts + 1"
+                " WHERE id = ? AND NOT (status = ? AND"
+                " COALESCE(heartbeat_at, 0) >= ?)",
+                (RUNNING, now, now, job_id, RUNNING, now - self.stale_seconds),
+            )
+        return cursor.rowcount == 1
+
+    def save_stage(self, job_id: str, stage: str, output: Any) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_stages VALUES (?, ?, ?, ?)",
+                (job_id, stage, json.dumps(output), now),
+            )
+            conn.execute(
+                "UPDATE jobs SET updated_at = ?, heartbeat_at = ? WHERE id = ?",
+                (now, now, job_id),
+            )
+
+    def finish(self, job_id: str, status: str, error: str | None = None) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?,"
+                " heartbeat_at = NULL WHERE id = ?",
+                (status, error, now, job_id),
+            )
+
+    def set_audio_path(self, job_id: str, audio_path: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET audio_path = ?, updated_at = ? WHERE id = ?",
+                (audio_path, time.time(), job_id),
+            )
+
+    def release(self, job_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ?, heartbeat_at = NULL"
+                " WHERE id = ?",
+                (PENDING, time.time(), job_id),
+            )
+
+    def heartbeat(self, job_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id)
+            )
+
+
+_STORE_CLASSES: dict[str, type[JobStore]] = {
+    SQLiteJobStore.name: SQLiteJobStore,
+}
+
+
+def open_job_store(name: str | None = None) -> JobStore:
+    """Return a job store client for ``name`` or the configured JOB_STORE_BACKEND."""
+    name = (name or settings.JOB_STORE_BACKEND).lower()
+    store_class = _STORE_CLASSES.get(name)
+    if store_class is None:
+        raise ValueError(
+            f"Unknown job store backend '{name}'. "
+            f"Choose one of: {', '.join(_STORE_CLASSES)}"
+        )
+    return store_class(
+        settings.JOB_STORE_PATH, stale_seconds=3 * settings.JOB_HEARTBEAT_SECONDS
+    )
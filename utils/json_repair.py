@@ -0,0 +1,112 @@
+"""Tolerant parsing of almost-JSON model replies."""
+
+import json
+import re
+from typing import Any
+
+_CODE_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+_WORD_RE = re.compile(r"\w+")
+_PYTHON_LITERALS = {"None": "null", "True": "true", "False": "false"}
+_CLOSERS = {"{": "}", "[": "]"}
+# How many earlier cut points to try when a truncated reply won't close cleanly.
+_MAX_CUTS = 8
+
+
+def _repair(text: str) -> tuple[str, list[tuple[str, list[str]]]]:
+    """
+    Rewrite ``text`` into closed JSON in one pass.
+
+    Drops anything outside the root value, trailing commas, raw newlines in
+    strings and Python literals, then closes an unterminated string and any
+    open brackets. Also returns ``(prefix, open brackets)`` candidates cut at
+    the last few commas so callers can drop a half-written last member.
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("No JSON object found in model reply")
+
+    out: list[str] = []
+    stack: list[str] = []
+    commas: list[tuple[int, list[str]]] = []
+    in_string = escape = False
+    i = start
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                char = "\\n"
+            out.append(char)
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in "}]":
+            while out and (out[-1].isspace() or out[-1] == ","):
+                out.pop()
+            if stack:
+                out.append(_CLOSERS[stack.pop()])
+            if not stack:
+                break
+            i += 1
+            continue
+        elif char == ",":
+            commas.append((len(out), list(stack)))
+        elif char.isalpha():
+            word = _WORD_RE.match(text, i).group()
+            out.append(_PYTHON_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        out.append(char)
+        i += 1
+
+    cuts = [("".join(out[:index]), opened) for index, opened in commas[-_MAX_CUTS:]]
+    if in_string:
+        out.append('"')
+    return _close("".join(out), stack), cuts
+
+
+def _close(text: str, stack: list[str]) -> str:
+    text = text.rstrip().rstrip(",")
+    if text.endswith(":"):
+        text += " null"
+    return text + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def loads_lenient(text: str) -> Any:
+    """
+    ``json.loads`` that also accepts code fences, surrounding prose, trailing
+    commas, Python literals and replies truncated mid-value.
+
+    Raises:
+        ValueError: If no JSON value can be recovered.
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        error = e
+
+    fenced = _CODE_FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    repaired, cuts = _repair(text)
+    try:
+        return json.loads(repaired)
+    except json.JSONDecodeError:
+        pass
+
+    # A truncated reply may end inside a key or value; drop the last member.
+    for prefix, stack in reversed(cuts):
+        try:
+            return json.loads(_close(prefix, stack))
+        except json.JSONDecodeError:
+            continue
+    raise ValueError(f"Could not repair model reply as JSON: {error}") from error
@@ -0,0 +1,91 @@
+"""Incremental parsing of a JSON object that arrives in streamed pieces."""
+
+import json
+import logging
+import re
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Models sometimes echo the schema shape and nest the fields under this key.
+_WRAPPER_KEY_RE = re.compile(r'\s*"properties"\s*:\s*$')
+
+
+class IncrementalJSONParser:
+    """
+    Collect the top-level members of a streamed JSON object as each completes.
+
+    ``feed`` scans only the new text, tracking string and nesting state, and
+    decodes a member once the ``,`` or ``}`` that ends it arrives. Members of a
+    top-level ``"properties"`` object are reported as top-level fields. Text
+    before the opening brace (e.g. a code fence) is ignored.
+    """
+
+    def __init__(self):
+        self.fields: dict[str, Any] = {}
+        self._chunks: list[str] = []
+        # Unconsumed text of the member being read, and the scan state.
+        self._member = ""
+        self._depth = 0
+        self._field_depth = 1
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._chunks)
+
+    def feed(self, piece: str) -> bool:
+        """Consume ``piece``; return True if it completed any new fields."""
+        self._chunks.append(piece)
+        completed = False
+        start = 0
+        for index, char in enumerate(piece):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    # Opening brace of the root object; skip any preamble.
+                    start = index + 1
+                    self._member = ""
+                elif (
+                    self._depth == 1
+                    and char == "{"
+                    and _WRAPPER_KEY_RE.fullmatch(self._member + piece[start:index])
+                ):
+                    self._field_depth = 2
+                    start = index + 1
+                    self._member = ""
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == self._field_depth and char == "}":
+                    completed |= self._complete_member(piece[start:index])
+                    start = index + 1
+                self._depth -= 1
+            elif char == "," and self._depth == self._field_depth:
+                completed |= self._complete_member(piece[start:index])
+                start = index + 1
+        if self._depth > 0:
+            self._member += piece[start:]
+        return completed
+
+    def _complete_member(self, tail: str) -> bool:
+        member = (self._member + tail).strip()
+        self._member = ""
+        if not member:
+            return False
+        try:
+            self.fields.update(json.loads("{" + member + "}"))
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping undecodable streamed member: {member[:80]}")
+            return False
+        return True
@@ -0,0 +1,173 @@
+"""Persistent SQLite cache for LLM responses with TTL and LRU eviction."""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import Future
+from typing import Any
+
+from utils.metrics import cache_requests
+
+logger = logging.getLogger(__name__)
+
+# Resolves an in-flight entry whose owner was cancelled: its waiters retry.
+_RETRY = object()
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of JSON-serializable LLM results.
+
+    Entries older than ``ttl_seconds`` (0 keeps them forever) are treated as
+    misses, and beyond ``max_entries`` the least recently read entries are
+    dropped. Identical requests that are in flight at the same time share one
+    computation, whichever thread or event loop they come from.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at"
+                " ON responses (accessed_at)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per operation keeps the cache thread-safe.
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(**params: Any) -> str:
+        return hashlib.sha256(
+            json.dumps(params, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._is_expired(created_at, now):
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Discarding unreadable LLM cache entry {key[:12]}: {e}")
+            self.delete(key)
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._evict(conn, now)
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        if self.ttl_seconds:
+            conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+        conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        bypass: bool = False,
+    ) -> Any:
+        """
+        Return the cached value or await ``compute()`` and store its result.
+
+        ``bypass`` skips the lookup and refreshes the entry with a new result.
+        Concurrent callers with the same key wait for the first one's result.
+        """
+        while True:
+            with self._inflight_lock:
+                pending = self._inflight.get(key)
+                if pending is None:
+                    owned = self._inflight[key] = Future()
+                    # Running futures can't be cancelled, so a cancelled
+                    # waiter doesn't take the result away from the others.
+                    owned.set_running_or_notify_cancel()
+                    break
+            logger.info(f"Waiting for in-flight LLM request {key[:12]}")
+            cache_requests.inc(cache="llm", result="shared")
+            result = await asyncio.wrap_future(pending)
+            if result is not _RETRY:
+                return result
+            logger.info(f"In-flight LLM request {key[:12]} was cancelled; retrying")
+
+        try:
+            result = None if bypass else await asyncio.to_thread(self.get, key)
+            outcome = "hit" if result is not None else "bypass" if bypass else "miss"
+            logger.info(f"LLM cache {outcome}: {key[:12]}")
+            cache_requests.inc(cache="llm", result=outcome)
+            if result is None:
+                result = await compute()
+                await asyncio.to_thread(self.put, key, result)
+        except BaseException as e:
+            self._forget(key, owned)
+            if isinstance(e, Exception):
+                owned.set_exception(e)
+            else:
+                # Cancelled: the waiters aren't, so one of them takes over.
+                owned.set_result(_RETRY)
+            raise
+        self._forget(key, owned)
+        owned.set_result(result)
+        return result
+
+    def _forget(self, key: str, owned: Future) -> None:
+        # Before waking the waiters, so a retrying one can become the owner.
+        with self._inflight_lock:
+            if self._inflight.get(key) is owned:
+                del self._inflight[key]
@@ -0,0 +1,317 @@
+"""Process-wide pipeline metrics, exported in the Prometheus text format."""
+
+import contextlib
+import json
+import logging
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, TypeVar
+
+from utils.tracing import SpanContext, span
+
+logger = logging.getLogger(__name__)
+
+_STAGE_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+_RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+
+M = TypeVar("M", bound="_Metric")
+
+
+def _label_key(labelnames: tuple[str, ...], labels: dict[str, str]) -> tuple:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = self._header()
+        for key, value in values:
+            labels = _format_labels(list(zip(self.labelnames, key, strict=True)))
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    @contextlib.contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """Count the enclosed block as in progress."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = _STAGE_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            counts, totals = self._series.setdefault(
+                key, ([0] * len(self.buckets), [0.0])
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            totals[0] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted(
+                (key, (list(counts), totals[0]))
+                for key, (counts, totals) in self._series.items()
+            )
+        lines = self._header()
+        for key, (counts, total) in series:
+            pairs = list(zip(self.labelnames, key, strict=True))
+            for bound, count in zip(self.buckets, counts, strict=True):
+                labels = _format_labels(pairs + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(pairs)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.register(
+    Histogram(
+        "summarizer_stage_seconds",
+        "Wall time of each pipeline stage.",
+        ("stage",),
+    )
+)
+stage_errors = registry.register(
+    Counter(
+        "summarizer_stage_errors_total",
+        "Pipeline stages that raised an error.",
+        ("stage",),
+    )
+)
+jobs_total = registry.register(
+    Counter("summarizer_jobs_total", "Finished summaryAgent jobs.", ("status",))
+)
+whisper_real_time_factor = registry.register(
+    Histogram(
+        "summarizer_whisper_real_time_factor",
+        "Transcription wall time divided by audio duration.",
+        buckets=_RTF_BUCKETS,
+    )
+)
+audio_seconds = registry.register(
+    Counter("summarizer_audio_seconds_total", "Seconds of audio transcribed.")
+)
+vad_skipped_seconds = registry.register(
+    Counter(
+        "summarizer_vad_skipped_seconds_total",
+        "Seconds of silence or music cut before transcription.",
+    )
+)
+llm_requests = registry.register(
+    Counter(
+        "summarizer_llm_requests_total",
+        "OpenAI chat completions by outcome.",
+        ("outcome",),
+    )
+)
+llm_retries = registry.register(
+    Counter("summarizer_llm_retries_total", "Retried OpenAI chat completions.")
+)
+llm_tokens = registry.register(
+    Counter("summarizer_llm_tokens_total", "OpenAI tokens used.", ("kind",))
+)
+llm_request_seconds = registry.register(
+    Histogram(
+        "summarizer_llm_request_seconds",
+        "OpenAI chat completion latency, including retries.",
+    )
+)
+llm_rate_limited_seconds = registry.register(
+    Counter(
+        "summarizer_llm_rate_limited_seconds_total",
+        "Time OpenAI calls spent waiting on the local rate limiter.",
+    )
+)
+cache_requests = registry.register(
+    Counter(
+        "summarizer_cache_requests_total",
+        "Transcript and LLM cache lookups by result.",
+        ("cache", "result"),
+    )
+)
+worker_tasks = registry.register(
+    Counter(
+        "summarizer_worker_tasks_total",
+        "Queued tasks claimed by this worker, by kind and outcome.",
+        ("kind", "outcome"),
+    )
+)
+queue_depth = registry.register(
+    Gauge(
+        "summarizer_queue_depth",
+        "Work queued or in progress: jobs, transcription windows, LLM requests.",
+        ("queue",),
+    )
+)
+
+
+@contextlib.contextmanager
+def track_stage(
+    stage: str, parent: SpanContext | None = None, **attributes: Any
+) -> Iterator[dict[str, Any]]:
+    """Time a pipeline stage, count its errors and trace it as a span."""
+    started = time.perf_counter()
+    with span(stage, parent=parent, **attributes) as span_attributes:
+        try:
+            yield span_attributes
+        except Exception:
+            stage_errors.inc(stage=stage)
+            raise
+        finally:
+            stage_seconds.observe(time.perf_counter() - started, stage=stage)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            self._send(
+                200,
+                registry.render().encode(),
+                "text/plain; version=0.0.4; charset=utf-8",
+            )
+        elif path == "/healthz":
+            self._send(200, b"ok", "text/plain; charset=utf-8")
+        elif path == "/readyz":
+            readiness = getattr(self.server, "readiness", None)
+            status = readiness() if readiness else {"ready": True}
+            self._send(
+                200 if status["ready"] else 503,
+                json.dumps(status).encode(),
+                "application/json",
+            )
+        else:
+            self.send_error(404)
+
+    def _send(self, code: int, body: bytes, content_type: str) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"metrics: {format % args}")
+
+
+def start_metrics_server(
+    host: str,
+    port: int,
+    readiness: Callable[[], dict[str, Any]] | None = None,
+) -> ThreadingHTTPServer | None:
+    """
+    Serve ``/metrics``, ``/healthz`` and ``/readyz`` from a daemon thread.
+
+    ``readiness`` backs ``/readyz``. Returns None if the port is taken.
+    """
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Could not start metrics server on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    server.readiness = readiness
+    threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    ).start()
+    logger.info(f"Serving Prometheus metrics on http://{host}:{port}/metrics")
+    return server
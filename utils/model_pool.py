@@ -0,0 +1,160 @@
+"""Bounded, thread-safe pool of loaded models with LRU eviction."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_torch_model_mb(model: Any) -> float:
+    """Estimate resident size of a torch module from its parameters and buffers."""
+    try:
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors) / (1024 * 1024)
+    except AttributeError:
+        return 0.0
+
+
+class _PoolEntry:
+    def __init__(self, model: Any, size_mb: float):
+        self.model = model
+        self.size_mb = size_mb
+        self.users = 0
+        # Inference on a shared model is serialized; the weights are shared.
+        self.lock = threading.Lock()
+
+
+class ModelPool:
+    """
+    Keep loaded models resident up to a memory budget.
+
+    Models are loaded once per name (concurrent requests for the same name wait
+    for a single load), pinned while in use so they can't be evicted mid-job,
+    and evicted least-recently-used first when the budget is exceeded.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Any],
+        max_memory_mb: float,
+        size_estimator: Callable[[str, Any], float] | None = None,
+    ):
+        self._loader = loader
+        self._size_estimator = size_estimator or (
+            lambda _name, model: estimate_torch_model_mb(model)
+        )
+        self.max_memory_mb = max_memory_mb
+
+        self._entries: OrderedDict[str, _PoolEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "evictions": 0,
+            "load_seconds": 0.0,
+        }
+
+    def _get_or_load(self, name: str) -> _PoolEntry:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                self._stats["hits"] += 1
+                entry.users += 1
+                return entry
+            self._stats["misses"] += 1
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading while we waited.
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None:
+                    self._entries.move_to_end(name)
+                    entry.users += 1
+                    return entry
+
+            logger.info(f"Loading model '{name}'...")
+            started = time.perf_counter()
+            model = self._loader(name)
+            elapsed = time.perf_counter() - started
+            entry = _PoolEntry(model, self._size_estimator(name, model))
+
+            with self._lock:
+                self._stats["loads"] += 1
+                self._stats["load_seconds"] += elapsed
+                entry.users += 1
+                self._entries[name] = entry
+                self._evict_locked()
+
+        logger.info(
+            f"Loaded model '{name}' ({entry.size_mb:.0f} MB) in {elapsed:.1f}s; "
+            f"pool stats: {self.stats()}"
+        )
+        return entry
+
+    def _evict_locked(self) -> None:
+        for name in list(self._entries):
+            if self._resident_mb_locked() <= self.max_memory_mb:
+                return
+            entry = self._entries[name]
+            if entry.users:
+                continue
+            del self._entries[name]
+            self._stats["evictions"] += 1
+            logger.info(f"Evicted model '{name}' ({entry.size_mb:.0f} MB)")
+
+        if self._resident_mb_locked() > self.max_memory_mb:
+            logger.warning(
+                f"Model pool is over budget ({self._resident_mb_locked():.0f} MB > "
+                f"{self.max_memory_mb:.0f} MB) because every resident model is in use"
+            )
+
+    def _resident_mb_locked(self) -> float:
+        return sum(entry.size_mb for entry in self._entries.values())
+
+    @contextmanager
+    def acquire(self, name: str) -> Iterator[Any]:
+        """Yield the model for ``name`` with exclusive use of it for the block."""
+        entry = self._get_or_load(name)
+        try:
+            with entry.lock:
+                yield entry.model
+        finally:
+            self._release(entry)
+
+    def _release(self, entry: _PoolEntry) -> None:
+        with self._lock:
+            entry.users -= 1
+            self._evict_locked()
+
+    def preload(self, names: Iterable[str]) -> threading.Thread:
+        """Load models in a background thread so the first request doesn't pay for it."""
+        names = list(names)
+
+        def _run() -> None:
+            for name in names:
+                try:
+                    self._release(self._get_or_load(name))
+                except Exception as e:
+                    logger.error(f"Failed to preload model '{name}': {e}")
+
+        thread = threading.Thread(target=_run, name="model-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "resident": list(self._entries),
+                "resident_mb": round(self._resident_mb_locked(), 1),
+                "max_memory_mb": self.max_memory_mb,
+            }
@@ -1,29 +1,393 @@
 # Create utils/openai_client.py
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Coroutine
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
 from dotenv import load_dotenv
-from openai import OpenAI
 
 from config.settings import settings
+from utils.metrics import (
+    llm_rate_limited_seconds,
+    llm_request_seconds,
+    llm_requests,
+    llm_retries,
+    llm_tokens,
+    queue_depth,
+)
+from utils.rate_limiter import RateLimiter
+from utils.token_utils import count_tokens
+from utils.tracing import SpanContext, current_span, span
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 load_dotenv()
+logger = logging.getLogger(__name__)
+
+_STREAM_END = object()
+
+
+@cache
+def _retryable_errors() -> tuple[type[Exception], ...]:
+    # openai is imported lazily: it costs most of this module's import time.
+    import openai
+
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+
+class LLMMetrics:
+    """Running totals plus a window of recent per-call latency and token counts."""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self.recent: deque[dict[str, Any]] = deque(maxlen=window)
+        self.totals = {
+            "calls": 0,
+            "failures": 0,
+            "retries": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "latency_seconds": 0.0,
+            "rate_limited_seconds": 0.0,
+        }
+
+    def record(self, call: dict[str, Any]) -> None:
+        with self._lock:
+            self.recent.append(call)
+            self.totals["calls"] += 1
+            self.totals["failures"] += 0 if call["success"] else 1
+            self.totals["retries"] += call["attempts"] - 1
+            self.totals["prompt_tokens"] += call["prompt_tokens"]
+            self.totals["completion_tokens"] += call["completion_tokens"]
+            self.totals["latency_seconds"] += call["latency_seconds"]
+            self.totals["rate_limited_seconds"] += call["rate_limited_seconds"]
+        llm_requests.inc(outcome="success" if call["success"] else "failure")
+        llm_retries.inc(call["attempts"] - 1)
+        llm_tokens.inc(call["prompt_tokens"], kind="prompt")
+        llm_tokens.inc(call["completion_tokens"], kind="completion")
+        llm_request_seconds.observe(call["latency_seconds"])
+        llm_rate_limited_seconds.inc(call["rate_limited_seconds"])
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            latencies = sorted(c["latency_seconds"] for c in self.recent)
+            snapshot: dict[str, Any] = dict(self.totals)
+            if latencies:
+                snapshot["p50_latency_seconds"] = latencies[len(latencies) // 2]
+                snapshot["p95_latency_seconds"] = latencies[
+                    min(len(latencies) - 1, int(len(latencies) * 0.95))
+                ]
+            return snapshot
+
+
+@dataclass
+class StreamedCompletion:
+    """Text and usage collected from a streamed chat completion."""
+
+    text: str
+    usage: Any = None
+
+
+def _retry_after_seconds(error: Exception) -> float | None:
+    """Read Retry-After (seconds or HTTP date) or retry-after-ms from an error."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at - time.time())
+
+
+def _estimate_tokens(request: dict[str, Any]) -> int:
+    prompt = sum(
+        count_tokens(str(message.get("content") or ""))
+        for message in request.get("messages", [])
+    )
+    completion = request.get("max_tokens") or settings.OPENAI_EXPECTED_COMPLETION_TOKENS
+    return prompt + completion
 
 
 # Singleton pattern for OpenAI client
 class OpenAIClient:
+    """
+    Shared OpenAI access with one pooled HTTP client per mode.
+
+    All async calls run on a dedicated background event loop so they share one
+    connection pool and one rate limiter no matter which thread or loop they
+    come from. ``chat_completion`` can be awaited from any event loop and
+    ``chat_completion_sync`` called from any thread.
+    """
+
     _instance = None
     _client = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # Checked again under the lock: threads (e.g. warmup and the first
+        # request) may race here, and only one client and loop may be built.
+        if cls._instance is not None:
+            return cls._instance
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls._build()
         return cls._instance
 
+    @classmethod
+    def _build(cls) -> "OpenAIClient":
+        import httpx
+        from openai import AsyncOpenAI, OpenAI
+
+        instance = super().__new__(cls)
+        limits = httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        )
+        # Retries are handled here so they can honour the rate limiter.
+        cls._client = OpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=0,
+            http_client=httpx.Client(limits=limits, timeout=settings.OPENAI_TIMEOUT),
+        )
+        instance._async_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=limits, timeout=settings.OPENAI_TIMEOUT
+            ),
+        )
+        instance.metrics = LLMMetrics()
+        instance._limiter = None
+        instance._loop = asyncio.new_event_loop()
+        threading.Thread(
+            target=instance._loop.run_forever,
+            name="openai-client-loop",
+            daemon=True,
+        ).start()
+        # Published only once complete, so the unlocked check above never
+        # returns a half-built client.
+        return instance
+
     @property
     def client(self):
         return self._client
 
+    @property
+    def async_client(self) -> "AsyncOpenAI":
+        return self._async_client
+
+    def run_sync(self, coro: Coroutine) -> Any:
+        """Run ``coro`` on the client's event loop and block for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def run_async(self, coro: Coroutine) -> Any:
+        """Await ``coro`` on the client's event loop from any other loop."""
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+        )
+
+    async def chat_completion(self, **request: Any) -> Any:
+        """Rate-limited, retried ``chat.completions.create`` call."""
+        return await self.run_async(
+            self._chat_completion(trace_parent=current_span(), **request)
+        )
+
+    def chat_completion_sync(self, **request: Any) -> Any:
+        return self.run_sync(
+            self._chat_completion(trace_parent=current_span(), **request)
+        )
+
+    async def stream_chat_completion(self, **request: Any) -> AsyncIterator[str]:
+        """
+        Stream the completion's content deltas to the calling event loop.
+
+        The call is rate limited like ``chat_completion``; it is only retried
+        if it fails before the first delta arrives.
+        """
+        loop = asyncio.get_running_loop()
+        deltas: asyncio.Queue = asyncio.Queue()
+
+        def emit(item: Any) -> None:
+            loop.call_soon_threadsafe(deltas.put_nowait, item)
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._chat_completion(
+                on_delta=emit, trace_parent=current_span(), **request
+            ),
+            self._loop,
+        )
+        future.add_done_callback(lambda _: emit(_STREAM_END))
+        try:
+            while (delta := await deltas.get()) is not _STREAM_END:
+                yield delta
+            # Surfaces any error raised by the call.
+            await asyncio.wrap_future(future)
+        finally:
+            future.cancel()
+
+    async def _chat_completion(
+        self,
+        on_delta: Callable[[str], None] | None = None,
+        trace_parent: SpanContext | None = None,
+        **request: Any,
+    ) -> Any:
+        if self._limiter is None:
+            # Created lazily so it binds to the client's loop.
+            self._limiter = RateLimiter(settings.OPENAI_RPM, settings.OPENAI_TPM)
+
+        reserved = _estimate_tokens(request)
+        call = {
+            "model": request.get("model"),
+            "success": False,
+            "attempts": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "latency_seconds": 0.0,
+            "rate_limited_seconds": 0.0,
+            "first_token_seconds": None,
+        }
+        with (
+            span("llm_call", parent=trace_parent, model=call["model"]) as attributes,
+            queue_depth.track(queue="llm"),
+        ):
+            try:
+                return await self._call_with_retries(request, reserved, on_delta, call)
+            finally:
+                attributes.update(
+                    (name, call[name])
+                    for name in (
+                        "attempts",
+                        "prompt_tokens",
+                        "completion_tokens",
+                        "rate_limited_seconds",
+                        "first_token_seconds",
+                    )
+                )
+
+    async def _call_with_retries(
+        self,
+        request: dict[str, Any],
+        reserved: int,
+        on_delta: Callable[[str], None] | None,
+        call: dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            while True:
+                call["attempts"] += 1
+                call["rate_limited_seconds"] += await self._limiter.acquire(reserved)
+                try:
+                    if on_delta is None:
+                        response = await self._async_client.chat.completions.create(
+                            **request
+                        )
+                    else:
+                        response = await self._stream(request, on_delta, call, started)
+                    break
+                except _retryable_errors() as e:
+                    # Deltas already handed out can't be taken back.
+                    if (
+                        call["attempts"] > settings.OPENAI_MAX_RETRIES
+                        or call["first_token_seconds"] is not None
+                    ):
+                        raise
+                    delay = self._backoff(e, call["attempts"])
+                    logger.warning(
+                        f"OpenAI call failed ({type(e).__name__}); retry "
+                        f"{call['attempts']}/{settings.OPENAI_MAX_RETRIES} in "
+                        f"{delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                call["prompt_tokens"] = usage.prompt_tokens or 0
+                call["completion_tokens"] = usage.completion_tokens or 0
+                self._limiter.reconcile(
+                    reserved, call["prompt_tokens"] + call["completion_tokens"]
+                )
+            call["success"] = True
+            return response
+        finally:
+            call["latency_seconds"] = time.perf_counter() - started
+            self.metrics.record(call)
+            logger.info(
+                f"OpenAI call: {call['latency_seconds']:.2f}s, "
+                f"{call['prompt_tokens']} prompt / {call['completion_tokens']} "
+                f"completion tokens, {call['attempts']} attempt(s)"
+            )
+
+    async def _stream(
+        self,
+        request: dict[str, Any],
+        on_delta: Callable[[str], None],
+        call: dict[str, Any],
+        started: float,
+    ) -> StreamedCompletion:
+        stream = await self._async_client.chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        parts: list[str] = []
+        usage = None
+        async for chunk in stream:
+            # The final chunk carries usage and no choices.
+            if chunk.usage is not None:
+                usage = chunk.usage
+            for choice in chunk.choices:
+                content = choice.delta.content
+                if not content:
+                    continue
+                if call["first_token_seconds"] is None:
+                    call["first_token_seconds"] = time.perf_counter() - started
+                parts.append(content)
+                on_delta(content)
+        return StreamedCompletion("".join(parts), usage)
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        from openai import RateLimitError
+
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            if isinstance(error, RateLimitError):
+                self._limiter.pause(retry_after)
+            # A little jitter so queued callers don't all retry at once.
+            return retry_after + random.uniform(0, settings.OPENAI_BACKOFF_BASE)
+        cap = min(
+            settings.OPENAI_BACKOFF_MAX, settings.OPENAI_BACKOFF_BASE * 2**attempt
+        )
+        return random.uniform(0, cap)
+
 
 # Usage in other files
 # from config import settings
 # from utils.openai_client import OpenAIClient
 # client = OpenAIClient().client
+# response = OpenAIClient().chat_completion_sync(model=..., messages=[...])
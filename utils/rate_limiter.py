@@ -0,0 +1,73 @@
+"""Token-bucket limiter for request-per-minute and token-per-minute budgets."""
+
+import asyncio
+import time
+
+
+class _Bucket:
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        # Requests larger than the whole bucket only wait for a full bucket.
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+
+class RateLimiter:
+    """
+    Async limiter enforcing requests-per-minute and tokens-per-minute budgets.
+
+    A budget of 0 disables that bucket. Callers reserve an estimated token count
+    up front and reconcile it with the real usage once the response arrives.
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self._requests = _Bucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = _Bucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait until one request and ``tokens`` tokens fit; return seconds waited."""
+        waited = 0.0
+        # Waiters queue on the lock, so budget is granted in arrival order.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                delay = 0.0
+                for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+                    if bucket is not None:
+                        bucket.refill(now)
+                        delay = max(delay, bucket.wait_time(amount))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+                waited += delay
+
+            if self._requests is not None:
+                self._requests.level -= 1
+            if self._tokens is not None:
+                self._tokens.level -= tokens
+        return waited
+
+    def reconcile(self, reserved: int, used: int) -> None:
+        """Return over-reserved tokens to (or charge extra usage against) the bucket."""
+        if self._tokens is not None:
+            self._tokens.level = min(
+                self._tokens.capacity, self._tokens.level + reserved - used
+            )
+
+    def pause(self, seconds: float) -> None:
+        """Drain the buckets after a 429 so queued calls back off too."""
+        for bucket in (self._requests, self._tokens):
+            if bucket is not None:
+                bucket.refill(time.monotonic())
+                bucket.level = min(bucket.level, -seconds * bucket.rate)
@@ -0,0 +1,90 @@
+"""Collapse Whisper hallucination loops (repeated sentence runs) in transcripts."""
+
+import re
+from typing import Any
+
+from config.settings import settings
+from utils.token_utils import count_tokens
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+
+
+def _fingerprint(sentence: str) -> tuple[int, frozenset]:
+    """Hash of the normalized sentence plus its set of word bigrams."""
+    words = _NON_WORD_RE.sub(" ", sentence.lower()).split()
+    shingles = frozenset(zip(words, words[1:], strict=False)) or frozenset(words)
+    return hash(" ".join(words)), shingles
+
+
+def _similar(
+    a: tuple[int, frozenset], b: tuple[int, frozenset], threshold: float
+) -> bool:
+    if a[0] == b[0]:
+        return True
+    if not a[1] or not b[1]:
+        return False
+    overlap = len(a[1] & b[1])
+    return overlap / (len(a[1]) + len(b[1]) - overlap) >= threshold
+
+
+def collapse_repeated_segments(
+    text: str,
+    min_repeats: int | None = None,
+    max_period: int | None = None,
+    similarity: float | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Keep one copy of any block of 1..max_period sentences that repeats back to
+    back at least ``min_repeats`` times (exactly or near-exactly).
+
+    Every sentence is only compared with the one ``period`` positions earlier,
+    and scanning resumes after each collapsed run, so the cost is linear in the
+    number of sentences.
+
+    Returns:
+        Tuple of (deduplicated_text, stats)
+    """
+    min_repeats = min_repeats or settings.DEDUP_MIN_REPEATS
+    max_period = max_period or settings.DEDUP_MAX_PERIOD
+    similarity = similarity if similarity is not None else settings.DEDUP_SIMILARITY
+
+    sentences = [s for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
+    fingerprints = [_fingerprint(s) for s in sentences]
+    count = len(sentences)
+
+    kept: list[str] = []
+    removed = 0
+    i = 0
+    while i < count:
+        best_period, best_end = 0, i
+        for period in range(1, max_period + 1):
+            j = i + period
+            while j < count and _similar(
+                fingerprints[j], fingerprints[j - period], similarity
+            ):
+                j += 1
+            repeats = (j - i) // period
+            end = i + repeats * period
+            if repeats >= min_repeats and end - i - period > best_end - i - best_period:
+                best_period, best_end = period, end
+
+        if best_period:
+            kept.extend(sentences[i : i + best_period])
+            removed += best_end - i - best_period
+            i = best_end
+        else:
+            kept.append(sentences[i])
+            i += 1
+
+    stats: dict[str, Any] = {
+        "segments": count,
+        "removed_segments": removed,
+        "tokens_saved": 0,
+    }
+    if not removed:
+        return text, stats
+
+    deduped = " ".join(kept)
+    stats["tokens_saved"] = count_tokens(text) - count_tokens(deduped)
+    return deduped, stats
@@ -0,0 +1,207 @@
+"""Compact columnar files of transcript segments, read through a memory map."""
+
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+
+_MAGIC = b"MSEG"
+_VERSION = 1
+_PREFIX = struct.Struct("<4sII")  # magic, version, header length
+_ALIGN = 8
+# Segments per compressed text block: one block is decompressed to read any
+# segment in it.
+_BLOCK_SEGMENTS = 64
+_CACHED_BLOCKS = 8
+_COLUMNS = {
+    "start": "<f4",
+    "end": "<f4",
+    # NaN when the engine reported no confidence.
+    "confidence": "<f2",
+    # Byte offset of each segment's text in the uncompressed text (n + 1).
+    "text_offsets": "<u4",
+    # Byte offset of each compressed block in the blob (blocks + 1).
+    "block_offsets": "<u8",
+    "blob": "u1",
+}
+
+
+def _aligned(size: int) -> int:
+    return -(-size // _ALIGN) * _ALIGN
+
+
+def write_segments(path: str, segments: Iterable[dict[str, Any]]) -> int:
+    """
+    Write ``segments`` (start, end, text, confidence) to ``path`` atomically.
+
+    Segments are stored in start order. Returns the file size in bytes.
+    """
+    segments = sorted(segments, key=lambda s: (s["start"], s["end"]))
+    texts = [s["text"].encode("utf-8") for s in segments]
+    text_offsets = np.zeros(len(texts) + 1, _COLUMNS["text_offsets"])
+    np.cumsum([len(t) for t in texts], out=text_offsets[1:])
+    blocks = [
+        zlib.compress(b"".join(texts[i : i + _BLOCK_SEGMENTS]))
+        for i in range(0, len(texts), _BLOCK_SEGMENTS)
+    ]
+    block_offsets = np.zeros(len(blocks) + 1, _COLUMNS["block_offsets"])
+    np.cumsum([len(b) for b in blocks], out=block_offsets[1:])
+    confidence = [s.get("confidence") for s in segments]
+    columns = {
+        "start": np.array([s["start"] for s in segments], _COLUMNS["start"]),
+        "end": np.array([s["end"] for s in segments], _COLUMNS["end"]),
+        "confidence": np.array(
+            [np.nan if c is None else c for c in confidence], _COLUMNS["confidence"]
+        ),
+        "text_offsets": text_offsets,
+        "block_offsets": block_offsets,
+        "blob": np.frombuffer(b"".join(blocks), _COLUMNS["blob"]),
+    }
+
+    # Column offsets are relative to the first aligned byte after the header.
+    layout: dict[str, list[int]] = {}
+    offset = 0
+    for name, array in columns.items():
+        layout[name] = [offset, len(array)]
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps(
+        {
+            "segments": len(segments),
+            "block_segments": _BLOCK_SEGMENTS,
+            "columns": layout,
+        },
+        separators=(",", ":"),
+    ).encode()
+    base = _aligned(_PREFIX.size + len(header))
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREFIX.pack(_MAGIC, _VERSION, len(header)) + header)
+            for name, array in columns.items():
+                f.seek(base + layout[name][0])
+                f.write(array.tobytes())
+            size = f.tell()
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return size
+
+
+class SegmentFile:
+    """
+    Read-only view of a segment file.
+
+    Columns are memory-mapped, so time lookups only touch the pages they
+    binary-search, and segment text is decompressed one block at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _PREFIX.unpack_from(self._data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a version {_VERSION} segment file: {path}")
+        header = json.loads(self._data[_PREFIX.size : _PREFIX.size + header_length])
+        self.block_segments = header["block_segments"]
+        base = _aligned(_PREFIX.size + header_length)
+        # Plain arrays over the mapped pages; nothing is read until indexed.
+        self.columns: dict[str, np.ndarray] = {
+            name: np.frombuffer(
+                self._data, _COLUMNS[name], count=length, offset=base + offset
+            )
+            for name, (offset, length) in header["columns"].items()
+        }
+        self._blocks: OrderedDict[int, bytes] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.columns["start"])
+
+    @property
+    def start(self) -> np.ndarray:
+        return self.columns["start"]
+
+    @property
+    def end(self) -> np.ndarray:
+        return self.columns["end"]
+
+    @property
+    def confidence(self) -> np.ndarray:
+        return self.columns["confidence"]
+
+    def _block(self, index: int) -> bytes:
+        block = self._blocks.get(index)
+        if block is None:
+            start, end = self.columns["block_offsets"][index : index + 2].tolist()
+            block = zlib.decompress(self.columns["blob"][start:end])
+            self._blocks[index] = block
+            if len(self._blocks) > _CACHED_BLOCKS:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(index)
+        return block
+
+    def text(self, index: int) -> str:
+        block = index // self.block_segments
+        offsets = self.columns["text_offsets"]
+        base = int(offsets[block * self.block_segments])
+        start, end = offsets[index : index + 2].tolist()
+        return self._block(block)[start - base : end - base].decode("utf-8")
+
+    def segment(self, index: int) -> dict[str, Any]:
+        return self._segments(range(index, index + 1))[0]
+
+    def _segments(self, indexes: range) -> list[dict[str, Any]]:
+        window = slice(indexes.start, indexes.stop)
+        return [
+            {
+                "start": round(start, 2),
+                "end": round(end, 2),
+                "text": self.text(index),
+                "confidence": None
+                if confidence != confidence
+                else round(confidence, 3),
+            }
+            for index, start, end, confidence in zip(
+                indexes,
+                self.start[window].tolist(),
+                self.end[window].tolist(),
+                self.confidence[window].tolist(),
+                strict=True,
+            )
+        ]
+
+    def between(self, start: float, end: float) -> range:
+        """Indexes of the segments that overlap ``start``..``end`` seconds."""
+        # Whisper segments are sequential, so end times ascend with start times.
+        first = int(np.searchsorted(self.end, start, side="right"))
+        last = int(np.searchsorted(self.start, end, side="left"))
+        return range(first, max(first, last))
+
+    def segments(self, start: float, end: float) -> list[dict[str, Any]]:
+        return self._segments(self.between(start, end))
+
+    def excerpt(self, start: float, end: float) -> str:
+        """Text spoken between ``start`` and ``end`` seconds."""
+        return "".join(self.text(i) for i in self.between(start, end)).strip()
+
+    def find(self, terms: list[str]) -> int | None:
+        """Index of the first segment containing one of ``terms`` (whole words)."""
+        if not terms:
+            return None
+        pattern = re.compile(
+            r"\b(?:" + "|".join(map(re.escape, terms)) + r")\b", re.IGNORECASE
+        )
+        return next((i for i in range(len(self)) if pattern.search(self.text(i))), None)
@@ -0,0 +1,82 @@
+"""Token counting helpers for OpenAI models."""
+
+import logging
+import re
+from functools import lru_cache
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for English text when tiktoken is missing.
+_CHARS_PER_TOKEN = 4
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        logger.info("tiktoken not installed; estimating token counts")
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """Count tokens of ``text`` for ``model`` (defaults to OPENAI_MODEL)."""
+    if not text:
+        return 0
+    encoding = _get_encoding(model or settings.OPENAI_MODEL)
+    if encoding is None:
+        return max(1, len(text) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def chunk_text(
+    text: str, max_tokens: int, overlap_tokens: int = 0, model: str | None = None
+) -> list[str]:
+    """
+    Split ``text`` into chunks of at most ``max_tokens`` tokens.
+
+    Chunks break on sentence boundaries where possible (sentences longer than
+    a chunk are split on words) and each chunk repeats up to
+    ``overlap_tokens`` of trailing context from the previous one.
+    """
+    units: list[tuple[str, int]] = []
+    for sentence in _SENTENCE_SPLIT_RE.split(text):
+        if not sentence.strip():
+            continue
+        tokens = count_tokens(sentence, model)
+        if tokens <= max_tokens:
+            units.append((sentence, tokens))
+            continue
+        for word in sentence.split():
+            units.append((word, count_tokens(word, model) or 1))
+
+    chunks: list[str] = []
+    current: list[tuple[str, int]] = []
+    current_tokens = 0
+    for unit, tokens in units:
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(u for u, _ in current))
+            # Carry trailing context into the next chunk.
+            carried: list[tuple[str, int]] = []
+            carried_tokens = 0
+            for prev, prev_tokens in reversed(current):
+                if carried_tokens + prev_tokens > overlap_tokens:
+                    break
+                carried.insert(0, (prev, prev_tokens))
+                carried_tokens += prev_tokens
+            if carried_tokens + tokens > max_tokens:
+                carried, carried_tokens = [], 0
+            current, current_tokens = carried, carried_tokens
+        current.append((unit, tokens))
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(u for u, _ in current))
+    return chunks
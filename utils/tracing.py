@@ -0,0 +1,90 @@
+"""Lightweight per-job trace spans, written as JSON lines when TRACE_FILE is set."""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from typing import Any
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# (trace_id, span_id) of the innermost open span, if any.
+SpanContext = tuple[str, str | None]
+
+_current: contextvars.ContextVar[SpanContext | None] = contextvars.ContextVar(
+    "current_span", default=None
+)
+_write_lock = threading.Lock()
+
+
+def current_span() -> SpanContext | None:
+    """The active span, to hand to work that runs in another thread or loop."""
+    return _current.get()
+
+
+def _write(record: dict[str, Any]) -> None:
+    path = settings.TRACE_FILE
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = json.dumps(record, default=str)
+    with _write_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+@contextlib.contextmanager
+def span(
+    name: str,
+    trace_id: str | None = None,
+    parent: SpanContext | None = None,
+    **attributes: Any,
+) -> Iterator[dict[str, Any]]:
+    """
+    Record a timed span, by default as a child of the current span.
+
+    Pass ``trace_id`` to start a job's trace, or ``parent`` (from
+    ``current_span``) when the work runs outside the caller's context. Yields
+    the attribute dict so callers can add results before the span closes. A
+    no-op without TRACE_FILE or outside a trace.
+    """
+    if trace_id is None:
+        parent = parent or _current.get()
+        trace_id = parent[0] if parent else None
+    if not settings.TRACE_FILE or trace_id is None:
+        yield attributes
+        return
+
+    span_id = uuid.uuid4().hex[:16]
+    previous = _current.get()
+    # Generators may resume in another context, so restore by value, not token.
+    _current.set((trace_id, span_id))
+    started_at = time.time()
+    started = time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except BaseException as e:
+        error = str(e) or type(e).__name__
+        raise
+    finally:
+        _current.set(previous)
+        record = {
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent[1] if parent else None,
+            "name": name,
+            "start": started_at,
+            "duration_seconds": round(time.perf_counter() - started, 6),
+            "attributes": attributes,
+            "error": error,
+        }
+        try:
+            _write(record)
+        except OSError as e:
+            logger.warning(f"Could not write trace span {name}: {e}")
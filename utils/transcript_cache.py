@@ -0,0 +1,248 @@
+"""Persistent, content-addressed cache for transcription results."""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from utils.metrics import cache_requests
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+_HASH_MEMO_SIZE = 256
+
+
+class TranscriptCache:
+    """
+    On-disk cache of transcripts keyed by audio content hash and decode settings.
+
+    Entries are JSON files; reads refresh their mtime so size-based eviction
+    drops the least recently used first. A lock file per key makes sure only one
+    process transcribes a given recording at a time while the others wait for
+    its result. The holder touches the lock as a heartbeat, so a lock left
+    untouched for ``lock_stale_seconds`` belongs to a process that died.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int,
+        lock_stale_seconds: float = 120,
+        poll_interval: float = 0.5,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock_stale_seconds = lock_stale_seconds
+        self.poll_interval = poll_interval
+        self._hash_memo: OrderedDict[tuple, str] = OrderedDict()
+        self._memo_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def hash_file(self, path: str) -> str:
+        """Return the SHA-256 of the file, memoized on (path, size, mtime)."""
+        stat = os.stat(path)
+        memo_key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        with self._memo_lock:
+            digest = self._hash_memo.get(memo_key)
+            if digest is not None:
+                self._hash_memo.move_to_end(memo_key)
+                return digest
+
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(_HASH_BLOCK_SIZE):
+                sha.update(block)
+        digest = sha.hexdigest()
+
+        with self._memo_lock:
+            self._hash_memo[memo_key] = digest
+            if len(self._hash_memo) > _HASH_MEMO_SIZE:
+                self._hash_memo.popitem(last=False)
+        return digest
+
+    def make_key(self, audio_path: str, model: str, options: dict[str, Any]) -> str:
+        params = json.dumps({"model": model, "options": options}, sort_keys=True)
+        return hashlib.sha256(
+            f"{self.hash_file(audio_path)}:{params}".encode()
+        ).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _lock_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.lock")
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)
+            return result
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Discarding unreadable transcript cache entry {key}: {e}")
+            self._remove(path)
+            return None
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, self._entry_path(key))
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        self._evict()
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Return the cached result, computing it at most once across processes."""
+        with self.claim(key) as cached:
+            if cached is not None:
+                return cached
+            result = compute()
+            if result.get("success", False):
+                self.put(key, result)
+            return result
+
+    @contextlib.contextmanager
+    def claim(self, key: str) -> Iterator[dict[str, Any] | None]:
+        """
+        Yield the cached result, or None with the key's lock held.
+
+        A None holder computes the result and ``put``s it before leaving the
+        block; other processes wait for it meanwhile, then get the cached one.
+        """
+        while True:
+            result = self.get(key)
+            if result is not None:
+                logger.info(f"Transcript cache hit: {key[:12]}")
+                cache_requests.inc(cache="transcript", result="hit")
+                yield result
+                return
+
+            lock = self._try_lock(key)
+            if lock is not None:
+                stop = threading.Event()
+                heartbeat = threading.Thread(
+                    target=self._refresh_lock, args=(key, stop), daemon=True
+                )
+                heartbeat.start()
+                try:
+                    # The previous holder may have written the entry just before
+                    # releasing the lock.
+                    result = self.get(key)
+                    if result is None:
+                        logger.info(f"Transcript cache miss: {key[:12]}")
+                        cache_requests.inc(cache="transcript", result="miss")
+                    yield result
+                finally:
+                    stop.set()
+                    heartbeat.join()
+                    self._unlock(key, lock)
+                return
+
+            logger.info(f"Waiting for in-flight transcription of {key[:12]}")
+            self._wait_for_unlock(key)
+
+    def _try_lock(self, key: str) -> str | None:
+        """Create the key's lock file; returns its owner token, or None if held."""
+        lock_path = self._lock_path(key)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return None
+        token = f"{os.getpid()}:{uuid.uuid4().hex}"
+        with os.fdopen(fd, "w") as f:
+            f.write(token)
+        return token
+
+    def _unlock(self, key: str, token: str) -> None:
+        """Remove the lock unless it was broken as stale and taken by another."""
+        lock_path = self._lock_path(key)
+        with contextlib.suppress(FileNotFoundError):
+            with open(lock_path) as f:
+                owner = f.read()
+            if owner == token:
+                os.remove(lock_path)
+
+    def _refresh_lock(self, key: str, stop: threading.Event) -> None:
+        """Touch the lock four times per stale period until ``stop`` is set."""
+        lock_path = self._lock_path(key)
+        while not stop.wait(self.lock_stale_seconds / 4):
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(lock_path)
+
+    def _wait_for_unlock(self, key: str) -> None:
+        lock_path = self._lock_path(key)
+        while True:
+            try:
+                stat = os.stat(lock_path)
+            except FileNotFoundError:
+                return
+            if time.time() - stat.st_mtime > self.lock_stale_seconds:
+                self._break_stale_lock(key, stat)
+                return
+            time.sleep(self.poll_interval)
+
+    def _break_stale_lock(self, key: str, stale: os.stat_result) -> None:
+        """
+        Remove the lock last seen as ``stale``, but never one that replaced it.
+
+        Another waiter may break the same lock first and a new owner take the
+        key, so the lock is moved aside atomically and only removed if it is
+        still the same file, untouched since; otherwise it is put back.
+        """
+        lock_path = self._lock_path(key)
+        aside = f"{lock_path}.{uuid.uuid4().hex}.stale"
+        try:
+            os.rename(lock_path, aside)
+        except FileNotFoundError:
+            return
+        moved = os.stat(aside)
+        if (moved.st_ino, moved.st_mtime_ns) == (stale.st_ino, stale.st_mtime_ns):
+            logger.warning(f"Removed stale transcript cache lock {key[:12]}")
+        else:
+            # A live lock; restore it unless the key has been locked again.
+            with contextlib.suppress(FileExistsError):
+                os.link(aside, lock_path)
+        self._remove(aside)
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
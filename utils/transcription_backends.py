@@ -0,0 +1,165 @@
+"""Transcription engines used by speechToTextTool."""
+
+import math
+import threading
+from typing import Any
+
+from config.settings import settings
+from utils.model_pool import ModelPool, estimate_torch_model_mb
+
+# Approximate resident size of CTranslate2 int8 models, used for pool budgeting.
+_FASTER_WHISPER_MODEL_MB = {
+    "tiny": 45,
+    "base": 80,
+    "small": 250,
+    "medium": 780,
+    "large": 1600,
+}
+
+
+def _confidence(avg_logprob: float | None) -> float | None:
+    """Mean token probability of a segment, from Whisper's average log-prob."""
+    if avg_logprob is None:
+        return None
+    return round(min(1.0, math.exp(avg_logprob)), 3)
+
+
+class TranscriptionBackend:
+    """
+    Base class for transcription engines.
+
+    ``transcribe`` accepts a file path or a 16 kHz float32 array and returns a
+    dict with ``text``, ``language``, ``duration`` (seconds, 0 if unknown) and
+    ``segments`` (``start``/``end`` seconds, ``text`` and ``confidence`` of
+    each segment; confidence is None when the engine does not report it).
+    """
+
+    name = ""
+
+    def __init__(self, max_memory_mb: float):
+        self.pool = ModelPool(self._load_model, max_memory_mb, self._estimate_mb)
+
+    def _load_model(self, model_name: str) -> Any:
+        raise NotImplementedError
+
+    def _estimate_mb(self, model_name: str, model: Any) -> float:
+        return estimate_torch_model_mb(model)
+
+    def transcribe(self, audio: Any, model_name: str) -> dict[str, Any]:
+        raise NotImplementedError
+
+    def preload(self, model_names: list[str]) -> threading.Thread:
+        return self.pool.preload(model_names)
+
+    def options(self) -> dict[str, Any]:
+        """Engine settings that affect the transcript (used in cache keys)."""
+        return {"engine": self.name}
+
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper running on PyTorch."""
+
+    name = "whisper"
+
+    def _load_model(self, model_name: str) -> Any:
+        import whisper
+
+        return whisper.load_model(model_name)
+
+    def transcribe(self, audio: Any, model_name: str) -> dict[str, Any]:
+        with self.pool.acquire(model_name) as model:
+            result = model.transcribe(audio)
+        segments = result.get("segments") or []
+        return {
+            "text": result["text"],
+            "language": result.get("language", "unknown"),
+            "duration": segments[-1]["end"] if segments else 0,
+            "segments": [
+                {
+                    "start": s["start"],
+                    "end": s["end"],
+                    "text": s["text"],
+                    "confidence": _confidence(s.get("avg_logprob")),
+                }
+                for s in segments
+            ],
+        }
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """CTranslate2 (faster-whisper) engine with quantized CPU inference."""
+
+    name = "faster-whisper"
+
+    def _load_model(self, model_name: str) -> Any:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError(
+                "TRANSCRIPTION_ENGINE=faster-whisper requires the 'faster-whisper' "
+                "package (pip install faster-whisper)"
+            ) from e
+
+        return WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=settings.FASTER_WHISPER_COMPUTE_TYPE,
+            cpu_threads=settings.FASTER_WHISPER_CPU_THREADS,
+        )
+
+    def _estimate_mb(self, model_name: str, model: Any) -> float:
+        # "large-v3", "medium.en" etc. share the size of their family.
+        family = model_name.split(".")[0].split("-")[0]
+        return _FASTER_WHISPER_MODEL_MB.get(family, 0)
+
+    def transcribe(self, audio: Any, model_name: str) -> dict[str, Any]:
+        with self.pool.acquire(model_name) as model:
+            segments, info = model.transcribe(
+                audio, beam_size=settings.FASTER_WHISPER_BEAM_SIZE
+            )
+            # Segments are generated lazily, so decode while holding the model.
+            segments = [
+                {
+                    "start": s.start,
+                    "end": s.end,
+                    "text": s.text,
+                    "confidence": _confidence(s.avg_logprob),
+                }
+                for s in segments
+            ]
+        return {
+            "text": "".join(s["text"] for s in segments),
+            "language": info.language or "unknown",
+            "duration": info.duration,
+            "segments": segments,
+        }
+
+    def options(self) -> dict[str, Any]:
+        return {
+            "engine": self.name,
+            "compute_type": settings.FASTER_WHISPER_COMPUTE_TYPE,
+            "beam_size": settings.FASTER_WHISPER_BEAM_SIZE,
+        }
+
+
+_BACKEND_CLASSES = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+_backends: dict[str, TranscriptionBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: str | None = None) -> TranscriptionBackend:
+    """Return the (per-process) backend instance for ``name`` or the configured engine."""
+    name = (name or settings.TRANSCRIPTION_ENGINE).lower()
+    with _backends_lock:
+        if name not in _backends:
+            backend_class = _BACKEND_CLASSES.get(name)
+            if backend_class is None:
+                raise ValueError(
+                    f"Unknown transcription engine '{name}'. "
+                    f"Choose one of: {', '.join(_BACKEND_CLASSES)}"
+                )
+            _backends[name] = backend_class(settings.WHISPER_POOL_MAX_MB)
+        return _backends[name]
@@ -0,0 +1,239 @@
+"""Vectorized energy/spectral voice-activity detection and silence trimming."""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from config.settings import settings
+from utils.audio_chunking import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+_SPEECH_BAND_HZ = (300, 3400)
+# Frames quieter than this are never speech, whatever the noise floor.
+_ABSOLUTE_FLOOR_DB = -60.0
+# Broadband noise is spectrally flat; voiced speech is peaky.
+_MAX_FLATNESS = 0.5
+_MIN_SPEECH_BAND_RATIO = 0.4
+# Window over which syllable-rate loudness variation is measured.
+_MODULATION_SECONDS = 1.0
+
+
+@dataclass
+class TimestampMap:
+    """
+    Maps times in trimmed audio back to the original recording.
+
+    ``original_starts[i]`` and ``trimmed_starts[i]`` are where the i-th kept
+    region begins in each timeline; regions are ``lengths[i]`` seconds long.
+    """
+
+    original_starts: np.ndarray
+    trimmed_starts: np.ndarray
+    lengths: np.ndarray
+
+    def to_original(
+        self, seconds: float | np.ndarray, end: bool = False
+    ) -> float | np.ndarray:
+        """
+        Original-audio time of a position (or array of them) in trimmed audio.
+
+        A position exactly on a cut maps to the start of the following region,
+        or with ``end=True`` (for segment end times) to the end of the previous.
+        """
+        if not len(self.lengths):
+            return seconds
+        side = "left" if end else "right"
+        index = np.searchsorted(self.trimmed_starts, seconds, side=side) - 1
+        index = np.clip(index, 0, len(self.lengths) - 1)
+        offset = np.minimum(
+            np.asarray(seconds) - self.trimmed_starts[index], self.lengths[index]
+        )
+        result = self.original_starts[index] + np.maximum(offset, 0)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def to_dict(self) -> dict[str, list[float]]:
+        return {
+            "original_starts": self.original_starts.round(3).tolist(),
+            "trimmed_starts": self.trimmed_starts.round(3).tolist(),
+            "lengths": self.lengths.round(3).tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, list[float]]) -> "TimestampMap":
+        return cls(
+            np.asarray(data["original_starts"], dtype=float),
+            np.asarray(data["trimmed_starts"], dtype=float),
+            np.asarray(data["lengths"], dtype=float),
+        )
+
+
+def _frames(audio: np.ndarray, frame: int) -> np.ndarray:
+    count = len(audio) // frame
+    return audio[: count * frame].reshape(count, frame)
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Centered rolling standard deviation via cumulative sums."""
+    window = max(1, min(window, len(values)))
+    padded = np.pad(values, (window // 2, window - 1 - window // 2), mode="edge")
+    sums = np.concatenate(([0.0], np.cumsum(padded)))
+    squares = np.concatenate(([0.0], np.cumsum(padded**2)))
+    mean = (sums[window:] - sums[:-window]) / window
+    variance = (squares[window:] - squares[:-window]) / window - mean**2
+    return np.sqrt(np.maximum(variance, 0))
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """(start, end) frame indices of each run of True in ``mask``."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.column_stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def speech_frames(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Per-frame speech decision for mono float audio.
+
+    A frame is speech when it is louder than the adaptive noise floor, its
+    spectrum is not flat (broadband noise), most of its energy is in the speech
+    band, and loudness around it varies at syllable rate (steady hold music
+    and hum don't).
+    """
+    frame = max(1, int(settings.VAD_FRAME_MS * sample_rate / 1000))
+    frames = _frames(audio.astype(np.float32, copy=False), frame)
+    if not len(frames):
+        return np.zeros(0, dtype=bool)
+
+    energy_db = 10 * np.log10(np.mean(frames**2, axis=1) + 1e-10)
+    noise_floor = np.percentile(energy_db, 10)
+    loud = energy_db > max(
+        noise_floor + settings.VAD_ENERGY_THRESHOLD_DB, _ABSOLUTE_FLOOR_DB
+    )
+
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame), axis=1)) ** 2 + 1e-12
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    freqs = np.fft.rfftfreq(frame, 1 / sample_rate)
+    band = (freqs >= _SPEECH_BAND_HZ[0]) & (freqs <= _SPEECH_BAND_HZ[1])
+    band_ratio = power[:, band].sum(axis=1) / power.sum(axis=1)
+
+    modulation = _rolling_std(
+        energy_db, int(_MODULATION_SECONDS * 1000 / settings.VAD_FRAME_MS)
+    )
+    return (
+        loud
+        & (flatness < _MAX_FLATNESS)
+        & (band_ratio > _MIN_SPEECH_BAND_RATIO)
+        & (modulation > settings.VAD_MIN_MODULATION_DB)
+    )
+
+
+def speech_regions(
+    audio: np.ndarray, sample_rate: int = SAMPLE_RATE
+) -> list[tuple[int, int]]:
+    """
+    (start, end) sample ranges that contain speech.
+
+    Gaps shorter than VAD_MIN_SILENCE_MS are bridged, regions shorter than
+    VAD_MIN_SPEECH_MS are dropped, and each region is padded by VAD_PAD_MS so
+    word edges aren't clipped.
+    """
+    is_speech = speech_frames(audio, sample_rate)
+    frame_ms = settings.VAD_FRAME_MS
+    runs = _runs(is_speech)
+    if not len(runs):
+        return []
+
+    # Bridge short pauses between consecutive runs, then drop isolated blips.
+    gaps = (runs[1:, 0] - runs[:-1, 1]) * frame_ms
+    breaks = np.flatnonzero(gaps >= settings.VAD_MIN_SILENCE_MS)
+    starts = runs[np.concatenate(([0], breaks + 1)), 0]
+    ends = runs[np.concatenate((breaks, [len(runs) - 1])), 1]
+    long_enough = (ends - starts) * frame_ms >= settings.VAD_MIN_SPEECH_MS
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    frame = int(frame_ms * sample_rate / 1000)
+    pad = int(settings.VAD_PAD_MS * sample_rate / 1000)
+    starts = np.maximum(starts * frame - pad, 0)
+    ends = np.minimum(ends * frame + pad, len(audio))
+    # Padding can make neighbours overlap; merge them.
+    regions: list[tuple[int, int]] = []
+    for start, end in zip(starts.tolist(), ends.tolist(), strict=True):
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+class SpeechTrimmer:
+    """
+    Drop non-speech audio from consecutive blocks of one recording.
+
+    Each block is analysed on its own (so the noise floor follows the
+    recording), and the kept regions of all blocks share one TimestampMap.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.original_samples = 0
+        self.kept_samples = 0
+        self.seconds = 0.0
+        # [original_start, trimmed_start, length] in samples, per kept region.
+        self._regions: list[list[int]] = []
+
+    def trim(self, block: np.ndarray) -> np.ndarray:
+        started = time.perf_counter()
+        regions = speech_regions(block, self.sample_rate)
+        for start, end in regions:
+            original_start = self.original_samples + start
+            previous = self._regions[-1] if self._regions else None
+            if previous and previous[0] + previous[2] == original_start:
+                # Speech running across the block boundary.
+                previous[2] += end - start
+            else:
+                self._regions.append([original_start, self.kept_samples, end - start])
+            self.kept_samples += end - start
+        self.original_samples += len(block)
+        self.seconds += time.perf_counter() - started
+        if not regions:
+            return block[:0]
+        return np.concatenate([block[start:end] for start, end in regions])
+
+    @property
+    def timestamps(self) -> TimestampMap:
+        regions = np.array(self._regions, dtype=float).reshape(-1, 3)
+        return TimestampMap(*(regions / self.sample_rate).T)
+
+    def stats(self) -> dict[str, Any]:
+        original_seconds = self.original_samples / self.sample_rate
+        kept_seconds = self.kept_samples / self.sample_rate
+        return {
+            "regions": len(self._regions),
+            "original_seconds": round(original_seconds, 2),
+            "kept_seconds": round(kept_seconds, 2),
+            "skipped_seconds": round(original_seconds - kept_seconds, 2),
+            "skipped_ratio": round(1 - kept_seconds / original_seconds, 3)
+            if original_seconds
+            else 0.0,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+def trim_silence(
+    audio: np.ndarray, sample_rate: int = SAMPLE_RATE
+) -> tuple[np.ndarray, TimestampMap, dict[str, Any]]:
+    """
+    Drop non-speech audio.
+
+    Returns:
+        Tuple of (speech_audio, timestamp_map, stats); stats reports the
+        original, kept and skipped seconds.
+    """
+    trimmer = SpeechTrimmer(sample_rate)
+    speech = trimmer.trim(audio)
+    stats = trimmer.stats()
+    logger.debug(f"VAD kept {stats['regions']} speech regions: {stats}")
+    return speech, trimmer.timestamps, stats
@@ -0,0 +1,110 @@
+"""Background warm-up of models and clients once the server is listening."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def _load_transcription_models() -> None:
+    if settings.REMOTE_WORKERS:
+        # worker.py processes transcribe; they load their own models.
+        return
+    from tools.speechToTextTool import preload_models
+
+    preload_models(wait=True)
+
+
+def _create_openai_client() -> None:
+    from utils.openai_client import OpenAIClient
+
+    OpenAIClient()
+
+
+def _load_tokenizer() -> None:
+    from utils.token_utils import count_tokens
+
+    count_tokens("warmup")
+
+
+DEFAULT_STEPS: dict[str, Callable[[], None]] = {
+    "transcription_models": _load_transcription_models,
+    "openai_client": _create_openai_client,
+    "tokenizer": _load_tokenizer,
+}
+
+
+class Warmup:
+    """
+    Runs start-up steps on a background thread and reports readiness.
+
+    Liveness only needs the server to answer; readiness waits until every
+    step has finished, so a load balancer holds traffic back until the first
+    request no longer pays for loading models.
+    """
+
+    def __init__(self, steps: dict[str, Callable[[], None]] | None = None):
+        self.steps = DEFAULT_STEPS if steps is None else steps
+        self._lock = threading.Lock()
+        self._status: dict[str, dict[str, Any]] = {
+            name: {"state": PENDING} for name in self.steps
+        }
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Run the steps in the background; skipped when WARMUP_ENABLED is off."""
+        if not settings.WARMUP_ENABLED:
+            with self._lock:
+                for status in self._status.values():
+                    status["state"] = SKIPPED
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="warmup", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        for name, step in self.steps.items():
+            self._update(name, state=RUNNING)
+            step_started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                logger.error(f"Warm-up step '{name}' failed: {e}")
+                self._update(name, state=FAILED, error=str(e))
+            else:
+                self._update(name, state=DONE)
+            self._update(name, seconds=round(time.perf_counter() - step_started, 3))
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.1f}s")
+
+    def _update(self, name: str, **fields: Any) -> None:
+        with self._lock:
+            self._status[name].update(fields)
+
+    @property
+    def ready(self) -> bool:
+        return self.status()["ready"]
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            steps = {name: dict(status) for name, status in self._status.items()}
+        return {
+            "ready": all(s["state"] in (DONE, SKIPPED) for s in steps.values()),
+            "steps": steps,
+        }
+
+
+warmup = Warmup()
@@ -0,0 +1,189 @@
+"""
+Worker process: claims queued jobs and runs their pipeline stages.
+
+With ``REMOTE_WORKERS=true`` the UI and API queue jobs instead of running
+them. With the bundled SQLite job store and queue, start any number of
+workers on the host that holds them: both are in WAL mode, which must not be
+shared over a network filesystem. Workers on other hosts need networked
+``JobStore`` and ``QueueBackend`` backends and ``JOB_AUDIO_DIR`` on shared
+storage, since jobs refer to their recordings relative to it. A worker leases each job it claims and renews the lease
+while it works; if it dies, the lease expires and another worker picks the
+job up from its last checkpoint.
+
+Usage:
+    python worker.py                          # transcribe and summarize
+    python worker.py --kinds transcribe       # Whisper only
+    python worker.py --kinds summarize --concurrency 8
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import socket
+
+from config.settings import settings, validate_environment
+from main import get_job_store, release_job_audio, run_claimed_job
+from tools.speechToTextTool import preload_models
+from utils.executors import shutdown_executors
+from utils.job_queue import (
+    KINDS,
+    SUMMARIZE,
+    TRANSCRIBE,
+    Lease,
+    QueueBackend,
+    get_job_queue,
+)
+from utils.job_store import COMPLETED, FAILED, PENDING
+from utils.logging_config import setup_logging
+from utils.metrics import start_metrics_server, worker_tasks
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_leased(queue: QueueBackend, lease: Lease, kinds: tuple[str, ...]) -> str:
+    """Run the leased job's stages, renewing the lease; returns the outcome."""
+    job = await asyncio.to_thread(get_job_store().get_job, lease.job_id)
+    if job is None or job["status"] == COMPLETED:
+        await asyncio.to_thread(queue.complete, lease)
+        return "skipped"
+    if lease.attempts > settings.JOB_MAX_ATTEMPTS:
+        error = f"Gave up after {settings.JOB_MAX_ATTEMPTS} attempts"
+        await asyncio.to_thread(get_job_store().finish, lease.job_id, FAILED, error)
+        await asyncio.to_thread(release_job_audio, lease.job_id)
+        await asyncio.to_thread(queue.complete, lease)
+        return "abandoned"
+    if not await asyncio.to_thread(get_job_store().claim, lease.job_id):
+        # Still heartbeating somewhere, e.g. a worker whose lease lapsed
+        # during a long pause; it stops at its next renewal. Retry once its
+        # heartbeat would have gone stale, so this costs one attempt at most.
+        await asyncio.to_thread(queue.release, lease, get_job_store().stale_seconds)
+        return "busy"
+
+    # A worker that also summarizes runs the whole job in one go.
+    transcribe_only = lease.kind == TRANSCRIBE and SUMMARIZE not in kinds
+
+    async def run() -> None:
+        async for status, _ in run_claimed_job(job, transcribe_only=transcribe_only):
+            logger.info(f"[{lease.job_id}] {status}")
+
+    work = asyncio.create_task(run())
+    try:
+        while True:
+            done, _ = await asyncio.wait({work}, timeout=settings.JOB_LEASE_SECONDS / 3)
+            if done:
+                break
+            if not await asyncio.to_thread(
+                queue.renew, lease, settings.JOB_LEASE_SECONDS
+            ):
+                logger.warning(f"Lost the lease on job {lease.job_id}; stopping")
+                work.cancel()
+                await asyncio.wait({work})
+                return "lost"
+        work.result()
+    except asyncio.CancelledError:
+        # Shutting down: hand the job straight back to the other workers.
+        work.cancel()
+        await asyncio.wait({work})
+        queue.release(lease)
+        raise
+    except Exception as e:
+        # Unexpected errors (e.g. the OpenAI API is down) are retried later
+        # from the last checkpoint, up to JOB_MAX_ATTEMPTS claims.
+        logger.error(f"Job {lease.job_id} failed on attempt {lease.attempts}: {e}")
+        delay = min(settings.JOB_LEASE_SECONDS, 2**lease.attempts)
+        await asyncio.to_thread(queue.release, lease, delay, str(e))
+        return "retried"
+
+    job = await asyncio.to_thread(get_job_store().get_job, lease.job_id)
+    if job["status"] == PENDING:
+        # Transcribed; the rest of the pipeline goes back on the queue.
+        await asyncio.to_thread(queue.enqueue, lease.job_id, SUMMARIZE)
+        return "handed_off"
+    await asyncio.to_thread(queue.complete, lease)
+    return job["status"]
+
+
+async def work(
+    queue: QueueBackend, owner: str, kinds: tuple[str, ...], stop: asyncio.Event
+) -> None:
+    """Claim and run tasks of ``kinds`` until ``stop`` is set."""
+    while not stop.is_set():
+        lease = await asyncio.to_thread(
+            queue.claim, owner, kinds, settings.JOB_LEASE_SECONDS
+        )
+        if lease is None:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(stop.wait(), settings.JOB_POLL_SECONDS)
+            continue
+        if lease.reclaimed:
+            logger.warning(
+                f"Reclaimed job {lease.job_id} after its lease expired "
+                f"(attempt {lease.attempts})"
+            )
+        logger.info(f"{owner} claimed {lease.kind} for job {lease.job_id}")
+        outcome = await _run_leased(queue, lease, kinds)
+        worker_tasks.inc(kind=lease.kind, outcome=outcome)
+        logger.info(f"{owner} finished {lease.kind} for job {lease.job_id}: {outcome}")
+
+
+async def run_workers(kinds: tuple[str, ...], concurrency: int) -> None:
+    queue = get_job_queue()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    host = f"{socket.gethostname()}:{os.getpid()}"
+    workers = [
+        asyncio.create_task(work(queue, f"{host}:{i}", kinds, stop))
+        for i in range(max(1, concurrency))
+    ]
+    logger.info(f"Worker {host} started: {', '.join(kinds)} x{len(workers)}")
+    await stop.wait()
+    logger.info("Stopping; leased jobs go back to the queue")
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run queued summarizer jobs (REMOTE_WORKERS mode)."
+    )
+    parser.add_argument(
+        "--kinds",
+        nargs="+",
+        choices=KINDS,
+        default=list(KINDS),
+        help="Task kinds to claim",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.WORKER_CONCURRENCY,
+        help="Jobs run at once by this worker",
+    )
+    args = parser.parse_args()
+
+    setup_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        log_file=os.getenv("LOG_FILE"),
+    )
+    if not validate_environment():
+        raise SystemExit("Missing required environment variables")
+
+    if TRANSCRIBE in args.kinds:
+        preload_models()
+    if settings.METRICS_ENABLED:
+        start_metrics_server(settings.METRICS_HOST, settings.METRICS_PORT)
+    try:
+        asyncio.run(run_workers(tuple(args.kinds), args.concurrency))
+    finally:
+        shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()